@@ -0,0 +1,124 @@
+"""
+Hospital Distance Benchmark
+Compares the scalar haversine from model/main.py with the vectorized kernel in
+services/hospital_data.py and with grid-indexed nearest-hospital queries
+
+Hospitals and origins are random points over India, so the figures hold for a
+nationwide dataset rather than the bundled handful of records.
+
+Usage:
+    python benchmarks/geo_benchmark.py --hospitals 100000 --origins 1000
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.hospital_data import HospitalCoordinates
+from services.geo_index import GeoIndex
+
+# Rough bounding box of India (degrees)
+LATITUDE_RANGE = (8.0, 35.0)
+LONGITUDE_RANGE = (68.0, 97.0)
+
+def calculate_distance(lat1, lon1, lat2, lon2):
+    """The scalar haversine from model/main.py, copied because that module starts an app on import"""
+    R = 6371  # Earth's radius in kilometers
+
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+
+    a = (math.sin(dlat/2) * math.sin(dlat/2) +
+         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
+         math.sin(dlon/2) * math.sin(dlon/2))
+
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+    return R * c
+
+
+def time_call(func: Callable[[], object], repeat: int) -> float:
+    """Best wall time of repeat runs, in milliseconds"""
+    best = math.inf
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def print_table(rows: List[Dict]):
+    columns = ('case', 'ms', 'per_origin_ms', 'speedup')
+    print(" | ".join(f"{column:>34}" for column in columns))
+    for row in rows:
+        print(" | ".join(f"{str(row[column]):>34}" for column in columns))
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark hospital distance ranking")
+    parser.add_argument('--hospitals', type=int, default=100_000, help="Number of synthetic hospitals")
+    parser.add_argument('--origins', type=int, default=1000, help="Origins for the matrix and index cases")
+    parser.add_argument('--k', type=int, default=5, help="Results per nearest-hospital query")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per case (best is reported)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    latitudes = rng.uniform(*LATITUDE_RANGE, args.hospitals)
+    longitudes = rng.uniform(*LONGITUDE_RANGE, args.hospitals)
+    origin_latitudes = rng.uniform(*LATITUDE_RANGE, args.origins)
+    origin_longitudes = rng.uniform(*LONGITUDE_RANGE, args.origins)
+
+    coordinates = HospitalCoordinates(latitudes, longitudes)
+    points = list(zip(latitudes.tolist(), longitudes.tolist()))
+    origin = (float(origin_latitudes[0]), float(origin_longitudes[0]))
+
+    # Same numbers either way
+    scalar = np.array([calculate_distance(*origin, lat, lon) for lat, lon in points])
+    vectorized = coordinates.distances_km(*origin)
+    print(f"{args.hospitals} hospitals, {args.origins} origins; max difference {np.abs(scalar - vectorized).max():.2e} km\n")
+
+    scalar_ms = time_call(lambda: [calculate_distance(*origin, lat, lon) for lat, lon in points], args.repeat)
+    vector_ms = time_call(lambda: coordinates.distances_km(*origin), args.repeat)
+    matrix_ms = time_call(lambda: coordinates.distance_matrix_km(origin_latitudes, origin_longitudes), 1)
+    matrix32_ms = time_call(
+        lambda: coordinates.distance_matrix_km(origin_latitudes, origin_longitudes, dtype=np.float32), 1
+    )
+
+    index = GeoIndex(
+        {'latitude': lat, 'longitude': lon} for lat, lon in points
+    )
+    queries = list(zip(origin_latitudes.tolist(), origin_longitudes.tolist()))
+    index_ms = time_call(lambda: [index.nearest(lat, lon, k=args.k) for lat, lon in queries], args.repeat)
+    brute_ms = time_call(
+        lambda: [np.argpartition(coordinates.distances_km(lat, lon), args.k)[:args.k] for lat, lon in queries[:100]],
+        1
+    ) * len(queries) / min(100, len(queries))
+
+    rows = [
+        ('scalar, one origin -> all', scalar_ms, 1, scalar_ms),
+        ('vectorized, one origin -> all', vector_ms, 1, scalar_ms),
+        ('vectorized matrix, float64', matrix_ms, args.origins, scalar_ms),
+        ('vectorized matrix, float32', matrix32_ms, args.origins, scalar_ms),
+        (f'brute-force top {args.k} (vectorized)', brute_ms, args.origins, scalar_ms),
+        (f'grid index top {args.k}', index_ms, args.origins, scalar_ms),
+    ]
+    print_table([
+        {
+            'case': case,
+            'ms': round(ms, 2),
+            'per_origin_ms': round(ms / origins, 4),
+            'speedup': f"{reference / (ms / origins):.0f}x"
+        }
+        for case, ms, origins, reference in rows
+    ])
+
+
+if __name__ == "__main__":
+    main()
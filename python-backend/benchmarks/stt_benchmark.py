@@ -0,0 +1,153 @@
+"""
+STT Backend Benchmark
+Runs every configured speech recognition backend over a folder of recordings and
+compares latency and word error rate, without going through the server
+
+Each clip is an audio file (.wav, .webm, .ogg, .mp3) with an optional reference
+transcript next to it (same name, .txt). Backends are called one at a time on
+the same decoded PCM, so network and local engines are measured on equal terms.
+
+Usage:
+    python benchmarks/stt_benchmark.py clips/ --language hi-IN --backends google,vosk
+    python benchmarks/stt_benchmark.py clips/ --repeat 3 --json results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from services.audio_decoder import audio_decoder, decoder_pool
+from services.stt_backends import STTBackend, create_backends
+
+AUDIO_EXTENSIONS = ('.wav', '.webm', '.ogg', '.mp3')
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level edit distance divided by the reference length"""
+    ref = reference.lower().split()
+    hyp = hypothesis.lower().split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    # Single-row Levenshtein over words
+    row = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        previous, row[0] = row[0], i
+        for j, hyp_word in enumerate(hyp, 1):
+            previous, row[j] = row[j], min(
+                row[j] + 1,
+                row[j - 1] + 1,
+                previous + (ref_word != hyp_word)
+            )
+    return row[-1] / len(ref)
+
+
+async def load_clips(folder: str) -> List[Dict]:
+    """Decode every clip in the folder to 16 kHz PCM and pair it with its reference"""
+    clips = []
+    for name in sorted(os.listdir(folder)):
+        stem, extension = os.path.splitext(name)
+        if extension.lower() not in AUDIO_EXTENSIONS:
+            continue
+
+        with open(os.path.join(folder, name), 'rb') as f:
+            pcm = bytes(await audio_decoder.decode(f.read()))
+
+        reference_path = os.path.join(folder, stem + '.txt')
+        reference = None
+        if os.path.exists(reference_path):
+            with open(reference_path, encoding='utf-8') as f:
+                reference = f.read().strip()
+
+        clips.append({'name': name, 'pcm': pcm, 'reference': reference, 'seconds': len(pcm) / 32000})
+    return clips
+
+
+def run_backend(backend: STTBackend, clips: List[Dict], language: str, repeat: int) -> Dict:
+    """Transcribe every clip with one backend, timing each call"""
+    latencies: List[float] = []
+    error_rates: List[float] = []
+    errors = 0
+    empty = 0
+    transcripts = {}
+
+    for clip in clips:
+        text = ""
+        for _ in range(repeat):
+            started = time.perf_counter()
+            try:
+                text = (backend.recognize(clip['pcm'], language) or "").strip()
+            except Exception as e:
+                errors += 1
+                print(f"  {backend.name} failed on {clip['name']}: {e}", file=sys.stderr)
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        transcripts[clip['name']] = text
+        if not text:
+            empty += 1
+        if clip['reference'] is not None:
+            error_rates.append(word_error_rate(clip['reference'], text))
+
+    audio_seconds = sum(clip['seconds'] for clip in clips) * repeat
+    return {
+        'backend': backend.name,
+        'local': backend.local,
+        'calls': len(clips) * repeat,
+        'errors': errors,
+        'empty': empty,
+        'p50_ms': round(float(np.percentile(latencies, 50)), 1) if latencies else None,
+        'p95_ms': round(float(np.percentile(latencies, 95)), 1) if latencies else None,
+        'real_time_factor': round(sum(latencies) / 1000 / audio_seconds, 3) if latencies and audio_seconds else None,
+        'wer': round(float(np.mean(error_rates)), 3) if error_rates else None,
+        'transcripts': transcripts
+    }
+
+
+def print_table(results: List[Dict]):
+    columns = ('backend', 'local', 'calls', 'errors', 'empty', 'p50_ms', 'p95_ms', 'real_time_factor', 'wer')
+    print(" | ".join(f"{column:>16}" for column in columns))
+    for result in results:
+        print(" | ".join(f"{str(result[column]):>16}" for column in columns))
+
+
+async def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Compare STT backends on a folder of recordings")
+    parser.add_argument('folder', help="Folder of audio clips with optional .txt reference transcripts")
+    parser.add_argument('--language', default='en-IN', help="Recognition language code (default en-IN)")
+    parser.add_argument('--backends', default=settings.STT_BACKENDS, help="Comma-separated backend names")
+    parser.add_argument('--repeat', type=int, default=1, help="Calls per clip, for steadier latency figures")
+    parser.add_argument('--json', dest='json_path', help="Also write full results (with transcripts) here")
+    args = parser.parse_args(argv)
+
+    clips = await load_clips(args.folder)
+    await decoder_pool.close()
+    if not clips:
+        parser.error(f"No audio clips found in {args.folder}")
+    print(f"{len(clips)} clips, {sum(clip['seconds'] for clip in clips):.1f}s of audio, language {args.language}\n")
+
+    backends = [
+        backend for backend in create_backends([name.strip() for name in args.backends.split(',') if name.strip()])
+        if backend.supports(args.language)
+    ]
+    if not backends:
+        parser.error("None of the requested backends is available for this language")
+
+    results = [run_backend(backend, clips, args.language, args.repeat) for backend in backends]
+    print_table(results)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
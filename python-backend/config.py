@@ -25,7 +25,100 @@ class Settings:
     
     # AI Model settings
     AI_MODEL: str = "gemini-1.5-flash"
-    
+
+    # LLM execution settings
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+    LLM_TIMEOUT: float = float(os.getenv("LLM_TIMEOUT", "30"))
+    LLM_EXECUTOR_WORKERS: int = int(os.getenv("LLM_EXECUTOR_WORKERS", "16"))
+
+    # Text-to-speech pipeline settings
+    TTS_PIPELINE_PARALLELISM: int = int(os.getenv("TTS_PIPELINE_PARALLELISM", "3"))
+    TTS_SENTENCE_TIMEOUT: float = float(os.getenv("TTS_SENTENCE_TIMEOUT", "15"))
+    TTS_MAX_SENTENCE_CHARS: int = int(os.getenv("TTS_MAX_SENTENCE_CHARS", "200"))
+    TTS_CACHE_MAX_BYTES: int = int(os.getenv("TTS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    TTS_CACHE_DIR: str = os.getenv("TTS_CACHE_DIR", "")
+    TTS_CACHE_DISK_MAX_BYTES: int = int(os.getenv("TTS_CACHE_DISK_MAX_BYTES", str(512 * 1024 * 1024)))
+    PHRASE_BANK_RETRY_SECONDS: float = float(os.getenv("PHRASE_BANK_RETRY_SECONDS", "600"))
+    PHRASE_BANK_RENDER_PARALLELISM: int = int(os.getenv("PHRASE_BANK_RENDER_PARALLELISM", "4"))
+
+    # Voice activity detection settings
+    VAD_FRAME_MS: int = int(os.getenv("VAD_FRAME_MS", "30"))
+    VAD_AGGRESSIVENESS: int = int(os.getenv("VAD_AGGRESSIVENESS", "2"))
+
+    # ffmpeg decoding of compressed client audio (pre-spawned processes, per-decode timeout)
+    FFMPEG_BINARY: str = os.getenv("FFMPEG_BINARY", "ffmpeg")
+    DECODER_POOL_SIZE: int = int(os.getenv("DECODER_POOL_SIZE", "2"))
+    DECODER_TIMEOUT: float = float(os.getenv("DECODER_TIMEOUT", "10"))
+
+    # Speech recognition backends in default order of preference, per-language overrides
+    # ("hi=vosk,google;en=google,sphinx") and Vosk model directories ("en=/models/vosk-en")
+    STT_BACKENDS: str = os.getenv("STT_BACKENDS", "google,vosk,sphinx")
+    STT_LANGUAGE_BACKENDS: str = os.getenv("STT_LANGUAGE_BACKENDS", "")
+    VOSK_MODEL_PATHS: str = os.getenv("VOSK_MODEL_PATHS", "")
+
+    # Speech recognition: thread pool, hedge to the next backend after STT_HEDGE_DELAY
+    # seconds, per-backend timeouts, and error budgets (skip a backend for
+    # STT_BREAKER_COOLDOWN seconds once more than STT_ERROR_BUDGET of its last
+    # STT_ERROR_WINDOW calls failed)
+    STT_EXECUTOR_WORKERS: int = int(os.getenv("STT_EXECUTOR_WORKERS", "8"))
+    STT_HEDGE_DELAY: float = float(os.getenv("STT_HEDGE_DELAY", "2.0"))
+    STT_GOOGLE_TIMEOUT: float = float(os.getenv("STT_GOOGLE_TIMEOUT", "8"))
+    STT_SPHINX_TIMEOUT: float = float(os.getenv("STT_SPHINX_TIMEOUT", "10"))
+    STT_ERROR_WINDOW: int = int(os.getenv("STT_ERROR_WINDOW", "20"))
+    STT_ERROR_BUDGET: float = float(os.getenv("STT_ERROR_BUDGET", "0.5"))
+    STT_BREAKER_COOLDOWN: float = float(os.getenv("STT_BREAKER_COOLDOWN", "30"))
+    STT_LOCAL_TIMEOUT: float = float(os.getenv("STT_LOCAL_TIMEOUT", "10"))
+
+    # Per-session noise floor: calibrated from the first NOISE_CALIBRATION_MS of audio,
+    # then tracked with an EMA; utterances less than STT_MIN_SNR_DB above it skip STT
+    NOISE_CALIBRATION_MS: int = int(os.getenv("NOISE_CALIBRATION_MS", "300"))
+    NOISE_FLOOR_ALPHA: float = float(os.getenv("NOISE_FLOOR_ALPHA", "0.05"))
+    STT_MIN_SNR_DB: float = float(os.getenv("STT_MIN_SNR_DB", "6"))
+
+    # Partial transcripts while the caller is still talking (needs a streaming STT backend
+    # such as vosk): a word is stable once the last STT_PARTIAL_STABLE_UPDATES partial
+    # results agree on it, and once a partial of at least SPECULATIVE_MIN_WORDS words is
+    # entirely stable the AI reply is drafted on it before the utterance closes
+    STT_PARTIALS_ENABLED: bool = os.getenv("STT_PARTIALS_ENABLED", "True").lower() == "true"
+    STT_PARTIAL_STABLE_UPDATES: int = int(os.getenv("STT_PARTIAL_STABLE_UPDATES", "3"))
+    SPECULATIVE_LLM_ENABLED: bool = os.getenv("SPECULATIVE_LLM_ENABLED", "True").lower() == "true"
+    SPECULATIVE_MIN_WORDS: int = int(os.getenv("SPECULATIVE_MIN_WORDS", "3"))
+
+    # Cancel a spoken reply in flight when the caller starts speaking again
+    BARGE_IN_ENABLED: bool = os.getenv("BARGE_IN_ENABLED", "True").lower() == "true"
+
+    # Seconds of PCM history kept per voice session (must cover the longest utterance)
+    AUDIO_BUFFER_SECONDS: float = float(os.getenv("AUDIO_BUFFER_SECONDS", "30"))
+
+    # Voice WebSocket work queue: per-session depth and backpressure policy
+    # ("coalesce" merges queued PCM chunks, "drop_oldest" drops queued audio)
+    WS_QUEUE_MAXSIZE: int = int(os.getenv("WS_QUEUE_MAXSIZE", "32"))
+    WS_BACKPRESSURE_POLICY: str = os.getenv("WS_BACKPRESSURE_POLICY", "coalesce")
+    WS_COALESCE_MAX_BYTES: int = int(os.getenv("WS_COALESCE_MAX_BYTES", str(512 * 1024)))
+
+    # Utterance endpointing settings (milliseconds)
+    ENDPOINT_PRE_ROLL_MS: int = int(os.getenv("ENDPOINT_PRE_ROLL_MS", "300"))
+    ENDPOINT_ONSET_MS: int = int(os.getenv("ENDPOINT_ONSET_MS", "90"))
+    ENDPOINT_HANGOVER_MS: int = int(os.getenv("ENDPOINT_HANGOVER_MS", "200"))
+    ENDPOINT_END_SILENCE_MS: int = int(os.getenv("ENDPOINT_END_SILENCE_MS", "800"))
+    ENDPOINT_MIN_SPEECH_MS: int = int(os.getenv("ENDPOINT_MIN_SPEECH_MS", "250"))
+    ENDPOINT_MAX_UTTERANCE_MS: int = int(os.getenv("ENDPOINT_MAX_UTTERANCE_MS", "15000"))
+
+    # Hospital geo index: grid cell size in degrees (0.1 is about 11 km) and the
+    # default radius of a nearby-hospital search
+    GEO_GRID_CELL_DEGREES: float = float(os.getenv("GEO_GRID_CELL_DEGREES", "0.1"))
+    HOSPITAL_SEARCH_RADIUS_KM: float = float(os.getenv("HOSPITAL_SEARCH_RADIUS_KM", "50"))
+
+    # Fuzzy city matching for misheard names ("bangaluru"): lowest accepted
+    # similarity (1 - edits / length) and time budget per lookup (0 disables)
+    LOCATION_FUZZY_MIN_SIMILARITY: float = float(os.getenv("LOCATION_FUZZY_MIN_SIMILARITY", "0.8"))
+    LOCATION_FUZZY_BUDGET_MS: float = float(os.getenv("LOCATION_FUZZY_BUDGET_MS", "5"))
+
+    # Hospital records: SQLite store built by tools/build_hospital_store.py (the
+    # bundled data when empty), re-read this often when the file changes (0 disables)
+    HOSPITAL_STORE_PATH: str = os.getenv("HOSPITAL_STORE_PATH", "")
+    HOSPITAL_STORE_POLL_SECONDS: float = float(os.getenv("HOSPITAL_STORE_POLL_SECONDS", "30"))
+
     # Supported languages
     SUPPORTED_LANGUAGES = {
         'en': {'stt': 'en-IN', 'tts': 'en', 'name': 'English'},
@@ -5,11 +5,13 @@ FastAPI Backend for Voice Assistant Health System
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse, FileResponse
+from starlette.background import BackgroundTask
 import uvicorn
 from typing import Optional, List
 import os
 import json
 import asyncio
+import base64
 import logging
 from dotenv import load_dotenv
 
@@ -19,11 +21,18 @@ load_dotenv()
 # Import custom modules
 from services.voice_assistant import VoiceAssistantService
 from services.realtime_voice import RealTimeVoiceAgent
+from services.tts_cache import tts_cache
+from services.stt_client import stt_client
+from services import ws_protocol
+from services.session_queue import SessionWorkQueue
+from services.audio_decoder import decoder_pool, format_from_content_type, resolve_format
+from services.hospital_store import hospital_store
 from models.schemas import (
     ChatRequest, 
     ChatResponse, 
     HospitalSearchRequest, 
     HospitalSearchResponse,
+    NearbyHospitalRequest,
     LanguageSelection,
     VoiceProcessRequest
 )
@@ -56,20 +65,83 @@ realtime_agent = RealTimeVoiceAgent()
 class ConnectionManager:
     def __init__(self):
         self.active_connections: dict = {}
+        # Sessions that negotiated the binary audio subprotocol
+        self.binary_sessions: set = set()
+        # Per-session work queues and send locks (the reader and worker both send)
+        self.queues: dict = {}
+        self.send_locks: dict = {}
 
     async def connect(self, websocket: WebSocket, session_id: str):
-        await websocket.accept()
+        if ws_protocol.SUBPROTOCOL in websocket.scope.get("subprotocols", []):
+            await websocket.accept(subprotocol=ws_protocol.SUBPROTOCOL)
+            self.binary_sessions.add(session_id)
+        else:
+            await websocket.accept()
+            self.binary_sessions.discard(session_id)
         self.active_connections[session_id] = websocket
-        logger.info(f"WebSocket connected: {session_id}")
+        self.queues[session_id] = SessionWorkQueue()
+        self.send_locks[session_id] = asyncio.Lock()
+        logger.info(f"WebSocket connected: {session_id} (binary audio: {session_id in self.binary_sessions})")
 
     def disconnect(self, session_id: str):
         if session_id in self.active_connections:
             del self.active_connections[session_id]
+            self.binary_sessions.discard(session_id)
+            self.queues.pop(session_id, None)
+            self.send_locks.pop(session_id, None)
             logger.info(f"WebSocket disconnected: {session_id}")
 
     async def send_message(self, session_id: str, message: dict):
         if session_id in self.active_connections:
-            await self.active_connections[session_id].send_text(json.dumps(message))
+            async with self.send_locks[session_id]:
+                await self.active_connections[session_id].send_text(json.dumps(message))
+
+    def get_queue_stats(self, session_id: str) -> Optional[dict]:
+        queue = self.queues.get(session_id)
+        return queue.get_stats() if queue else None
+
+    async def send_audio_message(
+        self,
+        session_id: str,
+        message_type: str,
+        data: dict,
+        audio: bytes,
+        audio_field: str = "audio",
+        kind: int = ws_protocol.KIND_AUDIO_REPLY,
+        sequence: int = 0,
+        flags: int = 0,
+        encoded: Optional[str] = None
+    ):
+        """Send a message carrying MP3 audio
+
+        Binary sessions get the JSON message with an empty audio field, followed by
+        the raw audio as a binary frame; JSON sessions get the audio base64-encoded
+        (or the already encoded copy, if given).
+        """
+        if session_id not in self.active_connections:
+            return
+
+        if session_id not in self.binary_sessions:
+            if encoded is None:
+                encoded = base64.b64encode(audio).decode('utf-8') if audio else ""
+            await self.send_message(session_id, {"type": message_type, "data": {**data, audio_field: encoded}})
+            return
+
+        websocket = self.active_connections[session_id]
+        # The JSON message and its audio frame must not be split by another send
+        async with self.send_locks[session_id]:
+            await websocket.send_text(json.dumps({
+                "type": message_type,
+                "data": {
+                    **data,
+                    audio_field: "",
+                    "audio_binary": bool(audio),
+                    "audio_sequence": sequence,
+                    "audio_size": len(audio)
+                }
+            }))
+            if audio:
+                await websocket.send_bytes(ws_protocol.pack_frame(kind, ws_protocol.CODEC_MP3, sequence, audio, flags))
 
 manager = ConnectionManager()
 
@@ -91,17 +163,205 @@ async def websocket_voice_endpoint(websocket: WebSocket, session_id: str):
     Real-time voice communication WebSocket endpoint
     
     Message formats:
-    - Start session: {"type": "start", "language": "en"}
-    - Audio chunk: {"type": "audio", "data": "base64_audio_data"} or {"type": "voice_data", "audio": "base64_audio_data"}
+    - Start session: {"type": "start", "language": "en", "stream": false, "vad_aggressiveness": 2, "input_format": "webm"}
+    - Audio chunk: {"type": "audio", "data": "base64_audio_data", "format": "pcm"} or {"type": "voice_data", "audio": "base64_audio_data"} ("format" is optional: pcm/webm/ogg/wav)
+    - Text message: {"type": "text_message", "message": "...", "language": "en", "stream": false}
     - End session: {"type": "end"}
+
+    Binary audio: clients that request the "medimitra.audio.v1" subprotocol can
+    send audio as binary frames (8-byte header from services/ws_protocol.py +
+    raw payload) instead of base64 JSON. They also receive reply audio as binary
+    frames: each audio-carrying JSON message (audio_response,
+    conversation_response, audio_chunk) arrives with an empty audio field and
+    "audio_binary": true, immediately followed by the MP3 frame.
+
+    Audio is either a complete recording (WebM/Ogg/WAV), answered as one
+    utterance, or a stream of raw 16 kHz 16-bit mono PCM chunks, which are
+    endpointed server-side: a reply is produced only once the speaker pauses.
+    A session started with "input_format" ("webm"/"ogg") instead streams one
+    continuous container (e.g. MediaRecorder timeslices); its chunks are decoded
+    to PCM as they arrive by a long-lived ffmpeg process and endpointed the same way.
+
+    With "stream": true the partial AI reply is sent as it arrives in
+    {"type": "ai_response_delta", "data": {"delta": "...", "index": n}} messages,
+    followed by the usual conversation_response once the reply is complete.
+    For audio input the spoken reply is also streamed sentence by sentence as
+    {"type": "audio_chunk", "data": {"index": n, "text": "...", "audio": "base64_mp3"}}
+    messages in playback order, ending with {"type": "audio_stream_end"}.
+
+    With a streaming STT backend (e.g. vosk), streamed PCM is transcribed while
+    the caller speaks: {"type": "partial_transcript", "data": {"text": "...",
+    "stable_text": "..."}} messages go out as the text changes (stable_text is
+    the prefix that has stopped changing), and the AI reply is drafted on a
+    stable partial so it is ready when the utterance closes.
+
+    Spoken replies are generated in the background. If the caller starts
+    speaking (or sends a new recording) before a reply is delivered, the reply
+    is cancelled and {"type": "interrupted", "data": {"reason": "barge_in",
+    "stage": "stt" | "llm" | "tts"}} is sent instead; clients should stop any
+    reply audio they are still playing.
+
+    Audio and text messages are queued and processed by a per-session worker
+    while this handler keeps reading, so a slow reply never stalls the socket.
+    If the worker falls behind, queued PCM chunks are coalesced (or the oldest
+    audio is dropped, per WS_BACKPRESSURE_POLICY); text messages and chunks of
+    an input_format stream are never dropped. "status" replies include the
+    queue depth and backpressure counters.
     """
     await manager.connect(websocket, session_id)
+    queue = manager.queues[session_id]
+    
+    async def emit(event_type: str, data: dict):
+        if event_type == "audio_chunk":
+            await manager.send_audio_message(
+                session_id, 
+                event_type, 
+                data, 
+                data.get("audio", b""),
+                kind=ws_protocol.KIND_AUDIO_CHUNK,
+                sequence=data.get("index", 0)
+            )
+        elif event_type == "conversation_response":
+            await send_conversation_response(data)
+        else:
+            await manager.send_message(session_id, {"type": event_type, "data": data})
+    
+    async def send_conversation_response(result: dict):
+        logger.info(f"🤖 AI response generated: {result.get('ai_response', '')[:100]}...")
+        await manager.send_audio_message(
+            session_id, 
+            "conversation_response", 
+            {
+                "transcription": result.get("transcription", ""),
+                "ai_response": result.get("ai_response", ""),
+                "audio_streamed": result.get("audio_streamed", False),
+                "emergency_level": result.get("emergency_level", "none"),
+                "requires_hospital": result.get("requires_hospital", False)
+            },
+            result.get("audio_bytes", b""),
+            audio_field="audio_response"
+        )
+        logger.info(f"✅ Conversation response sent")
+    
+    async def handle_audio(audio_data, audio_format: Optional[str] = None):
+        try:
+            result = await realtime_agent.process_audio_chunk(session_id, audio_data, audio_format)
+            logger.info(f"🎤 Audio processing result: {list(result.keys())}")
+            
+            # Send real-time status (reply audio only goes out with the conversation response)
+            await manager.send_message(session_id, {
+                "type": "audio_processed",
+                "data": {key: value for key, value in result.items() if key != "audio_bytes"}
+            })
+            logger.info(f"📤 Audio processed status sent")
+            
+            # Replies normally arrive later through emit; send one returned inline
+            if "ai_response" in result:
+                await send_conversation_response(result)
+                
+        except Exception as audio_error:
+            logger.error(f"❌ Error processing audio: {audio_error}")
+            await manager.send_message(session_id, {
+                "type": "error",
+                "data": {"error": f"Audio processing failed: {str(audio_error)}"}
+            })
+    
+    async def handle_text(message: dict):
+        text_content = message["message"]
+        language = message.get("language", "en")
+        
+        logger.info(f"💬 Text received: {text_content}")
+        
+        try:
+            # Process as text input instead of audio
+            stream = message.get("stream")
+            result = await realtime_agent.process_text_input(
+                session_id, 
+                text_content, 
+                language,
+                stream=bool(stream) if stream is not None else None
+            )
+            logger.info(f"💬 Text processing result: {list(result.keys())}")
+            
+            # Send response
+            await manager.send_message(session_id, {
+                "type": "conversation_response", 
+                "data": {
+                    "transcription": text_content,
+                    "ai_response": result.get("ai_response", ""),
+                    "audio_response": result.get("audio_response", ""),
+                    "emergency_level": result.get("emergency_level", "none"),
+                    "requires_hospital": result.get("requires_hospital", False)
+                }
+            })
+            logger.info(f"✅ Text response sent")
+            
+        except Exception as text_error:
+            logger.error(f"❌ Error processing text: {text_error}")
+            await manager.send_message(session_id, {
+                "type": "error",
+                "data": {"error": f"Text processing failed: {str(text_error)}"}
+            })
+    
+    def enqueue_audio(audio_data, declared_format: Optional[str]):
+        # Label the chunk with the format it will be decoded as (headerless audio
+        # without a declared format is PCM), so the backpressure policy sees it
+        # the way the decoder will; chunks of a container stream must never be dropped
+        input_format = realtime_agent.get_input_format(session_id)
+        if input_format:
+            queue.put_nowait({"type": "audio", "data": audio_data, "format": input_format, "stream": True})
+        else:
+            queue.put_nowait({"type": "audio", "data": audio_data, "format": resolve_format(audio_data, declared_format)})
+    
+    async def process_queue():
+        # Worker: STT/LLM/TTS for queued audio and text, in arrival order, while
+        # the reader keeps draining the socket
+        while True:
+            item = await queue.get()
+            try:
+                if item["type"] == "audio":
+                    await handle_audio(item["data"], item["format"])
+                else:
+                    await handle_text(item["message"])
+            except Exception as e:
+                # e.g. the error reply itself failed to send; keep serving the queue
+                logger.error(f"❌ Session worker failed on a queued {item['type']} item: {e}")
+    
+    async def stop_worker():
+        worker.cancel()
+        try:
+            await worker
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"❌ Session worker for {session_id} died: {e}")
+    
+    worker = asyncio.create_task(process_queue())
     
     try:
         while True:
             # Receive message from client
             logger.info(f"🔄 Waiting for WebSocket message from {session_id}")
-            data = await websocket.receive_text()
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", 1000))
+            
+            if frame.get("bytes") is not None:
+                # Binary audio frame: header + raw audio, no base64/JSON round trip
+                try:
+                    header, payload = ws_protocol.parse_frame(frame["bytes"])
+                except ValueError as e:
+                    logger.error(f"❌ Invalid binary frame: {e}")
+                    continue
+                
+                if header.kind != ws_protocol.KIND_AUDIO_IN:
+                    logger.warning(f"❓ Unexpected binary frame kind: {header.kind}")
+                    continue
+                
+                enqueue_audio(payload, header.codec_name)
+                continue
+            
+            data = frame.get("text") or ""
             logger.info(f"📥 Received raw data length: {len(data)} chars")
             
             try:
@@ -118,7 +378,14 @@ async def websocket_voice_endpoint(websocket: WebSocket, session_id: str):
                 # Start voice session
                 language = message.get("language", "en")
                 logger.info(f"🚀 Starting voice session with language: {language}")
-                result = await realtime_agent.start_voice_session(session_id, language)
+                result = await realtime_agent.start_voice_session(
+                    session_id, 
+                    language,
+                    stream=bool(message.get("stream", False)),
+                    emit=emit,
+                    vad_aggressiveness=message.get("vad_aggressiveness"),
+                    input_format=message.get("input_format")
+                )
                 
                 await manager.send_message(session_id, {
                     "type": "session_started",
@@ -126,34 +393,26 @@ async def websocket_voice_endpoint(websocket: WebSocket, session_id: str):
                 })
                 logger.info(f"✅ Session started response sent")
                 
-                # Send greeting audio
+                # Send greeting audio (pre-rendered by the phrase bank at startup)
                 if result.get("greeting"):
-                    logger.info(f"🎵 Generating greeting audio...")
-                    greeting_audio = await voice_service.text_to_speech(
-                        result["greeting"], 
-                        language
-                    )
-                    
-                    # Convert to base64 and send
-                    import base64
-                    with open(greeting_audio, 'rb') as f:
-                        audio_b64 = base64.b64encode(f.read()).decode()
+                    greeting = await realtime_agent.phrase_bank.get_or_render("greeting", language)
                     
-                    logger.info(f"🎵 Greeting audio generated, size: {len(audio_b64)} chars")
-                    await manager.send_message(session_id, {
-                        "type": "audio_response",
-                        "data": {
-                            "audio": audio_b64,
+                    logger.info(f"🎵 Greeting audio ready, size: {len(greeting['audio_bytes'])} bytes")
+                    await manager.send_audio_message(
+                        session_id, 
+                        "audio_response", 
+                        {
                             "text": result["greeting"],
                             "language": language
-                        }
-                    })
+                        },
+                        greeting["audio_bytes"],
+                        encoded=greeting["audio"]
+                    )
                     logger.info(f"✅ Greeting audio sent")
             
             elif message_type in ["audio", "voice_data"]:
                 # Process audio chunk - support both message formats
                 logger.info(f"🎤 Processing audio message type: {message_type}")
-                import base64
                 audio_data_b64 = message.get("data") or message.get("audio")
                 
                 if not audio_data_b64:
@@ -165,92 +424,45 @@ async def websocket_voice_endpoint(websocket: WebSocket, session_id: str):
                 
                 try:
                     audio_data = base64.b64decode(audio_data_b64)
-                    logger.info(f"🎤 Decoded audio data: {len(audio_data)} bytes")
-                    
-                    result = await realtime_agent.process_audio_chunk(session_id, audio_data)
-                    logger.info(f"🎤 Audio processing result: {list(result.keys())}")
-                    
-                    # Send real-time status
-                    await manager.send_message(session_id, {
-                        "type": "audio_processed",
-                        "data": result
-                    })
-                    logger.info(f"📤 Audio processed status sent")
-                    
-                    # If we got a complete response, send it
-                    if "ai_response" in result:
-                        logger.info(f"🤖 AI response generated: {result.get('ai_response', '')[:100]}...")
-                        await manager.send_message(session_id, {
-                            "type": "conversation_response",
-                            "data": {
-                                "transcription": result.get("transcription", ""),
-                                "ai_response": result.get("ai_response", ""),
-                                "audio_response": result.get("audio_response", ""),
-                                "emergency_level": result.get("emergency_level", "none"),
-                                "requires_hospital": result.get("requires_hospital", False)
-                            }
-                        })
-                        logger.info(f"✅ Conversation response sent")
-                        
-                except Exception as audio_error:
-                    logger.error(f"❌ Error processing audio: {audio_error}")
+                except ValueError as decode_error:
+                    logger.error(f"❌ Invalid base64 audio: {decode_error}")
                     await manager.send_message(session_id, {
                         "type": "error",
-                        "data": {"error": f"Audio processing failed: {str(audio_error)}"}
+                        "data": {"error": f"Audio processing failed: {str(decode_error)}"}
                     })
+                    continue
+                
+                logger.info(f"🎤 Decoded audio data: {len(audio_data)} bytes")
+                enqueue_audio(audio_data, message.get("format"))
             
             elif message_type == "text_message":
                 # Process text message (fallback for when voice isn't working)
-                logger.info(f"💬 Processing text message")
-                text_content = message.get("message", "")
-                language = message.get("language", "en")
+                logger.info(f"💬 Queueing text message")
                 
-                if not text_content:
+                if not message.get("message"):
                     logger.warning("⚠️ No text content received")
                     continue
                 
-                logger.info(f"💬 Text received: {text_content}")
-                
-                try:
-                    # Process as text input instead of audio
-                    result = await realtime_agent.process_text_input(session_id, text_content, language)
-                    logger.info(f"💬 Text processing result: {list(result.keys())}")
-                    
-                    # Send response
-                    await manager.send_message(session_id, {
-                        "type": "conversation_response", 
-                        "data": {
-                            "transcription": text_content,
-                            "ai_response": result.get("ai_response", ""),
-                            "audio_response": result.get("audio_response", ""),
-                            "emergency_level": result.get("emergency_level", "none"),
-                            "requires_hospital": result.get("requires_hospital", False)
-                        }
-                    })
-                    logger.info(f"✅ Text response sent")
-                    
-                except Exception as text_error:
-                    logger.error(f"❌ Error processing text: {text_error}")
-                    await manager.send_message(session_id, {
-                        "type": "error",
-                        "data": {"error": f"Text processing failed: {str(text_error)}"}
-                    })
+                queue.put_nowait({"type": "text", "message": message})
             
             elif message_type == "end":
                 # End voice session
                 logger.info(f"🔚 Ending voice session")
+                await stop_worker()
                 result = await realtime_agent.end_voice_session(session_id)
                 await manager.send_message(session_id, {
                     "type": "session_ended",
                     "data": result
                 })
                 logger.info(f"✅ Session ended")
+                manager.disconnect(session_id)
                 break
             
             elif message_type == "status":
                 # Get session status
                 logger.info(f"📊 Status request")
                 status = await realtime_agent.get_session_status(session_id)
+                status["queue"] = queue.get_stats()
                 await manager.send_message(session_id, {
                     "type": "status_update",
                     "data": status
@@ -262,6 +474,7 @@ async def websocket_voice_endpoint(websocket: WebSocket, session_id: str):
                 logger.warning(f"Full message: {message}")
                 
     except WebSocketDisconnect:
+        await stop_worker()
         manager.disconnect(session_id)
         await realtime_agent.end_voice_session(session_id)
         logger.info(f"🔌 WebSocket disconnected: {session_id}")
@@ -278,8 +491,11 @@ async def websocket_voice_endpoint(websocket: WebSocket, session_id: str):
         except:
             pass  # Connection might be closed
         finally:
+            await stop_worker()
             manager.disconnect(session_id)
             await realtime_agent.end_voice_session(session_id)
+    finally:
+        worker.cancel()
 
 # ===== TRADITIONAL REST API ENDPOINTS (for backward compatibility) =====
 
@@ -313,22 +529,14 @@ async def chat_with_voice(
         if not audio.content_type or not audio.content_type.startswith('audio/'):
             raise HTTPException(status_code=400, detail="File must be audio format")
         
-        # Save uploaded audio temporarily
-        audio_path = f"temp_audio_{session_id or 'default'}.wav"
-        with open(audio_path, "wb") as buffer:
-            content = await audio.read()
-            buffer.write(content)
-        
+        # Decode and transcribe the upload in memory
         response = await voice_service.process_voice_message(
-            audio_path=audio_path,
+            audio_data=await audio.read(),
             language=language,
-            session_id=session_id
+            session_id=session_id,
+            audio_format=format_from_content_type(audio.content_type)
         )
         
-        # Clean up temporary audio file
-        if os.path.exists(audio_path):
-            os.remove(audio_path)
-            
         return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -342,6 +550,24 @@ async def search_hospitals(request: HospitalSearchRequest):
         response = await voice_service.search_hospitals(
             city=request.city,
             emergency_required=request.emergency_required,
+            max_results=request.max_results,
+            specialty=request.specialty
+        )
+        return response
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/hospitals/nearby", response_model=HospitalSearchResponse)
+async def search_nearby_hospitals(request: NearbyHospitalRequest):
+    """
+    Find the hospitals closest to a latitude/longitude, nearest first with distance in km
+    """
+    try:
+        response = await voice_service.search_nearby_hospitals(
+            latitude=request.latitude,
+            longitude=request.longitude,
+            radius_km=request.radius_km,
+            emergency_required=request.emergency_required,
             max_results=request.max_results
         )
         return response
@@ -363,22 +589,62 @@ async def get_emergency_hospitals(city: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/hospitals/reload")
+async def reload_hospitals():
+    """
+    Re-read the hospital store and swap it in without a restart (this worker only;
+    other workers pick the file up on their next poll)
+    """
+    if not hospital_store.path:
+        raise HTTPException(status_code=400, detail="No HOSPITAL_STORE_PATH configured; using bundled data")
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(None, hospital_store.reload)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed, previous data kept: {e}")
+    return hospital_store.get_stats()
+
+@app.get("/hospitals/stats")
+async def get_hospital_stats():
+    """
+    Get the source, size and reload history of the hospital data
+    """
+    return hospital_store.get_stats()
+
 @app.post("/tts/generate")
-async def generate_speech(text: str, language: str):
+async def generate_speech(text: str, language: str, speed: float = 1.0):
     """
     Generate speech from text
     """
     try:
-        audio_path = await voice_service.text_to_speech(text, language)
+        audio_path = await voice_service.text_to_speech(text, language, speed)
+        if not audio_path:
+            raise HTTPException(status_code=500, detail="Speech generation failed")
         return FileResponse(
             audio_path,
             media_type="audio/mpeg",
             filename="response.mp3",
-            background=True  # Delete file after sending
+            background=BackgroundTask(os.remove, audio_path)  # Delete file after sending
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/tts/cache/stats")
+async def get_tts_cache_stats():
+    """
+    Get TTS audio cache hit/miss statistics
+    """
+    return tts_cache.get_stats()
+
+@app.get("/stt/stats")
+async def get_stt_stats():
+    """
+    Get speech recognition latency, hedging and error budget statistics
+    """
+    return stt_client.get_stats()
+
 @app.post("/stt/transcribe")
 async def transcribe_audio(
     audio: UploadFile = File(...),
@@ -391,18 +657,13 @@ async def transcribe_audio(
         if not audio.content_type or not audio.content_type.startswith('audio/'):
             raise HTTPException(status_code=400, detail="File must be audio format")
         
-        # Save uploaded audio temporarily
-        audio_path = f"temp_transcribe_{hash(audio.filename)}.wav"
-        with open(audio_path, "wb") as buffer:
-            content = await audio.read()
-            buffer.write(content)
-        
-        transcription = await voice_service.speech_to_text(audio_path, language)
+        # Decode and transcribe the upload in memory
+        transcription = await voice_service.transcribe_audio(
+            await audio.read(),
+            language,
+            format_from_content_type(audio.content_type)
+        )
         
-        # Clean up temporary audio file
-        if os.path.exists(audio_path):
-            os.remove(audio_path)
-            
         return {"transcription": transcription}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -470,6 +731,9 @@ async def get_voice_session_status(session_id: str):
     """
     try:
         status = await realtime_agent.get_session_status(session_id)
+        queue_stats = manager.get_queue_stats(session_id)
+        if queue_stats and "error" not in status:
+            status["queue"] = queue_stats
         return status
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -492,6 +756,17 @@ async def startup_event():
     """Initialize background tasks"""
     # Start cleanup task for inactive sessions
     asyncio.create_task(cleanup_inactive_sessions())
+    # Pre-render greetings and fallback replies for every language, retrying failures
+    asyncio.create_task(realtime_agent.phrase_bank.retry_failed_renders())
+    # Pick up a rebuilt hospital store without restarting workers
+    asyncio.create_task(hospital_store.watch())
+    # Pre-spawn ffmpeg decoders so compressed audio doesn't pay process start-up
+    await decoder_pool.warm_up()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background processes"""
+    await decoder_pool.close()
 
 async def cleanup_inactive_sessions():
     """Background task to cleanup inactive sessions"""
@@ -10,12 +10,17 @@ import base64
 import json
 from io import BytesIO
 import pandas as pd
+import sys
 from hospital_data import INDIAN_HOSPITALS, EMERGENCY_CONDITIONS
 from voice_components import (
     VoiceProcessor, AudioPlayer, voice_input_component, 
     audio_response_component, continuous_voice_mode, voice_settings_component
 )
 
+# The location resolver is shared with the API server in the parent directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.location_resolver import LocationResolver
+
 # --- STREAMLIT CONFIG ---
 st.set_page_config(
     page_title="AI Health Agent - MediMitra",
@@ -104,34 +109,13 @@ You must classify the user's condition into one of four categories:
 Always ask for location when hospital care is recommended to provide specific hospital information.
 """
 
+# Compiled once: resolves free-text locations to INDIAN_HOSPITALS city keys
+location_resolver = LocationResolver.from_hospitals(INDIAN_HOSPITALS)
+
 def find_nearest_hospitals(city, emergency_required=False, max_results=3):
     """Find nearest hospitals in a given city"""
-    city_lower = city.lower().strip()
-    
-    # Try to match city name
-    matched_city = None
-    for city_key in INDIAN_HOSPITALS.keys():
-        if city_lower in city_key or city_key in city_lower:
-            matched_city = city_key
-            break
-    
-    if not matched_city:
-        # Try partial matching for major cities
-        city_mappings = {
-            'mumbai': ['bombay', 'mumbai', 'bandra', 'andheri', 'mahim', 'worli', 'colaba', 'powai'],
-            'delhi': ['new delhi', 'delhi', 'ncr', 'gurgaon', 'noida'],
-            'bangalore': ['bengaluru', 'bangalore', 'whitefield', 'koramangala'],
-            'chennai': ['madras', 'chennai', 'anna nagar', 'velachery'],
-            'kolkata': ['calcutta', 'kolkata', 'salt lake'],
-            'hyderabad': ['hyderabad', 'secunderabad', 'hitech city'],
-            'pune': ['pune', 'poona', 'baner', 'hinjewadi'],
-            'ahmedabad': ['ahmedabad', 'amdavad', 'sg highway']
-        }
-        
-        for city_key, variations in city_mappings.items():
-            if any(variation in city_lower for variation in variations):
-                matched_city = city_key
-                break
+    # City names, localities, native-script names and pincodes in one pass
+    matched_city = location_resolver.resolve(city)
     
     if not matched_city:
         return None, f"Sorry, I don't have hospital data for {city}. Please try a major city like Mumbai, Delhi, Bangalore, Chennai, Kolkata, Hyderabad, Pune, or Ahmedabad."
@@ -2,7 +2,7 @@
 Pydantic models for API request/response schemas
 """
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
@@ -35,6 +35,14 @@ class HospitalSearchRequest(BaseModel):
     city: str
     emergency_required: bool = False
     max_results: int = 3
+    specialty: Optional[str] = None  # e.g. "Cardiology"; any when None
+
+class NearbyHospitalRequest(BaseModel):
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    radius_km: Optional[float] = Field(None, gt=0)  # None: HOSPITAL_SEARCH_RADIUS_KM
+    emergency_required: bool = False
+    max_results: int = Field(5, ge=1, le=100)
 
 class HospitalSearchResponse(BaseModel):
     hospitals: List[HospitalInfo]
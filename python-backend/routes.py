@@ -4,15 +4,15 @@ API Routes for different endpoints
 
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form
 from typing import Optional
-import tempfile
-import os
 
 from services.voice_assistant import VoiceAssistantService
+from services.audio_decoder import format_from_content_type
 from models.schemas import (
     ChatRequest, 
     ChatResponse, 
     HospitalSearchRequest, 
-    HospitalSearchResponse
+    HospitalSearchResponse,
+    NearbyHospitalRequest
 )
 
 # Initialize router
@@ -45,22 +45,14 @@ async def voice_chat_endpoint(
         if not audio.content_type.startswith('audio/'):
             raise HTTPException(status_code=400, detail="File must be audio format")
         
-        # Save uploaded audio temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_file:
-            content = await audio.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
-        
+        # Decode and transcribe the upload in memory
         response = await voice_service.process_voice_message(
-            audio_path=temp_file_path,
+            audio_data=await audio.read(),
             language=language,
-            session_id=session_id
+            session_id=session_id,
+            audio_format=format_from_content_type(audio.content_type)
         )
         
-        # Clean up temporary file
-        if os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
-            
         return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -72,8 +64,24 @@ async def search_hospitals_endpoint(request: HospitalSearchRequest):
         response = await voice_service.search_hospitals(
             city=request.city,
             emergency_required=request.emergency_required,
+            max_results=request.max_results,
+            specialty=request.specialty
+        )
+        return response
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/hospitals/nearby", response_model=HospitalSearchResponse)
+async def nearby_hospitals_endpoint(request: NearbyHospitalRequest):
+    """Find the hospitals closest to a location"""
+    try:
+        response = await voice_service.search_nearby_hospitals(
+            latitude=request.latitude,
+            longitude=request.longitude,
+            radius_km=request.radius_km,
+            emergency_required=request.emergency_required,
             max_results=request.max_results
         )
         return response
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
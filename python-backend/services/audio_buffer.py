@@ -0,0 +1,79 @@
+"""
+Audio Ring Buffer
+Fixed-capacity, preallocated per-session PCM history addressed by absolute stream
+offsets, so a long call keeps a constant memory footprint
+"""
+
+from typing import Dict, List, Union
+
+class AudioRingBuffer:
+    def __init__(self, capacity_bytes: int):
+        """Preallocate the ring; capacity is rounded down to whole 16-bit samples"""
+        if capacity_bytes < 2:
+            raise ValueError("Audio buffer capacity must hold at least one sample")
+        self.capacity = capacity_bytes - capacity_bytes % 2
+        self._buffer = bytearray(self.capacity)
+        self._view = memoryview(self._buffer)
+
+        # Absolute number of bytes ever written; the ring holds the last `capacity` of them
+        self.total_written = 0
+
+    @classmethod
+    def for_duration(cls, seconds: float, sample_rate: int = 16000, sample_width: int = 2) -> "AudioRingBuffer":
+        """Ring sized for a number of seconds of mono PCM"""
+        return cls(int(seconds * sample_rate) * sample_width)
+
+    @property
+    def start_offset(self) -> int:
+        """Oldest absolute offset still held in the ring"""
+        return max(0, self.total_written - self.capacity)
+
+    def __len__(self) -> int:
+        return self.total_written - self.start_offset
+
+    def write(self, data: Union[bytes, bytearray, memoryview]):
+        """Append data, overwriting the oldest bytes once the ring is full"""
+        data = memoryview(data).cast('B')
+        if len(data) > self.capacity:
+            # Only the tail can survive anyway
+            self.total_written += len(data) - self.capacity
+            data = data[-self.capacity:]
+
+        position = self.total_written % self.capacity
+        first = min(len(data), self.capacity - position)
+        self._view[position:position + first] = data[:first]
+        if first < len(data):
+            self._view[:len(data) - first] = data[first:]
+        self.total_written += len(data)
+
+    def views(self, start: int, end: int) -> List[memoryview]:
+        """Zero-copy views of the absolute range [start, end): one view, or two if it wraps
+
+        Views alias the ring and are only valid until the range is overwritten.
+        """
+        if start < self.start_offset or end > self.total_written or start > end:
+            raise ValueError(
+                f"Range [{start}, {end}) is outside the buffered audio "
+                f"[{self.start_offset}, {self.total_written})"
+            )
+        if start == end:
+            return []
+
+        first = start % self.capacity
+        last = first + (end - start)
+        if last <= self.capacity:
+            return [self._view[first:last]]
+        return [self._view[first:], self._view[:last - self.capacity]]
+
+    def read(self, start: int, end: int) -> bytes:
+        """Copy the absolute range [start, end) out of the ring"""
+        return b"".join(self.views(start, end))
+
+    def get_stats(self) -> Dict[str, int]:
+        """Memory accounting for status reporting"""
+        return {
+            'capacity_bytes': self.capacity,
+            'buffered_bytes': len(self),
+            'total_bytes_received': self.total_written,
+            'overwritten_bytes': self.start_offset
+        }
@@ -0,0 +1,440 @@
+"""
+Audio Decoder Service
+Decodes client audio (raw PCM, WAV, WebM/Opus, Ogg/Opus, MP3) to 16 kHz 16-bit
+mono PCM without touching disk or blocking the event loop
+
+The format is sniffed from the leading bytes and each one takes the cheapest
+correct route: raw PCM and 16 kHz mono WAV pass through as zero-copy views,
+Opus in WebM/Ogg is demuxed and decoded in-process when opuslib is installed,
+and everything else goes to ffmpeg.
+
+Complete recordings are decoded by a pool of pre-spawned ffmpeg processes, which
+keeps process start-up off the request path. A session that streams container
+audio (e.g. MediaRecorder timeslices, where only the first chunk carries the
+header) gets one long-lived ffmpeg process that decodes as chunks arrive.
+"""
+
+import asyncio
+import io
+import logging
+import shutil
+import time
+import wave
+from typing import Any, Dict, List, Optional, Set, Union
+
+from config import settings
+from .opus_demux import DemuxError, demux_ogg, demux_webm
+
+logger = logging.getLogger(__name__)
+
+try:
+    import opuslib
+    OPUS_AVAILABLE = True
+except Exception:  # opuslib raises at import when libopus itself is missing
+    OPUS_AVAILABLE = False
+    print("Warning: opuslib not available. Opus recordings will be decoded with ffmpeg.")
+
+FFMPEG_PATH = shutil.which(settings.FFMPEG_BINARY)
+FFMPEG_AVAILABLE = FFMPEG_PATH is not None
+
+if not FFMPEG_AVAILABLE:
+    print("Warning: ffmpeg not found. Compressed (WebM/Ogg/MP3) voice audio cannot be decoded.")
+
+# ffmpeg demuxer for each declared input format; one-shot decodes probe the input instead
+FFMPEG_DEMUXERS = {
+    'webm': 'matroska',
+    'ogg': 'ogg',
+    'wav': 'wav',
+    'mp3': 'mp3'
+}
+
+# Leading bytes of each container format
+FORMAT_SIGNATURES = (
+    (b"RIFF", 'wav'),
+    (b"\x1a\x45\xdf\xa3", 'webm'),  # EBML header
+    (b"OggS", 'ogg'),
+    (b"ID3", 'mp3')
+)
+
+# Declared format for uploads, by MIME type (parameters such as ";codecs=opus" ignored)
+CONTENT_TYPE_FORMATS = {
+    'audio/webm': 'webm',
+    'audio/ogg': 'ogg',
+    'audio/wav': 'wav',
+    'audio/wave': 'wav',
+    'audio/x-wav': 'wav',
+    'audio/mpeg': 'mp3',
+    'audio/mp3': 'mp3',
+    'audio/l16': 'pcm'
+}
+
+class DecoderError(Exception):
+    """Raised when audio can't be decoded to PCM"""
+
+
+def sniff_format(audio_data: Union[bytes, memoryview]) -> str:
+    """Identify a chunk's container from its leading bytes ('pcm' when there is none)"""
+    head = bytes(audio_data[:4])
+    for signature, audio_format in FORMAT_SIGNATURES:
+        if head.startswith(signature):
+            return audio_format
+    return 'pcm'
+
+
+def format_from_content_type(content_type: Optional[str]) -> Optional[str]:
+    """Declared audio format of an upload from its Content-Type, if recognized"""
+    if not content_type:
+        return None
+    return CONTENT_TYPE_FORMATS.get(content_type.split(';')[0].strip().lower())
+
+
+def resolve_format(audio_data: Union[bytes, memoryview], declared: Optional[str] = None) -> str:
+    """Format a chunk should be decoded as
+
+    A recognizable container header wins over the declared format (a WAV file
+    labelled "pcm" would otherwise be fed to VAD header and all); the declared
+    format only matters for input without one, e.g. bare MP3 frames.
+    """
+    sniffed = sniff_format(audio_data)
+    if sniffed == 'pcm' and declared:
+        return declared
+    return sniffed
+
+
+def _ffmpeg_command(sample_rate: int, input_format: Optional[str] = None, low_latency: bool = False) -> List[str]:
+    command = [FFMPEG_PATH, '-hide_banner', '-loglevel', 'error']
+    if low_latency:
+        # Start decoding as soon as the container header arrives
+        command += ['-fflags', 'nobuffer', '-probesize', '4096', '-analyzeduration', '0']
+    if input_format in FFMPEG_DEMUXERS:
+        command += ['-f', FFMPEG_DEMUXERS[input_format]]
+    return command + [
+        '-i', 'pipe:0',
+        '-f', 's16le', '-acodec', 'pcm_s16le',
+        '-ac', '1', '-ar', str(sample_rate),
+        'pipe:1'
+    ]
+
+
+class StreamingDecoder:
+    def __init__(self, pool: "FFmpegDecoderPool", input_format: str):
+        """Decoder for one continuous container stream, backed by a long-lived ffmpeg process"""
+        self.pool = pool
+        self.input_format = input_format
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._pcm = bytearray()
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.returncode is None
+
+    async def start(self):
+        """Spawn the ffmpeg process and start collecting its PCM output"""
+        self._process = await self.pool._spawn(self.input_format, low_latency=True)
+        self._reader = asyncio.create_task(self._read_output())
+
+    async def feed(self, chunk: bytes) -> bytes:
+        """Write one container chunk and return whatever PCM has been decoded so far"""
+        if not self.running:
+            raise DecoderError("Streaming decoder is not running")
+
+        try:
+            self._process.stdin.write(chunk)
+            await self._process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError) as e:
+            raise DecoderError(f"ffmpeg stopped accepting audio: {e}")
+
+        self.bytes_in += len(chunk)
+        # Give the reader a turn so output that is already decoded is picked up
+        await asyncio.sleep(0)
+        return self.read_available()
+
+    def read_available(self) -> bytes:
+        """Take the decoded PCM collected so far (whole samples only)"""
+        available = len(self._pcm) - len(self._pcm) % 2
+        pcm = bytes(self._pcm[:available])
+        del self._pcm[:available]
+        return pcm
+
+    async def close(self) -> bytes:
+        """Flush the stream and stop ffmpeg, returning the last decoded PCM"""
+        if self._process is None:
+            return b""
+
+        try:
+            if self._process.returncode is None:
+                self._process.stdin.close()
+            await asyncio.wait_for(self._reader, timeout=self.pool.timeout)
+        except (asyncio.TimeoutError, BrokenPipeError, ConnectionResetError):
+            logger.warning(f"⚠️ Streaming decoder did not flush in time, stopping it")
+        finally:
+            if self._process.returncode is None:
+                self._process.kill()
+            await self._process.wait()
+            self.pool.stats['streams_closed'] += 1
+
+        return self.read_available()
+
+    async def _read_output(self):
+        while True:
+            data = await self._process.stdout.read(64 * 1024)
+            if not data:
+                break
+            self._pcm.extend(data)
+            self.bytes_out += len(data)
+
+
+class FFmpegDecoderPool:
+    def __init__(self, size: Optional[int] = None, sample_rate: int = 16000, timeout: Optional[float] = None):
+        """Initialize the pool
+
+        size ffmpeg processes are kept spawned and waiting on stdin. Each decode
+        takes one, writes the whole recording and reads PCM back until EOF; a
+        replacement is spawned in the background.
+        """
+        self.size = size if size is not None else settings.DECODER_POOL_SIZE
+        self.sample_rate = sample_rate
+        self.timeout = timeout or settings.DECODER_TIMEOUT
+
+        self._idle: List[asyncio.subprocess.Process] = []
+        self._spawning: Set[asyncio.Task] = set()
+
+        self.stats = {
+            'decodes': 0,
+            'failures': 0,
+            'timeouts': 0,
+            'spawned': 0,
+            'warm_hits': 0,
+            'cold_starts': 0,
+            'bytes_in': 0,
+            'bytes_out': 0,
+            'decode_ms_total': 0.0,
+            'streams_opened': 0,
+            'streams_closed': 0
+        }
+
+    @property
+    def available(self) -> bool:
+        return FFMPEG_AVAILABLE
+
+    async def warm_up(self):
+        """Pre-spawn the pool's processes (called at startup)"""
+        if not self.available:
+            return
+        self._replenish()
+
+    async def decode(self, audio_data: bytes, input_format: Optional[str] = None) -> bytes:
+        """Decode a complete recording to 16 kHz mono 16-bit PCM"""
+        if not self.available:
+            raise DecoderError("ffmpeg is not available")
+
+        started = time.perf_counter()
+        if input_format in FFMPEG_DEMUXERS:
+            # The pool's processes probe the input; an explicit demuxer needs its own
+            process = await self._spawn(input_format)
+            self.stats['cold_starts'] += 1
+        else:
+            process = await self._acquire()
+
+        try:
+            pcm, stderr = await asyncio.wait_for(process.communicate(audio_data), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            process.kill()
+            await process.wait()
+            raise DecoderError(f"ffmpeg decode timed out after {self.timeout}s")
+        except asyncio.CancelledError:
+            # The reply was abandoned (e.g. barge-in); don't leave ffmpeg running
+            process.kill()
+            raise
+        finally:
+            self._replenish()
+
+        if process.returncode != 0:
+            self.stats['failures'] += 1
+            raise DecoderError(f"ffmpeg exited with {process.returncode}: {stderr.decode(errors='replace').strip()}")
+
+        self.stats['decodes'] += 1
+        self.stats['bytes_in'] += len(audio_data)
+        self.stats['bytes_out'] += len(pcm)
+        self.stats['decode_ms_total'] += (time.perf_counter() - started) * 1000
+        return pcm
+
+    async def open_stream(self, input_format: str) -> StreamingDecoder:
+        """Start a long-lived decoder for a continuous container stream"""
+        if not self.available:
+            raise DecoderError("ffmpeg is not available")
+
+        decoder = StreamingDecoder(self, input_format)
+        await decoder.start()
+        self.stats['streams_opened'] += 1
+        return decoder
+
+    async def close(self):
+        """Stop the idle processes"""
+        # Let pending spawns finish first so their processes are stopped too
+        await asyncio.gather(*self._spawning, return_exceptions=True)
+        idle, self._idle = self._idle, []
+        for process in idle:
+            if process.returncode is None:
+                process.kill()
+            await process.wait()
+
+    async def _acquire(self) -> asyncio.subprocess.Process:
+        while self._idle:
+            process = self._idle.pop()
+            if process.returncode is None:
+                self.stats['warm_hits'] += 1
+                return process
+        self.stats['cold_starts'] += 1
+        return await self._spawn()
+
+    def _replenish(self):
+        missing = self.size - len(self._idle) - len(self._spawning)
+        for _ in range(max(0, missing)):
+            task = asyncio.create_task(self._spawn_idle())
+            self._spawning.add(task)
+            task.add_done_callback(self._spawning.discard)
+
+    async def _spawn_idle(self):
+        try:
+            self._idle.append(await self._spawn())
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to pre-spawn ffmpeg decoder: {e}")
+
+    async def _spawn(self, input_format: Optional[str] = None, low_latency: bool = False) -> asyncio.subprocess.Process:
+        process = await asyncio.create_subprocess_exec(
+            *_ffmpeg_command(self.sample_rate, input_format, low_latency),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL if low_latency else asyncio.subprocess.PIPE
+        )
+        self.stats['spawned'] += 1
+        return process
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool state and decode metrics"""
+        decodes = self.stats['decodes']
+        return {
+            'available': self.available,
+            'size': self.size,
+            'idle': len(self._idle),
+            'avg_decode_ms': round(self.stats['decode_ms_total'] / decodes, 2) if decodes else 0.0,
+            **self.stats
+        }
+
+
+class AudioDecoder:
+    # Opus always runs at 48 kHz internally; pre-skip is counted in those samples
+    OPUS_RATE = 48000
+    # Longest Opus packet is 120 ms
+    OPUS_MAX_PACKET_MS = 120
+
+    def __init__(self, pool: FFmpegDecoderPool, sample_rate: int = 16000):
+        """Route each recording to the cheapest decoder that handles its format"""
+        self.pool = pool
+        self.sample_rate = sample_rate
+        self.metrics: Dict[str, Dict[str, Any]] = {}
+
+    async def decode(self, audio_data: Union[bytes, memoryview], audio_format: Optional[str] = None) -> Union[bytes, memoryview]:
+        """Decode a complete recording to 16 kHz mono 16-bit PCM
+
+        Raw PCM and 16 kHz mono WAV come back as views into audio_data.
+        """
+        sniffed = resolve_format(audio_data, audio_format)
+
+        started = time.perf_counter()
+        route = 'passthrough'
+        try:
+            if sniffed == 'pcm':
+                pcm = memoryview(audio_data)
+            else:
+                pcm, route = await self._decode_container(audio_data, sniffed)
+        except DecoderError:
+            self._record(sniffed, 'failed', started)
+            raise
+
+        self._record(sniffed, route, started)
+        return pcm
+
+    async def _decode_container(self, audio_data, audio_format: str):
+        if audio_format == 'wav':
+            pcm = self._wav_passthrough(audio_data)
+            if pcm is not None:
+                return pcm, 'passthrough'
+        elif audio_format in ('webm', 'ogg') and OPUS_AVAILABLE:
+            try:
+                return await self._decode_opus(audio_data, audio_format), 'opus'
+            except (DemuxError, opuslib.OpusError) as e:
+                logger.info(f"🔄 In-process Opus decode not possible ({e}), using ffmpeg")
+
+        return await self.pool.decode(bytes(audio_data)), 'ffmpeg'
+
+    def _wav_passthrough(self, audio_data) -> Optional[memoryview]:
+        """View of the samples of a WAV file that is already 16 kHz mono 16-bit PCM"""
+        try:
+            with wave.open(io.BytesIO(audio_data), 'rb') as wav:
+                if (wav.getnchannels(), wav.getsampwidth(), wav.getframerate()) != (1, 2, self.sample_rate):
+                    return None
+                frames = wav.getnframes()
+        except (wave.Error, EOFError):
+            return None
+
+        # The data chunk is last in a canonical WAV file; anything after it means a
+        # layout we don't trust to slice
+        offset = len(audio_data) - frames * 2
+        if offset < 12 or bytes(audio_data[offset - 8:offset - 4]) != b"data":
+            return None
+        return memoryview(audio_data)[offset:]
+
+    async def _decode_opus(self, audio_data, audio_format: str) -> bytes:
+        data = bytes(audio_data)
+        stream = demux_webm(data) if audio_format == 'webm' else demux_ogg(data)
+
+        def _decode():
+            # libopus resamples and downmixes itself when asked for 16 kHz mono
+            decoder = opuslib.Decoder(self.sample_rate, 1)
+            max_samples = self.sample_rate * self.OPUS_MAX_PACKET_MS // 1000
+            pcm = b"".join(decoder.decode(packet, max_samples) for packet in stream.packets)
+            skip = stream.pre_skip * self.sample_rate // self.OPUS_RATE * 2
+            return pcm[skip:]
+
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, _decode)
+
+    def _record(self, audio_format: str, route: str, started: float):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        entry = self.metrics.setdefault(audio_format, {'count': 0, 'failures': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'routes': {}})
+        entry['routes'][route] = entry['routes'].get(route, 0) + 1
+        if route == 'failed':
+            entry['failures'] += 1
+            return
+        entry['count'] += 1
+        entry['total_ms'] += elapsed_ms
+        entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-format decode timings and routes, plus the ffmpeg pool"""
+        formats = {
+            audio_format: {
+                'count': entry['count'],
+                'failures': entry['failures'],
+                'avg_ms': round(entry['total_ms'] / entry['count'], 3) if entry['count'] else 0.0,
+                'max_ms': round(entry['max_ms'], 3),
+                'routes': dict(entry['routes'])
+            }
+            for audio_format, entry in self.metrics.items()
+        }
+        return {
+            'opus_available': OPUS_AVAILABLE,
+            'formats': formats,
+            'ffmpeg': self.pool.get_stats()
+        }
+
+
+# Shared by every voice session
+decoder_pool = FFmpegDecoderPool()
+audio_decoder = AudioDecoder(decoder_pool)
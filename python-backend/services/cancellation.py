@@ -0,0 +1,98 @@
+"""
+Cancellation Tokens
+Cooperative cancellation for a voice reply in flight (STT, LLM, TTS), so a caller
+who starts speaking again stops the upstream work for the reply they interrupted
+"""
+
+import asyncio
+from typing import AsyncIterator, Awaitable, Optional, TypeVar
+
+T = TypeVar("T")
+
+class OperationCancelled(Exception):
+    """Raised when work is abandoned because its cancellation token fired
+
+    A plain Exception, not a CancelledError: the task running the reply was not
+    cancelled, and awaiting it should report a result, not a cancellation. Broad
+    `except Exception` handlers on the reply path (retry loops, fallbacks) must
+    re-raise it explicitly.
+    """
+
+    def __init__(self, reason: str = "cancelled"):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class CancellationToken:
+    def __init__(self):
+        """Create a token that has not been cancelled"""
+        self._event = asyncio.Event()
+        self.reason: Optional[str] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled"):
+        """Fire the token; the first reason wins"""
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    def raise_if_cancelled(self):
+        """Checkpoint: raise OperationCancelled if the token has fired"""
+        if self._event.is_set():
+            raise OperationCancelled(self.reason)
+
+    async def guard(self, awaitable: Awaitable[T]) -> T:
+        """Await something, abandoning it as soon as the token fires
+
+        Work running in a thread can't be interrupted, but its result is
+        dropped and the caller is released immediately.
+        """
+        self.raise_if_cancelled()
+        task = asyncio.ensure_future(awaitable)
+        waiter = asyncio.ensure_future(self._event.wait())
+        try:
+            await asyncio.wait({task, waiter}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        finally:
+            waiter.cancel()
+
+        if task.done():
+            return task.result()
+        task.cancel()
+        # Let the abandoned work unwind (an executor future is released at once)
+        await asyncio.wait({task})
+        raise OperationCancelled(self.reason)
+
+    async def sleep(self, delay: float):
+        """Sleep, waking early with OperationCancelled if the token fires"""
+        self.raise_if_cancelled()
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            return
+        raise OperationCancelled(self.reason)
+
+    async def iterate(self, iterator: AsyncIterator[T]) -> AsyncIterator[T]:
+        """Iterate an async iterator, abandoning it as soon as the token fires"""
+        try:
+            while True:
+                try:
+                    item = await self.guard(iterator.__anext__())
+                except StopAsyncIteration:
+                    return
+                yield item
+        finally:
+            if hasattr(iterator, 'aclose'):
+                await iterator.aclose()
+
+
+async def guarded(awaitable: Awaitable[T], token: Optional[CancellationToken]) -> T:
+    """Await under a token when one is given"""
+    if token is None:
+        return await awaitable
+    return await token.guard(awaitable)
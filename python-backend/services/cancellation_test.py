@@ -0,0 +1,54 @@
+"""
+Cancellation token checks
+A fired token ends work with an OperationCancelled error, not a task cancellation
+"""
+
+import asyncio
+
+from services.cancellation import CancellationToken, OperationCancelled
+
+def test_fired_token_fails_the_task_instead_of_cancelling_it():
+    async def run():
+        token = CancellationToken()
+
+        async def reply():
+            await token.sleep(5)
+
+        task = asyncio.create_task(reply())
+        await asyncio.sleep(0.01)
+        token.cancel("barge_in")
+        results = await asyncio.gather(task, return_exceptions=True)
+        return task, results
+
+    task, results = asyncio.run(run())
+    assert not task.cancelled()
+    assert isinstance(results[0], OperationCancelled)
+    assert results[0].reason == "barge_in"
+
+
+def test_guard_abandons_slow_work():
+    async def run():
+        token = CancellationToken()
+        work = asyncio.ensure_future(asyncio.sleep(5))
+        asyncio.get_running_loop().call_later(0.01, token.cancel, "barge_in")
+        try:
+            await token.guard(work)
+        except OperationCancelled as e:
+            return work, e.reason
+        raise AssertionError("guard should have raised")
+
+    work, reason = asyncio.run(run())
+    assert work.cancelled()
+    assert reason == "barge_in"
+
+
+def test_broad_handlers_see_an_error():
+    token = CancellationToken()
+    token.cancel("new_input")
+    try:
+        token.raise_if_cancelled()
+    except Exception as e:
+        assert isinstance(e, OperationCancelled)
+        assert e.reason == "new_input"
+    else:
+        raise AssertionError("token should have raised")
@@ -0,0 +1,169 @@
+"""
+Utterance Endpointing
+Groups VAD-classified frames into utterances: speech onset opens an utterance
+(with pre-roll so the first syllable isn't clipped), trailing silence or a
+length cap closes it, and only closed utterances are sent to STT
+"""
+
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+from config import settings
+from .audio_buffer import AudioRingBuffer
+
+class UtteranceEndpointer:
+    def __init__(
+        self,
+        ring: AudioRingBuffer,
+        frame_ms: int,
+        frame_bytes: int,
+        pre_roll_ms: Optional[int] = None,
+        onset_ms: Optional[int] = None,
+        hangover_ms: Optional[int] = None,
+        end_silence_ms: Optional[int] = None,
+        min_speech_ms: Optional[int] = None,
+        max_utterance_ms: Optional[int] = None
+    ):
+        """Initialize endpointing for one session's frame stream
+
+        Frames are tracked by index only: frame n is bytes [n * frame_bytes,
+        (n + 1) * frame_bytes) of the PCM stream written to ring, so utterance
+        audio is read straight out of the ring when it closes.
+        """
+        self.ring = ring
+        self.frame_ms = frame_ms
+        self.frame_bytes = frame_bytes
+
+        def frames(ms: Optional[int], default: int, minimum: int = 1) -> int:
+            # An explicit 0 is honoured; only None falls back to the setting
+            return max(minimum, (default if ms is None else ms) // frame_ms)
+
+        # No pre-roll and no hangover are valid; the rest need at least one frame
+        self.pre_roll_frames = frames(pre_roll_ms, settings.ENDPOINT_PRE_ROLL_MS, minimum=0)
+        self.onset_frames = frames(onset_ms, settings.ENDPOINT_ONSET_MS)
+        self.hangover_frames = frames(hangover_ms, settings.ENDPOINT_HANGOVER_MS, minimum=0)
+        self.end_silence_frames = frames(end_silence_ms, settings.ENDPOINT_END_SILENCE_MS)
+        self.min_speech_frames = frames(min_speech_ms, settings.ENDPOINT_MIN_SPEECH_MS)
+        self.max_utterance_frames = frames(max_utterance_ms, settings.ENDPOINT_MAX_UTTERANCE_MS)
+
+        if (self.pre_roll_frames + self.max_utterance_frames) * frame_bytes > ring.capacity:
+            raise ValueError("Audio buffer is too small for the maximum utterance plus pre-roll")
+
+        # Index of the next frame to be fed
+        self._frame_index = 0
+        self._onset_run = 0
+
+        # Current utterance, as frame indices [_start_frame, _frame_index)
+        self.in_utterance = False
+        self._start_frame = 0
+        self._voiced_count = 0
+        self._silence_run = 0
+
+        # Closed utterances waiting to be processed
+        self._completed: Deque[Dict[str, Any]] = deque()
+
+    def feed(self, flags: Sequence[bool]) -> List[Dict[str, Any]]:
+        """Advance the endpointer by the speech flags of the next frames in the stream
+
+        Returns events in order: {'type': 'speech_start'} when an utterance opens and
+        {'type': 'speech_end', 'duration_ms': ..., 'forced': ..., 'end_offset': ...} when
+        one closes (the closed utterance is queued for pop_utterance; end_offset is
+        the absolute ring offset where its audio ends).
+        """
+        events = []
+        for is_speech in flags:
+            self._frame_index += 1
+            if self.in_utterance:
+                event = self._extend(bool(is_speech))
+            else:
+                event = self._listen(bool(is_speech))
+            if event:
+                events.append(event)
+        return events
+
+    @property
+    def utterance_frames(self) -> int:
+        """Length of the in-progress utterance in frames"""
+        return self._frame_index - self._start_frame if self.in_utterance else 0
+
+    @property
+    def utterance_start_offset(self) -> int:
+        """Absolute ring offset where the in-progress utterance starts (pre-roll included)"""
+        return self._start_frame * self.frame_bytes
+
+    @property
+    def pending_bytes(self) -> int:
+        """Audio held by closed utterances waiting to be processed"""
+        return sum(len(utterance['audio']) for utterance in self._completed)
+
+    def has_utterance(self) -> bool:
+        """Whether a closed utterance is waiting to be processed"""
+        return bool(self._completed)
+
+    def pop_utterance(self) -> Dict[str, Any]:
+        """Take the oldest closed utterance: {'audio': bytes, 'duration_ms': ..., 'forced': ...}"""
+        return self._completed.popleft()
+
+    def reset(self):
+        """Drop any in-progress utterance"""
+        self._onset_run = 0
+        self.in_utterance = False
+        self._voiced_count = 0
+        self._silence_run = 0
+
+    def _listen(self, is_speech: bool):
+        if not is_speech:
+            self._onset_run = 0
+            return None
+
+        self._onset_run += 1
+        if self._onset_run < self.onset_frames:
+            return None
+
+        # Onset confirmed: the utterance starts pre-roll frames before the first
+        # voiced frame, limited to audio the ring still holds
+        first_voiced = self._frame_index - self._onset_run
+        oldest = -(-self.ring.start_offset // self.frame_bytes)
+        self._start_frame = max(first_voiced - self.pre_roll_frames, oldest)
+        self.in_utterance = True
+        self._voiced_count = self._onset_run
+        self._silence_run = 0
+        self._onset_run = 0
+        return {'type': 'speech_start'}
+
+    def _extend(self, is_speech: bool):
+        if is_speech:
+            self._voiced_count += 1
+            self._silence_run = 0
+        else:
+            self._silence_run += 1
+
+        if self._silence_run >= self.end_silence_frames:
+            return self._close(forced=False)
+        if self.utterance_frames >= self.max_utterance_frames:
+            return self._close(forced=True)
+        return None
+
+    def _close(self, forced: bool) -> Dict[str, Any]:
+        # Keep only the hangover part of the trailing silence
+        trailing = max(0, self._silence_run - self.hangover_frames)
+        start, end = self._start_frame, self._frame_index - trailing
+        voiced = self._voiced_count
+        self.reset()
+
+        duration_ms = (end - start) * self.frame_ms
+        if voiced < self.min_speech_frames:
+            return {'type': 'speech_discarded', 'duration_ms': duration_ms}
+
+        # The one copy: utterance audio leaves the ring before it can be overwritten
+        self._completed.append({
+            'audio': self.ring.read(start * self.frame_bytes, end * self.frame_bytes),
+            'duration_ms': duration_ms,
+            'forced': forced
+        })
+        return {
+            'type': 'speech_end',
+            'duration_ms': duration_ms,
+            'forced': forced,
+            'end_offset': end * self.frame_bytes
+        }
@@ -0,0 +1,66 @@
+"""
+Endpointing checks
+Utterances open after onset, close on trailing silence, and keep exactly the configured pre-roll and hangover
+"""
+
+from services.audio_buffer import AudioRingBuffer
+from services.endpointing import UtteranceEndpointer
+
+FRAME_MS = 10
+FRAME_BYTES = 320
+
+def _endpointer(**overrides) -> UtteranceEndpointer:
+    ring = AudioRingBuffer(FRAME_BYTES * 1000)
+    settings = dict(pre_roll_ms=30, onset_ms=20, hangover_ms=20, end_silence_ms=50,
+                    min_speech_ms=30, max_utterance_ms=5000)
+    settings.update(overrides)
+    return UtteranceEndpointer(ring, FRAME_MS, FRAME_BYTES, **settings)
+
+
+def _feed(endpointer: UtteranceEndpointer, flags: list) -> list:
+    # Frame n holds the byte value n so utterance bounds can be read back from the audio
+    for n in range(len(flags)):
+        endpointer.ring.write(bytes([n]) * FRAME_BYTES)
+    return endpointer.feed(flags)
+
+
+def _frames(audio: bytes) -> list:
+    return [audio[i] for i in range(0, len(audio), FRAME_BYTES)]
+
+
+def test_utterance_keeps_pre_roll_and_hangover():
+    endpointer = _endpointer()
+    flags = [False] * 10 + [True] * 10 + [False] * 5
+    events = _feed(endpointer, flags)
+
+    assert [event['type'] for event in events] == ['speech_start', 'speech_end']
+    utterance = endpointer.pop_utterance()
+    # 3 frames of pre-roll before frame 10, 2 of hangover after frame 19
+    assert _frames(utterance['audio']) == list(range(7, 22))
+    assert not utterance['forced']
+
+
+def test_explicit_zero_pre_roll_and_hangover():
+    endpointer = _endpointer(pre_roll_ms=0, hangover_ms=0)
+    assert endpointer.pre_roll_frames == 0
+    assert endpointer.hangover_frames == 0
+
+    _feed(endpointer, [False] * 10 + [True] * 10 + [False] * 5)
+    assert _frames(endpointer.pop_utterance()['audio']) == list(range(10, 20))
+
+
+def test_short_blip_is_discarded():
+    endpointer = _endpointer()
+    events = _feed(endpointer, [True] * 2 + [False] * 10)
+
+    assert [event['type'] for event in events] == ['speech_start', 'speech_discarded']
+    assert not endpointer.has_utterance()
+
+
+def test_long_speech_is_cut_at_the_cap():
+    endpointer = _endpointer(max_utterance_ms=100)
+    events = _feed(endpointer, [True] * 15)
+
+    assert events[1]['type'] == 'speech_end'
+    assert events[1]['forced']
+    assert endpointer.pop_utterance()['duration_ms'] == 100
@@ -0,0 +1,223 @@
+"""
+Fuzzy Place Names
+Romanizes Indic-script names, folds spelling variants ("Kolkatta", "Bengalooru")
+to a common key, and finds near matches through a trigram index with bounded
+edit distance
+
+Standard library only, like the location resolver that uses it.
+"""
+
+import re
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+# ===== Transliteration =====
+
+# Brahmic scripts share Devanagari's layout (ISCII order), so one table of
+# offsets within the 128-codepoint block covers all of them
+BRAHMIC_BLOCKS = (0x0900, 0x0980, 0x0A00, 0x0A80, 0x0B00, 0x0B80, 0x0C00, 0x0C80, 0x0D00)
+
+INDEPENDENT_VOWELS = {
+    0x05: 'a', 0x06: 'aa', 0x07: 'i', 0x08: 'ii', 0x09: 'u', 0x0A: 'uu', 0x0B: 'ri',
+    0x0E: 'e', 0x0F: 'e', 0x10: 'ai', 0x12: 'o', 0x13: 'o', 0x14: 'au'
+}
+
+CONSONANTS = {
+    0x15: 'k', 0x16: 'kh', 0x17: 'g', 0x18: 'gh', 0x19: 'n',
+    0x1A: 'ch', 0x1B: 'chh', 0x1C: 'j', 0x1D: 'jh', 0x1E: 'n',
+    0x1F: 't', 0x20: 'th', 0x21: 'd', 0x22: 'dh', 0x23: 'n',
+    0x24: 't', 0x25: 'th', 0x26: 'd', 0x27: 'dh', 0x28: 'n', 0x29: 'n',
+    0x2A: 'p', 0x2B: 'ph', 0x2C: 'b', 0x2D: 'bh', 0x2E: 'm',
+    0x2F: 'y', 0x30: 'r', 0x31: 'r', 0x32: 'l', 0x33: 'l', 0x34: 'l', 0x35: 'v',
+    0x36: 'sh', 0x37: 'sh', 0x38: 's', 0x39: 'h'
+}
+
+VOWEL_SIGNS = {
+    0x3E: 'aa', 0x3F: 'i', 0x40: 'ii', 0x41: 'u', 0x42: 'uu', 0x43: 'ri',
+    0x46: 'e', 0x47: 'e', 0x48: 'ai', 0x4A: 'o', 0x4B: 'o', 0x4C: 'au', 0x57: 'au'
+}
+
+# Anusvara, chandrabindu, visarga
+NASAL_SIGNS = {0x01: 'n', 0x02: 'n', 0x03: 'h'}
+
+VIRAMA = 0x4D
+
+# Malayalam chillu letters: a consonant with no vowel at all
+CHILLU = {0x0D7A: 'n', 0x0D7B: 'n', 0x0D7C: 'r', 0x0D7D: 'l', 0x0D7E: 'l', 0x0D7F: 'k'}
+
+def _brahmic_offset(char: str) -> Optional[int]:
+    code = ord(char)
+    for block in BRAHMIC_BLOCKS:
+        if block <= code < block + 0x80:
+            return code - block
+    return None
+
+
+def romanize(text: str) -> str:
+    """Rough Latin spelling of Indic-script text (other characters pass through)
+
+    Consonants carry an inherent "a" unless a vowel sign or virama follows;
+    Hindi drops it at the end of a word, so it is dropped there for every script.
+    """
+    out: List[str] = []
+    inherent = False
+    for char in text:
+        if ord(char) in CHILLU:
+            if inherent:
+                out.append('a')
+            out.append(CHILLU[ord(char)])
+            inherent = False
+            continue
+
+        offset = _brahmic_offset(char)
+        if offset is None:
+            # Word-final inherent vowel is silent
+            inherent = False
+            out.append(char)
+            continue
+
+        if offset in VOWEL_SIGNS:
+            out.append(VOWEL_SIGNS[offset])
+            inherent = False
+        elif offset == VIRAMA:
+            inherent = False
+        elif offset in CONSONANTS:
+            if inherent:
+                out.append('a')
+            out.append(CONSONANTS[offset])
+            inherent = True
+        elif offset in INDEPENDENT_VOWELS or offset in NASAL_SIGNS:
+            if inherent:
+                out.append('a')
+            out.append(INDEPENDENT_VOWELS.get(offset) or NASAL_SIGNS[offset])
+            inherent = False
+        # Nukta and other marks add nothing to a rough spelling
+    return "".join(out)
+
+
+# ===== Spelling keys =====
+
+# Applied in order to romanized, lowercase text
+FOLD_RULES = [
+    (re.compile(r'([kgcjtdpbs])h'), r'\1'),   # aspirates and sh/ch: "chh" -> "c"
+    (re.compile(r'ee|ii|y(?=\b)'), 'i'),
+    (re.compile(r'oo|uu'), 'u'),
+    (re.compile(r'aa'), 'a'),
+    (re.compile(r'w'), 'v'),
+    (re.compile(r'z'), 'j'),
+    (re.compile(r'q'), 'k'),
+    (re.compile(r'n(?=[pbm])'), 'm'),         # anusvara before a labial: "munbai" -> "mumbai"
+    (re.compile(r'(\w)\1+'), r'\1'),         # doubled letters: "kolkatta" -> "kolkata"
+]
+
+def spelling_key(text: str) -> str:
+    """Key under which common spelling and transliteration variants of a name agree"""
+    key = romanize(text.lower())
+    for pattern, replacement in FOLD_RULES:
+        key = pattern.sub(replacement, key)
+    return key
+
+
+# ===== Matching =====
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal-string-alignment distance (adjacent swaps count once), or limit + 1 if above limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    def __init__(self, min_similarity: float = 0.8, min_fuzzy_chars: int = 6, chars_per_edit: int = 4):
+        """Near-match lookup of spelling keys
+
+        similarity is 1 - edit distance / key length, and short keys must be
+        closer than min_similarity alone asks: keys shorter than min_fuzzy_chars
+        only match exactly ("pune" must not match "june", nor "punam" "puna"),
+        and each further edit takes chars_per_edit more characters. A near match
+        must also start with the same letter ("sandra" is not "bandra").
+        """
+        self.min_similarity = min_similarity
+        self.min_fuzzy_chars = min_fuzzy_chars
+        self.chars_per_edit = chars_per_edit
+        self._entries: List[Tuple[str, Any]] = []
+        self._exact: Dict[str, List[int]] = defaultdict(list)
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, name: str, payload: Any):
+        key = spelling_key(name)
+        if not key:
+            return
+        index = len(self._entries)
+        self._entries.append((key, payload))
+        self._exact[key].append(index)
+        for gram in trigrams(key):
+            self._postings[gram].append(index)
+
+    def max_distance(self, length: int) -> int:
+        """Edits a key of this length may be away from a match"""
+        if length < self.min_fuzzy_chars:
+            return 0
+        # Small epsilon so 10 * (1 - 0.8) allows two edits despite rounding
+        by_similarity = int(length * (1 - self.min_similarity) + 1e-9)
+        return min(by_similarity, 1 + (length - self.min_fuzzy_chars) // self.chars_per_edit)
+
+    def search(self, text: str, limit: int = 3, deadline: Optional[float] = None) -> List[Tuple[float, Any]]:
+        """Best (similarity, payload) pairs for text, highest first
+
+        Stops verifying candidates once time.perf_counter() passes deadline and
+        returns what it has.
+        """
+        key = spelling_key(text)
+        if not key:
+            return []
+        if key in self._exact:
+            return [(1.0, self._entries[i][1]) for i in self._exact[key]][:limit]
+
+        max_distance = self.max_distance(len(key))
+        if max_distance == 0:
+            return []
+
+        # Candidates sharing the most trigrams first
+        shared: Dict[int, int] = defaultdict(int)
+        grams = trigrams(key)
+        for gram in grams:
+            for index in self._postings.get(gram, ()):
+                shared[index] += 1
+        # Each edit changes at most four trigrams (a swap of two letters)
+        needed = len(grams) - 4 * max_distance
+        candidates = sorted((i for i, count in shared.items() if count >= needed), key=lambda i: -shared[i])
+
+        results: List[Tuple[float, Any]] = []
+        for index in candidates:
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            candidate, payload = self._entries[index]
+            if candidate[0] != key[0]:
+                continue
+            distance = edit_distance(key, candidate, max_distance)
+            if distance <= max_distance:
+                results.append((1 - distance / max(len(key), len(candidate)), payload))
+        results.sort(key=lambda result: -result[0])
+        return results[:limit]
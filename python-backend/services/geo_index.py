@@ -0,0 +1,168 @@
+"""
+Hospital Geo Index
+Uniform latitude/longitude grid over every hospital so nearest-by-coordinates
+searches only measure the handful of cells around the caller
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from config import settings
+from .hospital_data import EARTH_RADIUS_KM, HospitalCoordinates
+from models.schemas import HospitalInfo
+
+# Kilometres per degree of latitude (and of longitude at the equator)
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+class GeoIndex:
+    def __init__(self, hospitals: Iterable[Dict[str, Any]], cell_degrees: Optional[float] = None):
+        """Bucket hospitals with coordinates into cell_degrees x cell_degrees grid cells
+
+        Records are sorted by cell so each cell is one contiguous slice of the
+        coordinate arrays; records without coordinates are left out.
+        """
+        self.cell_degrees = settings.GEO_GRID_CELL_DEGREES if cell_degrees is None else cell_degrees
+        if self.cell_degrees <= 0:
+            raise ValueError("Grid cells must be a positive number of degrees")
+        located = [
+            hospital for hospital in hospitals
+            if hospital.get('latitude') is not None and hospital.get('longitude') is not None
+        ]
+
+        latitudes = np.array([hospital['latitude'] for hospital in located], dtype=np.float64)
+        longitudes = np.array([hospital['longitude'] for hospital in located], dtype=np.float64)
+        rows = np.floor(latitudes / self.cell_degrees).astype(np.int64)
+        cols = np.floor(longitudes / self.cell_degrees).astype(np.int64)
+
+        order = np.lexsort((cols, rows))
+        self.hospitals = [located[i] for i in order]
+        self.coordinates = HospitalCoordinates(latitudes[order], longitudes[order])
+        self.emergency = np.array([bool(h.get('emergency_services')) for h in self.hospitals], dtype=bool)
+
+        # (row, col) -> slice of the sorted arrays
+        self.cells: Dict[Tuple[int, int], slice] = {}
+        rows, cols = rows[order], cols[order]
+        if len(order):
+            boundaries = np.flatnonzero((np.diff(rows) != 0) | (np.diff(cols) != 0)) + 1
+            starts = np.concatenate(([0], boundaries))
+            ends = np.concatenate((boundaries, [len(order)]))
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                self.cells[(int(rows[start]), int(cols[start]))] = slice(start, end)
+
+        # Once the searched square spans more cells than are occupied, scanning
+        # every point is cheaper than walking cells
+        self._max_rings = int(math.sqrt(len(self.cells)) / 2) + 1
+
+    def __len__(self) -> int:
+        return len(self.hospitals)
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: Optional[float] = None,
+        k: Optional[int] = None,
+        emergency_only: bool = False
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        """The k closest hospitals within radius_km as (distance_km, record), nearest first
+
+        Either bound may be None, but not both. Rings of cells are searched outward
+        until nothing outside them can be closer than the k-th result or the radius.
+        """
+        if radius_km is None and k is None:
+            raise ValueError("A search needs a radius, a result count, or both")
+        if not self.hospitals or k == 0:
+            return []
+        radius_km = math.inf if radius_km is None else radius_km
+
+        row = math.floor(latitude / self.cell_degrees)
+        col = math.floor(longitude / self.cell_degrees)
+        indices: List[np.ndarray] = []
+        distances: List[np.ndarray] = []
+        ring = 0
+
+        while True:
+            if ring > self._max_rings:
+                # The square now spans more cells than are occupied: measure every point
+                subset = self._filter(np.arange(len(self.hospitals)), emergency_only)
+                indices = [subset]
+                distances = [self.coordinates.distances_km(latitude, longitude, subset if emergency_only else None)]
+                break
+
+            found = [
+                np.arange(self.cells[cell].start, self.cells[cell].stop)
+                for cell in self._ring_cells(row, col, ring) if cell in self.cells
+            ]
+            if found:
+                new = self._filter(np.concatenate(found), emergency_only)
+                indices.append(new)
+                distances.append(self.coordinates.distances_km(latitude, longitude, new))
+
+            # Nothing outside the searched square is closer than its nearest edge
+            bound = self._outside_bound_km(latitude, longitude, row, col, ring)
+            if bound > radius_km:
+                break
+            if k is not None and distances:
+                measured = np.concatenate(distances)
+                measured = measured[measured <= radius_km]
+                if len(measured) >= k and np.partition(measured, k - 1)[k - 1] <= bound:
+                    break
+            ring += 1
+
+        if not indices:
+            return []
+        candidates = np.concatenate(indices)
+        measured = np.concatenate(distances)
+        keep = np.flatnonzero(measured <= radius_km)
+        if k is not None and len(keep) > k:
+            keep = keep[np.argpartition(measured[keep], k - 1)[:k]]
+        keep = keep[np.argsort(measured[keep], kind='stable')]
+        return [(float(measured[i]), self.hospitals[candidates[i]]) for i in keep]
+
+    def _filter(self, candidates: np.ndarray, emergency_only: bool) -> np.ndarray:
+        return candidates[self.emergency[candidates]] if emergency_only else candidates
+
+    @staticmethod
+    def _ring_cells(row: int, col: int, ring: int) -> Iterable[Tuple[int, int]]:
+        """Cells on the square ring at Chebyshev distance ring from (row, col)"""
+        if ring == 0:
+            yield (row, col)
+            return
+        for dc in range(-ring, ring + 1):
+            yield (row - ring, col + dc)
+            yield (row + ring, col + dc)
+        for dr in range(-ring + 1, ring):
+            yield (row + dr, col - ring)
+            yield (row + dr, col + ring)
+
+    def _outside_bound_km(self, latitude: float, longitude: float, row: int, col: int, ring: int) -> float:
+        """Lower bound on the distance to any point outside the searched square"""
+        south = (row - ring) * self.cell_degrees
+        north = (row + ring + 1) * self.cell_degrees
+        west = (col - ring) * self.cell_degrees
+        east = (col + ring + 1) * self.cell_degrees
+
+        lat_km = min(latitude - south, north - latitude) * KM_PER_DEGREE
+
+        # A point level with the square but past its east/west edge is at least this
+        # far, with both latitudes taken at the square's poleward edge (the worst case)
+        poleward = math.radians(min(90.0, max(abs(south), abs(north))))
+        dlon = math.radians(min(180.0, longitude - west, east - longitude))
+        lon_km = 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.cos(poleward) * math.sin(dlon / 2)))
+        return max(0.0, min(lat_km, lon_km))
+
+
+def to_hospital_info(hospital: Dict[str, Any], distance_km: Optional[float] = None) -> HospitalInfo:
+    return HospitalInfo(
+        name=hospital['name'],
+        address=hospital['address'],
+        phone=hospital['phone'],
+        emergency_phone=hospital.get('emergency_phone'),
+        specialties=hospital.get('specialties', []),
+        emergency_services=hospital.get('emergency_services', False),
+        latitude=hospital.get('latitude'),
+        longitude=hospital.get('longitude'),
+        distance=round(distance_km, 2) if distance_km is not None else None
+    )
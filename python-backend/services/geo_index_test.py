@@ -0,0 +1,95 @@
+"""
+Geo index checks
+Grid searches return exactly what measuring every hospital would, nearest first
+"""
+
+import math
+import random
+
+import pytest
+
+from services.geo_index import GeoIndex
+from services.hospital_data import INDIAN_HOSPITALS, flatten_hospitals
+
+def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2
+    return 2 * 6371.0 * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _brute_force(hospitals, latitude, longitude, radius_km=None, k=None, emergency_only=False):
+    measured = sorted(
+        (_haversine_km(latitude, longitude, h['latitude'], h['longitude']), h['name'])
+        for h in hospitals
+        if h.get('latitude') is not None and (h.get('emergency_services') or not emergency_only)
+    )
+    if radius_km is not None:
+        measured = [m for m in measured if m[0] <= radius_km]
+    return measured[:k] if k is not None else measured
+
+
+def _random_hospitals(count: int, seed: int):
+    rng = random.Random(seed)
+    hospitals = []
+    for i in range(count):
+        # Clustered around a few cities, plus scattered points and some without coordinates
+        if i % 10 == 9:
+            latitude = longitude = None
+        elif i % 3 == 0:
+            latitude, longitude = rng.uniform(-60, 70), rng.uniform(-180, 180)
+        else:
+            city_lat, city_lon = rng.choice([(19.07, 72.88), (28.61, 77.21), (12.97, 77.59), (64.1, -21.9)])
+            latitude, longitude = city_lat + rng.gauss(0, 0.3), city_lon + rng.gauss(0, 0.3)
+        hospitals.append({
+            'name': f"hospital {i}",
+            'latitude': latitude,
+            'longitude': longitude,
+            'emergency_services': i % 2 == 0
+        })
+    return hospitals
+
+
+def _names(results):
+    return [(round(distance, 6), hospital['name']) for distance, hospital in results]
+
+
+def _rounded(expected):
+    return [(round(distance, 6), name) for distance, name in expected]
+
+
+@pytest.mark.parametrize("cell_degrees", [0.05, 0.5, 5.0])
+def test_nearest_matches_brute_force(cell_degrees):
+    hospitals = _random_hospitals(400, seed=cell_degrees)
+    index = GeoIndex(hospitals, cell_degrees=cell_degrees)
+    rng = random.Random(7)
+
+    for _ in range(60):
+        latitude, longitude = rng.uniform(-60, 70), rng.uniform(-180, 180)
+        if rng.random() < 0.5:
+            # Start most searches near a cluster
+            latitude, longitude = 19.07 + rng.gauss(0, 1), 72.88 + rng.gauss(0, 1)
+        k = rng.choice([None, 1, 3, 10])
+        radius_km = rng.choice([None, 5, 50, 500]) if k is not None else rng.choice([5, 50, 500])
+        emergency_only = rng.random() < 0.3
+
+        assert _names(index.nearest(latitude, longitude, radius_km, k, emergency_only)) == \
+            _rounded(_brute_force(hospitals, latitude, longitude, radius_km, k, emergency_only))
+
+
+def test_bundled_hospitals():
+    hospitals = flatten_hospitals(INDIAN_HOSPITALS)
+    index = GeoIndex(hospitals)
+    # Bandra, Mumbai; several records share coordinates, so only distances are compared
+    found = [round(distance, 6) for distance, _ in index.nearest(19.0596, 72.8295, k=3)]
+    assert found == [distance for distance, _ in _rounded(_brute_force(hospitals, 19.0596, 72.8295, k=3))]
+
+
+def test_search_needs_a_bound():
+    with pytest.raises(ValueError):
+        GeoIndex(_random_hospitals(10, seed=1)).nearest(0, 0)
+
+
+def test_cell_size_must_be_positive():
+    with pytest.raises(ValueError):
+        GeoIndex([], cell_degrees=0)
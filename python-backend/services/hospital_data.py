@@ -1,8 +1,14 @@
 """
 Indian Hospital Database
-Contains information about hospitals across major Indian cities
+Contains information about hospitals across major Indian cities, plus a vectorized
+haversine kernel over their coordinates for distance ranking
 """
 
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
 INDIAN_HOSPITALS = {
     # Mumbai hospitals
     "mumbai": [
@@ -253,4 +259,77 @@ EMERGENCY_CONDITIONS = [
     "severe burns", "stroke symptoms", "heart attack", "severe allergic reaction",
     "broken bones", "head injury", "poisoning", "severe abdominal pain",
     "high fever above 103", "seizures", "severe vomiting", "severe diarrhea"
-]
\ No newline at end of file
+]
+
+
+# ===== Distances =====
+
+EARTH_RADIUS_KM = 6371.0
+
+def flatten_hospitals(hospitals_by_city: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """One list of hospital records, each tagged with its city key"""
+    return [
+        {**hospital, 'city': city}
+        for city, hospitals in hospitals_by_city.items()
+        for hospital in hospitals
+    ]
+
+
+class HospitalCoordinates:
+    def __init__(self, latitudes: np.ndarray, longitudes: np.ndarray):
+        """Hospital positions in degrees, kept as radians with cos(latitude) precomputed
+
+        Each distance then costs two sines, one cosine (of the origin only), a
+        square root and an arcsine, with no per-hospital trigonometry repeated.
+        """
+        self.lat_rad = np.radians(np.asarray(latitudes, dtype=np.float64))
+        self.lon_rad = np.radians(np.asarray(longitudes, dtype=np.float64))
+        self.cos_lat = np.cos(self.lat_rad)
+
+    @classmethod
+    def from_hospitals(cls, hospitals: List[Dict[str, Any]]) -> "HospitalCoordinates":
+        """Coordinates of hospital records (all must have latitude and longitude)"""
+        return cls(
+            np.array([hospital['latitude'] for hospital in hospitals], dtype=np.float64),
+            np.array([hospital['longitude'] for hospital in hospitals], dtype=np.float64)
+        )
+
+    def __len__(self) -> int:
+        return len(self.lat_rad)
+
+    def distances_km(self, latitude: float, longitude: float, indices: Optional[np.ndarray] = None) -> np.ndarray:
+        """Great-circle distance in km from one origin to every hospital (or those at indices)"""
+        lat_rad, lon_rad, cos_lat = self.lat_rad, self.lon_rad, self.cos_lat
+        if indices is not None:
+            lat_rad, lon_rad, cos_lat = lat_rad[indices], lon_rad[indices], cos_lat[indices]
+        return _haversine_km(math.radians(latitude), math.radians(longitude), lat_rad, lon_rad, cos_lat)
+
+    def distance_matrix_km(
+        self,
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        block_rows: int = 256,
+        dtype: Any = np.float64
+    ) -> np.ndarray:
+        """Distances in km from many origins to every hospital, shape (origins, hospitals)
+
+        Origins are processed block_rows at a time so temporaries stay bounded for
+        large patient-to-facility matrices; dtype=np.float32 halves the result size.
+        """
+        origin_lat = np.radians(np.asarray(latitudes, dtype=np.float64)).reshape(-1, 1)
+        origin_lon = np.radians(np.asarray(longitudes, dtype=np.float64)).reshape(-1, 1)
+        result = np.empty((len(origin_lat), len(self)), dtype=dtype)
+        for start in range(0, len(origin_lat), block_rows):
+            rows = slice(start, start + block_rows)
+            result[rows] = _haversine_km(origin_lat[rows], origin_lon[rows], self.lat_rad, self.lon_rad, self.cos_lat)
+        return result
+
+
+def _haversine_km(origin_lat, origin_lon, lat_rad: np.ndarray, lon_rad: np.ndarray, cos_lat: np.ndarray) -> np.ndarray:
+    """Haversine on radians; origins broadcast against the hospital arrays"""
+    half_dlat = np.sin((lat_rad - origin_lat) * 0.5)
+    half_dlon = np.sin((lon_rad - origin_lon) * 0.5)
+    a = half_dlat * half_dlat + np.cos(origin_lat) * cos_lat * (half_dlon * half_dlon)
+    # Rounding can push a a hair past 1 for antipodal points
+    np.minimum(a, 1.0, out=a)
+    return (2 * EARTH_RADIUS_KM) * np.arcsin(np.sqrt(a, out=a), out=a)
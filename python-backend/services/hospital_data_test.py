@@ -0,0 +1,63 @@
+"""
+Distance kernel checks
+The vectorized haversine agrees with the scalar formula, row by row and in blocks
+"""
+
+import math
+
+import numpy as np
+
+from services.hospital_data import EARTH_RADIUS_KM, HospitalCoordinates
+
+def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _coordinates(count: int, seed: int):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-90, 90, count), rng.uniform(-180, 180, count)
+
+
+def test_distances_match_scalar_haversine():
+    latitudes, longitudes = _coordinates(500, seed=1)
+    coordinates = HospitalCoordinates(latitudes, longitudes)
+
+    for origin in [(19.07, 72.88), (0.0, 0.0), (-89.9, 179.9), (45.0, -180.0)]:
+        expected = [_haversine_km(*origin, lat, lon) for lat, lon in zip(latitudes, longitudes)]
+        np.testing.assert_allclose(coordinates.distances_km(*origin), expected, rtol=1e-9, atol=1e-6)
+
+
+def test_distances_at_indices():
+    latitudes, longitudes = _coordinates(50, seed=2)
+    coordinates = HospitalCoordinates(latitudes, longitudes)
+    indices = np.array([3, 0, 49, 3])
+
+    np.testing.assert_allclose(
+        coordinates.distances_km(12.97, 77.59, indices),
+        coordinates.distances_km(12.97, 77.59)[indices]
+    )
+
+
+def test_same_point_and_antipode():
+    coordinates = HospitalCoordinates(np.array([28.61, -28.61]), np.array([77.21, 77.21 - 180]))
+    distances = coordinates.distances_km(28.61, 77.21)
+    assert distances[0] == 0.0
+    assert math.isclose(distances[1], math.pi * EARTH_RADIUS_KM, rel_tol=1e-9)
+
+
+def test_distance_matrix_blocks_match_rows():
+    latitudes, longitudes = _coordinates(40, seed=3)
+    coordinates = HospitalCoordinates(latitudes, longitudes)
+    origin_latitudes, origin_longitudes = _coordinates(25, seed=4)
+
+    matrix = coordinates.distance_matrix_km(origin_latitudes, origin_longitudes, block_rows=7)
+    assert matrix.shape == (25, 40)
+    for row, origin in enumerate(zip(origin_latitudes, origin_longitudes)):
+        np.testing.assert_allclose(matrix[row], coordinates.distances_km(*origin))
+
+    single = coordinates.distance_matrix_km(origin_latitudes, origin_longitudes, dtype=np.float32)
+    assert single.dtype == np.float32
+    np.testing.assert_allclose(single, matrix, rtol=1e-5, atol=1e-2)
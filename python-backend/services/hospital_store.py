@@ -0,0 +1,271 @@
+"""
+Hospital Store
+Loads hospital records from a SQLite file into immutable in-memory snapshots
+(records by city and specialty, geo index, location resolver) that are swapped
+whole on reload, so lookups never see a half-built index or resolver
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import settings
+from .hospital_data import INDIAN_HOSPITALS, flatten_hospitals
+from .geo_index import GeoIndex
+from .location_resolver import LocationResolver
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE hospitals (
+    id INTEGER PRIMARY KEY,
+    city TEXT NOT NULL,
+    rank INTEGER NOT NULL,              -- order of preference within the city
+    name TEXT NOT NULL,
+    address TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    emergency_phone TEXT,
+    emergency_services INTEGER NOT NULL DEFAULT 0,
+    latitude REAL,
+    longitude REAL
+);
+CREATE TABLE specialties (
+    hospital_id INTEGER NOT NULL REFERENCES hospitals (id),
+    position INTEGER NOT NULL,
+    specialty TEXT NOT NULL
+);
+CREATE INDEX specialties_hospital ON specialties (hospital_id, position);
+"""
+
+# Map the file instead of copying pages through read() calls
+MMAP_BYTES = 256 * 1024 * 1024
+
+def write_store(path: str, hospitals_by_city: Dict[str, List[Dict[str, Any]]]) -> int:
+    """Write hospitals_by_city to a new SQLite file at path, returning the row count
+
+    The file is built next to path and renamed over it, so a reader or a
+    watching server only ever sees the old file or the complete new one.
+    """
+    temporary = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(temporary):
+        os.remove(temporary)
+
+    rows = 0
+    connection = sqlite3.connect(temporary)
+    try:
+        connection.executescript(SCHEMA)
+        for city, hospitals in hospitals_by_city.items():
+            for rank, hospital in enumerate(hospitals):
+                cursor = connection.execute(
+                    "INSERT INTO hospitals (city, rank, name, address, phone, emergency_phone,"
+                    " emergency_services, latitude, longitude) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        city.lower(), rank, hospital['name'], hospital['address'], hospital['phone'],
+                        hospital.get('emergency_phone'), int(bool(hospital.get('emergency_services'))),
+                        hospital.get('latitude'), hospital.get('longitude')
+                    )
+                )
+                connection.executemany(
+                    "INSERT INTO specialties (hospital_id, position, specialty) VALUES (?, ?, ?)",
+                    [(cursor.lastrowid, i, specialty) for i, specialty in enumerate(hospital.get('specialties', []))]
+                )
+                rows += 1
+        connection.executemany(
+            "INSERT INTO metadata (key, value) VALUES (?, ?)",
+            [('schema_version', str(SCHEMA_VERSION)), ('created_at', str(time.time())), ('rows', str(rows))]
+        )
+        connection.commit()
+    finally:
+        connection.close()
+
+    os.replace(temporary, path)
+    return rows
+
+
+def read_store(path: str) -> Dict[str, List[Dict[str, Any]]]:
+    """Hospital records by city key from a SQLite store, in the shape of INDIAN_HOSPITALS"""
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        connection.execute(f"PRAGMA mmap_size = {MMAP_BYTES}")
+        version = connection.execute("SELECT value FROM metadata WHERE key = 'schema_version'").fetchone()
+        if not version or int(version[0]) != SCHEMA_VERSION:
+            raise ValueError(f"{path} is not a version {SCHEMA_VERSION} hospital store")
+
+        specialties: Dict[int, List[str]] = defaultdict(list)
+        for hospital_id, specialty in connection.execute(
+            "SELECT hospital_id, specialty FROM specialties ORDER BY hospital_id, position"
+        ):
+            specialties[hospital_id].append(specialty)
+
+        hospitals_by_city: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for (hospital_id, city, name, address, phone, emergency_phone,
+             emergency_services, latitude, longitude) in connection.execute(
+            "SELECT id, city, name, address, phone, emergency_phone, emergency_services, latitude, longitude"
+            " FROM hospitals ORDER BY id"
+        ):
+            hospitals_by_city[city].append({
+                "name": name,
+                "address": address,
+                "phone": phone,
+                "emergency_phone": emergency_phone,
+                "specialties": specialties.get(hospital_id, []),
+                "emergency_services": bool(emergency_services),
+                "latitude": latitude,
+                "longitude": longitude
+            })
+        return dict(hospitals_by_city)
+    finally:
+        connection.close()
+
+
+class HospitalSnapshot:
+    def __init__(self, hospitals_by_city: Dict[str, List[Dict[str, Any]]], source: str = "bundled"):
+        """Records plus everything derived from them, built once and never mutated"""
+        self.hospitals_by_city = hospitals_by_city
+        self.hospitals = flatten_hospitals(hospitals_by_city)
+        self.geo_index = GeoIndex(self.hospitals)
+        self.location_resolver = LocationResolver.from_hospitals(
+            hospitals_by_city,
+            fuzzy_min_similarity=settings.LOCATION_FUZZY_MIN_SIMILARITY,
+            fuzzy_budget_ms=settings.LOCATION_FUZZY_BUDGET_MS
+        )
+        self.source = source
+        self.loaded_at = time.time()
+
+        # Lowercased specialty -> city key -> records, in preference order
+        self._by_specialty: Dict[str, Dict[str, List[Dict[str, Any]]]] = defaultdict(lambda: defaultdict(list))
+        for city, hospitals in hospitals_by_city.items():
+            for hospital in hospitals:
+                for specialty in hospital.get('specialties', []):
+                    self._by_specialty[specialty.lower()][city].append(hospital)
+
+    def __len__(self) -> int:
+        return len(self.hospitals)
+
+    def in_city(self, city: str, emergency_only: bool = False, specialty: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Hospitals of a city key in preference order, optionally filtered"""
+        if specialty:
+            by_city = self._by_specialty.get(specialty.lower())
+            hospitals = by_city.get(city, []) if by_city else []
+        else:
+            hospitals = self.hospitals_by_city.get(city, [])
+        if emergency_only:
+            hospitals = [h for h in hospitals if h.get('emergency_services', False)]
+        return hospitals
+
+
+class HospitalStore:
+    def __init__(self, path: Optional[str] = None):
+        """Current hospital snapshot, from the SQLite file at path or the bundled data
+
+        Readers take self.snapshot once per request; reload() builds a complete
+        new snapshot before replacing that single reference.
+        """
+        self.path = path if path is not None else settings.HOSPITAL_STORE_PATH
+        self._reload_lock = threading.Lock()
+        self._signature: Optional[Tuple[int, int, int]] = None
+        self.stats: Dict[str, Any] = {
+            'reloads': 0,
+            'failed_reloads': 0,
+            'last_error': None
+        }
+        try:
+            self.snapshot = self._load()
+        except Exception as e:
+            # A missing or broken store must not keep the app from starting
+            self.stats['failed_reloads'] += 1
+            self.stats['last_error'] = str(e)
+            self._signature = self._file_signature()
+            logger.error(f"❌ Hospital store {self.path} could not be loaded, serving the bundled data: {e}")
+            self.snapshot = HospitalSnapshot(INDIAN_HOSPITALS)
+
+    def _file_signature(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def _load(self) -> HospitalSnapshot:
+        if not self.path:
+            return HospitalSnapshot(INDIAN_HOSPITALS)
+        signature = self._file_signature()
+        snapshot = HospitalSnapshot(read_store(self.path), source=self.path)
+        self._signature = signature
+        return snapshot
+
+    def reload(self) -> HospitalSnapshot:
+        """Build a new snapshot and swap it in; on failure the old one stays in service"""
+        with self._reload_lock:
+            started = time.perf_counter()
+            try:
+                snapshot = self._load()
+            except Exception as e:
+                self.stats['failed_reloads'] += 1
+                self.stats['last_error'] = str(e)
+                logger.error(f"❌ Hospital store reload failed, keeping {len(self.snapshot)} hospitals: {e}")
+                raise
+            self.snapshot = snapshot
+            self.stats['reloads'] += 1
+            self.stats['last_error'] = None
+            logger.info(
+                f"🏥 Loaded {len(snapshot)} hospitals from {snapshot.source} "
+                f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+            )
+            return snapshot
+
+    def reload_if_changed(self) -> bool:
+        """Reload when the store file was replaced or modified since the last load"""
+        if not self.path:
+            return False
+        signature = self._file_signature()
+        if signature is None or signature == self._signature:
+            return False
+        try:
+            self.reload()
+        except Exception:
+            # Don't retry the same broken file every poll
+            self._signature = signature
+            return False
+        return True
+
+    async def watch(self, interval: Optional[float] = None):
+        """Poll the store file and reload it when it changes (run as a background task)
+
+        Returns at once for the bundled data or a non-positive interval.
+        """
+        interval = settings.HOSPITAL_STORE_POLL_SECONDS if interval is None else interval
+        if not self.path or interval <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await loop.run_in_executor(None, self.reload_if_changed)
+            except Exception as e:
+                logger.error(f"Hospital store watch error: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        snapshot = self.snapshot
+        return {
+            **self.stats,
+            'source': snapshot.source,
+            'hospitals': len(snapshot),
+            'cities': len(snapshot.hospitals_by_city),
+            'loaded_at': snapshot.loaded_at
+        }
+
+
+# Shared store: every service reads hospitals through the same snapshot
+hospital_store = HospitalStore()
@@ -0,0 +1,84 @@
+"""
+Hospital store checks
+A SQLite store round-trips the bundled data, reloads when replaced, and never takes the service down
+"""
+
+import os
+
+import pytest
+
+from services.hospital_data import INDIAN_HOSPITALS
+from services.hospital_store import HospitalSnapshot, HospitalStore, read_store, write_store
+
+def _replace(path: str, hospitals_by_city: dict):
+    write_store(path, hospitals_by_city)
+    # Make sure the signature changes even within one mtime tick
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "hospitals.db")
+    rows = write_store(path, INDIAN_HOSPITALS)
+
+    assert rows == sum(len(hospitals) for hospitals in INDIAN_HOSPITALS.values())
+    assert read_store(path) == INDIAN_HOSPITALS
+    assert not os.path.exists(f"{path}.{os.getpid()}.tmp")
+
+
+def test_snapshot_lookups():
+    snapshot = HospitalSnapshot(INDIAN_HOSPITALS)
+    mumbai = INDIAN_HOSPITALS['mumbai']
+
+    assert snapshot.in_city('mumbai') == mumbai
+    assert snapshot.in_city('mumbai', emergency_only=True) == [h for h in mumbai if h['emergency_services']]
+    cardiology = snapshot.in_city('mumbai', specialty='CARDIOLOGY')
+    assert cardiology == [h for h in mumbai if 'Cardiology' in h['specialties']]
+    assert snapshot.in_city('atlantis') == []
+    assert snapshot.location_resolver.resolve('bandra') == 'mumbai'
+
+
+def test_reload_if_changed(tmp_path):
+    path = str(tmp_path / "hospitals.db")
+    write_store(path, {'mumbai': INDIAN_HOSPITALS['mumbai']})
+    store = HospitalStore(path)
+    old = store.snapshot
+    assert list(old.hospitals_by_city) == ['mumbai']
+    assert not store.reload_if_changed()
+
+    _replace(path, INDIAN_HOSPITALS)
+    assert store.reload_if_changed()
+    assert store.snapshot is not old
+    assert len(store.snapshot) == len(HospitalSnapshot(INDIAN_HOSPITALS))
+    assert store.get_stats()['reloads'] == 1
+
+
+def test_broken_reload_keeps_serving(tmp_path):
+    path = str(tmp_path / "hospitals.db")
+    write_store(path, INDIAN_HOSPITALS)
+    store = HospitalStore(path)
+    snapshot = store.snapshot
+
+    with open(path, 'wb') as f:
+        f.write(b"not a database")
+    with pytest.raises(Exception):
+        store.reload()
+    assert store.snapshot is snapshot
+    # The watcher tries the broken file once, then not again until it changes
+    assert not store.reload_if_changed()
+    assert not store.reload_if_changed()
+    assert store.snapshot is snapshot
+    assert store.get_stats()['failed_reloads'] == 2
+    assert store.get_stats()['last_error']
+
+
+def test_missing_store_falls_back_to_bundled_data(tmp_path):
+    store = HospitalStore(str(tmp_path / "missing.db"))
+    assert store.snapshot.source == "bundled"
+    assert store.snapshot.hospitals_by_city == INDIAN_HOSPITALS
+    assert store.get_stats()['failed_reloads'] == 1
+
+    # Once the file appears it is picked up
+    write_store(store.path, {'pune': INDIAN_HOSPITALS['pune']})
+    assert store.reload_if_changed()
+    assert list(store.snapshot.hospitals_by_city) == ['pune']
@@ -0,0 +1,234 @@
+"""
+Async LLM Client - Non-blocking execution layer for Gemini chat calls
+Runs chat requests without blocking the event loop, with bounded concurrency and per-call timeouts
+"""
+
+import asyncio
+import copy
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+class AsyncLLMClient:
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        executor_workers: Optional[int] = None
+    ):
+        """Initialize the async LLM client"""
+        self.max_concurrency = max_concurrency or settings.LLM_MAX_CONCURRENCY
+        self.timeout = timeout or settings.LLM_TIMEOUT
+
+        # Limits how many LLM calls may be in flight at once across all sessions
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        # Dedicated pool for chat objects that only expose a blocking API,
+        # so LLM calls never compete with the default executor used for TTS
+        self._executor = ThreadPoolExecutor(
+            max_workers=executor_workers or settings.LLM_EXECUTOR_WORKERS,
+            thread_name_prefix="llm"
+        )
+
+        self.stats: Dict[str, int] = {
+            'in_flight': 0,
+            'completed': 0,
+            'timeouts': 0,
+            'cancelled': 0,
+            'errors': 0,
+            'abandoned_workers': 0
+        }
+
+    async def send_message(self, chat: Any, prompt: str, timeout: Optional[float] = None) -> Any:
+        """Send a message on a chat session without blocking the event loop"""
+        timeout = timeout or self.timeout
+        workers: List[Future] = []
+
+        await self._semaphore.acquire()
+        self.stats['in_flight'] += 1
+        try:
+            response = await asyncio.wait_for(self._send(chat, prompt, timeout, workers), timeout=timeout)
+            self.stats['completed'] += 1
+            return response
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            logger.warning(f"🤖 LLM call timed out after {timeout}s")
+            raise
+        except asyncio.CancelledError:
+            self.stats['cancelled'] += 1
+            logger.info(f"🤖 LLM call cancelled")
+            raise
+        except Exception:
+            self.stats['errors'] += 1
+            raise
+        finally:
+            self.stats['in_flight'] -= 1
+            self._release_after(workers)
+
+    async def _send(self, chat: Any, prompt: str, timeout: float, workers: List[Future]) -> Any:
+        """Use the native async client when available, otherwise the dedicated executor
+
+        A blocking call runs on a copy of the chat whose history replaces the
+        live one only once it succeeds, so a call given up on can't append its
+        late turn in the middle of the next one.
+        """
+        if hasattr(chat, 'send_message_async'):
+            return await chat.send_message_async(prompt, request_options={'timeout': timeout})
+
+        worker = self._executor.submit(self._send_detached, chat, list(chat.history), prompt)
+        workers.append(worker)
+        response, history = await asyncio.wrap_future(worker)
+        chat.history = history
+        return response
+
+    @staticmethod
+    def _send_detached(chat: Any, history: List[Any], prompt: str) -> Tuple[Any, List[Any]]:
+        """Blocking send on a copy of chat; returns the response and the copy's new history"""
+        detached = copy.copy(chat)
+        detached.history = history
+        response = detached.send_message(prompt)
+        return response, list(detached.history)
+
+    def _release_after(self, workers: List[Future]):
+        """Free the concurrency slot, or keep it until abandoned executor work really ends
+
+        A thread stuck in a blocking call still holds an executor worker, so its
+        slot is only returned from the future's done callback.
+        """
+        running = [worker for worker in workers if not worker.done()]
+        if not running:
+            self._semaphore.release()
+            return
+
+        self.stats['abandoned_workers'] += 1
+        loop = asyncio.get_running_loop()
+        remaining = len(running)
+
+        def _done(_):
+            nonlocal remaining
+            remaining -= 1
+            if remaining == 0:
+                loop.call_soon_threadsafe(self._semaphore.release)
+
+        for worker in running:
+            worker.add_done_callback(_done)
+
+    async def stream_message(
+        self,
+        chat: Any,
+        prompt: str,
+        timeout: Optional[float] = None
+    ) -> AsyncGenerator[str, None]:
+        """Send a message on a chat session and yield response text as it arrives"""
+        timeout = timeout or self.timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        workers: List[Future] = []
+
+        # A reply cut off part way leaves genai's ChatSession holding an incomplete
+        # response, after which every history read or send on it raises; the
+        # history from before the turn is put back whenever the stream doesn't finish
+        history = list(chat.history)
+        finished = False
+
+        await self._semaphore.acquire()
+        self.stats['in_flight'] += 1
+        chunks = self._stream(chat, prompt, timeout, workers)
+        try:
+            while True:
+                # The timeout bounds the whole reply, not each chunk
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                try:
+                    text = await asyncio.wait_for(chunks.__anext__(), timeout=remaining)
+                except StopAsyncIteration:
+                    break
+                yield text
+            finished = True
+            self.stats['completed'] += 1
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            logger.warning(f"🤖 LLM stream timed out after {timeout}s")
+            raise
+        except (asyncio.CancelledError, GeneratorExit):
+            self.stats['cancelled'] += 1
+            logger.info(f"🤖 LLM stream cancelled")
+            raise
+        except Exception:
+            self.stats['errors'] += 1
+            raise
+        finally:
+            self.stats['in_flight'] -= 1
+            try:
+                await chunks.aclose()
+            finally:
+                if not finished:
+                    chat.history = history
+                self._release_after(workers)
+
+    async def _stream(self, chat: Any, prompt: str, timeout: float, workers: List[Future]) -> AsyncGenerator[str, None]:
+        """Yield non-empty text chunks from the native async stream or a pumped blocking stream"""
+        if hasattr(chat, 'send_message_async'):
+            response = await chat.send_message_async(
+                prompt,
+                stream=True,
+                request_options={'timeout': timeout}
+            )
+            async for chunk in response:
+                text = self._chunk_text(chunk)
+                if text:
+                    yield text
+            return
+
+        # Blocking clients are iterated on the dedicated executor, on a copy of
+        # the chat as in _send, and their chunks handed back through a queue
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+        detached = copy.copy(chat)
+        detached.history = list(chat.history)
+
+        def _pump():
+            try:
+                for chunk in detached.send_message(prompt, stream=True):
+                    loop.call_soon_threadsafe(queue.put_nowait, self._chunk_text(chunk))
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+
+        pump = self._executor.submit(_pump)
+        workers.append(pump)
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            if item:
+                yield item
+        await asyncio.wrap_future(pump)
+        chat.history = list(detached.history)
+
+    @staticmethod
+    def _chunk_text(chunk: Any) -> str:
+        """Extract text from a response chunk (safety-blocked chunks carry none)"""
+        try:
+            return chunk.text or ""
+        except (ValueError, AttributeError):
+            return ""
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get LLM execution statistics"""
+        return {
+            **self.stats,
+            'max_concurrency': self.max_concurrency,
+            'timeout': self.timeout
+        }
+
+# Shared client so every service instance draws from the same concurrency budget
+llm_client = AsyncLLMClient()
@@ -0,0 +1,98 @@
+"""
+LLM client checks
+A Gemini chat whose streamed reply is cut off must still take its next message
+"""
+
+import asyncio
+
+import google.generativeai as genai
+from google.generativeai import protos
+from google.generativeai.types import generation_types
+
+from services.llm_client import AsyncLLMClient
+
+def _chunk(text: str) -> protos.GenerateContentResponse:
+    return protos.GenerateContentResponse(candidates=[
+        protos.Candidate(content=protos.Content(role='model', parts=[protos.Part(text=text)]))
+    ])
+
+
+def _chat(chunks_per_reply: int, delay: float = 0.01) -> genai.ChatSession:
+    """Real ChatSession over a model whose replies are canned streams, delay apart"""
+    model = genai.GenerativeModel('gemini-test')
+
+    async def generate_content_async(contents, stream=False, **kwargs):
+        async def chunks():
+            for i in range(chunks_per_reply):
+                await asyncio.sleep(delay)
+                yield _chunk(f"part {i}. ")
+        if stream:
+            return await generation_types.AsyncGenerateContentResponse.from_aiterator(chunks())
+        return generation_types.AsyncGenerateContentResponse.from_response(_chunk("whole reply"))
+
+    model.generate_content_async = generate_content_async
+    return model.start_chat(history=[])
+
+
+async def _next_turn_after(cut_off) -> list:
+    client = AsyncLLMClient(max_concurrency=1, timeout=5)
+    # Cut-offs land halfway between chunks, well clear of a chunk arriving
+    chat = _chat(chunks_per_reply=10, delay=0.2)
+    await cut_off(client, chat)
+
+    # The chat is usable again: history reads and the next message both work
+    assert chat.history == []
+    response = await client.send_message(chat, "next question")
+    assert response.text == "whole reply"
+    return chat.history
+
+
+def test_stream_closed_by_consumer_rewinds_chat():
+    async def cut_off(client, chat):
+        stream = client.stream_message(chat, "first question")
+        assert await stream.__anext__() == "part 0. "
+        await stream.aclose()
+
+    assert len(asyncio.run(_next_turn_after(cut_off))) == 2
+
+
+def test_stream_past_deadline_rewinds_chat():
+    async def cut_off(client, chat):
+        try:
+            async for _ in client.stream_message(chat, "first question", timeout=0.5):
+                pass
+        except asyncio.TimeoutError:
+            return
+        raise AssertionError("stream should have timed out")
+
+    assert len(asyncio.run(_next_turn_after(cut_off))) == 2
+
+
+def test_cancelled_stream_rewinds_chat():
+    async def cut_off(client, chat):
+        first = asyncio.Event()
+
+        async def consume():
+            async for _ in client.stream_message(chat, "first question"):
+                first.set()
+        task = asyncio.create_task(consume())
+        await first.wait()
+        await asyncio.sleep(0.1)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    assert len(asyncio.run(_next_turn_after(cut_off))) == 2
+
+
+def test_finished_stream_keeps_turn():
+    async def run():
+        client = AsyncLLMClient(max_concurrency=1, timeout=5)
+        chat = _chat(chunks_per_reply=2)
+        parts = [text async for text in client.stream_message(chat, "question")]
+        assert parts == ["part 0. ", "part 1. "]
+        return chat.history
+
+    assert len(asyncio.run(run())) == 2
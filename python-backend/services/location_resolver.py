@@ -0,0 +1,347 @@
+"""
+Location Resolver
+Maps free-text locations ("near Andheri station", "दिल्ली", "400050") to a city key
+of the hospital data with one Aho-Corasick pass over aliases compiled at startup,
+falling back to fuzzy, transliteration-aware matching for misheard or misspelled names
+
+Standard library only, so the Streamlit and console apps in model/ can share it.
+"""
+
+import bisect
+import re
+import time
+import unicodedata
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .fuzzy_names import TrigramIndex
+
+# Other names per city key: old names, localities, romanized variants and the
+# city's name in the scripts of the supported languages
+CITY_ALIASES = {
+    'mumbai': [
+        'bombay', 'bandra', 'andheri', 'mahim', 'worli', 'colaba', 'powai',
+        'मुंबई', 'मुम्बई', 'बंबई', 'મુંબઈ', 'মুম্বাই', 'മുംബൈ', 'ممبئی'
+    ],
+    'delhi': [
+        'new delhi', 'dilli', 'ncr', 'gurgaon', 'gurugram', 'noida',
+        'दिल्ली', 'नई दिल्ली', 'દિલ્હી', 'দিল্লি', 'ഡൽഹി', 'دہلی', 'دلی'
+    ],
+    'bangalore': [
+        'bengaluru', 'whitefield', 'koramangala',
+        'बेंगलुरु', 'बैंगलोर', 'બેંગલુરુ', 'বেঙ্গালুরু', 'ബെംഗളൂരു', 'ബാംഗ്ലൂർ', 'بنگلور'
+    ],
+    'chennai': [
+        'madras', 'anna nagar', 'velachery',
+        'चेन्नई', 'ચેન્નાઈ', 'চেন্নাই', 'ചെന്നൈ', 'چنئی', 'சென்னை'
+    ],
+    'kolkata': [
+        'calcutta', 'salt lake',
+        'कोलकाता', 'कलकत्ता', 'કોલકાતા', 'কলকাতা', 'കൊൽക്കത്ത', 'کولکاتا'
+    ],
+    'hyderabad': [
+        'secunderabad', 'hitech city',
+        'हैदराबाद', 'હૈદરાબાદ', 'হায়দরাবাদ', 'ഹൈദരാബാദ്', 'حیدرآباد'
+    ],
+    'pune': [
+        'poona', 'baner', 'hinjewadi',
+        'पुणे', 'પુણે', 'পুনে', 'പൂനെ', 'پونے'
+    ],
+    'ahmedabad': [
+        'amdavad', 'sg highway',
+        'अहमदाबाद', 'અમદાવાદ', 'আহমেদাবাদ', 'അഹമ്മദാബാദ്', 'احمد آباد', 'احمدآباد'
+    ]
+}
+
+# Official and former names per city key, the only names (with the key itself)
+# that a typed or misheard start of a word may complete to; localities never do
+CANONICAL_NAMES = {
+    'mumbai': ['bombay'],
+    'delhi': ['new delhi'],
+    'bangalore': ['bengaluru'],
+    'chennai': ['madras'],
+    'kolkata': ['calcutta'],
+    'hyderabad': [],
+    'pune': ['poona'],
+    'ahmedabad': ['amdavad']
+}
+
+# States and cities without hospital data whose names begin like a served
+# city's ("bengal" / "bengaluru", "ahmednagar" / "ahmedabad"); a prefix that
+# could be one of these is not completed, so a caller there is never sent
+# to hospitals in another state
+UNSERVED_PLACES = [
+    'andhra pradesh', 'arunachal pradesh', 'assam', 'bihar', 'chhattisgarh', 'goa',
+    'gujarat', 'haryana', 'himachal pradesh', 'jharkhand', 'karnataka', 'kerala',
+    'madhya pradesh', 'maharashtra', 'manipur', 'meghalaya', 'mizoram', 'nagaland',
+    'odisha', 'orissa', 'punjab', 'rajasthan', 'sikkim', 'tamil nadu', 'telangana',
+    'tripura', 'uttar pradesh', 'uttarakhand', 'west bengal', 'bengal', 'bangladesh',
+    'jammu', 'kashmir', 'ladakh', 'chandigarh', 'puducherry', 'pondicherry',
+    'ahmednagar', 'mumbra', 'madurai', 'kolhapur', 'chengalpattu', 'dehradun'
+]
+
+# Words callers use around a location ("my name is ...", "near the station",
+# "mera ghar ... mein hai") that are never part of a place name; runs of words
+# containing one are not fuzzy matched, so a caller's sentence isn't read as a city
+NON_PLACE_WORDS = {
+    'a', 'am', 'an', 'and', 'at', 'be', 'call', 'chest', 'doctor', 'from', 'help',
+    'hi', 'hello', 'hospital', 'i', 'im', 'in', 'is', 'me', 'my', 'name', 'near',
+    'of', 'pain', 'please', 'the', 'to', 'we', 'yes', 'no',
+    'aap', 'aur', 'dard', 'ghar', 'hai', 'hain', 'hoon', 'hun', 'ka', 'ke', 'ki',
+    'ko', 'main', 'mein', 'mera', 'meri', 'naam', 'paas', 'se'
+}
+
+# First three pincode digits (the sorting district) per city key
+PINCODE_PREFIXES = {
+    'mumbai': ['400', '401'],
+    'delhi': ['110', '122', '201'],
+    'bangalore': ['560', '562'],
+    'chennai': ['600'],
+    'kolkata': ['700'],
+    'hyderabad': ['500'],
+    'pune': ['411', '412'],
+    'ahmedabad': ['380', '382']
+}
+
+PINCODE_PATTERN = re.compile(r'(?<!\d)(\d{6})(?!\d)')
+
+# Typing or hearing the start of a city name ("hyder") resolves once it is this long
+MIN_PREFIX_CHARS = 4
+
+def normalize_location(text: str) -> str:
+    """Casefold, drop punctuation and collapse whitespace, keeping Indic vowel signs
+
+    \\w would drop combining marks (matras), so letters, marks and digits are kept
+    by Unicode category instead.
+    """
+    text = unicodedata.normalize('NFC', text).casefold()
+    kept = [char if unicodedata.category(char)[0] in 'LMN' else ' ' for char in text]
+    return " ".join("".join(kept).split())
+
+
+class LocationMatch(NamedTuple):
+    city: str
+    alias: str          # normalized alias, pincode or typed prefix that matched
+    kind: str           # 'pincode', 'alias', 'prefix' or 'fuzzy'
+    start: int          # span in the normalized text
+    end: int
+    score: float = 1.0  # similarity of a fuzzy match
+
+
+class LocationResolver:
+    def __init__(
+        self,
+        aliases: Dict[str, Iterable[str]],
+        pincodes: Dict[str, str],
+        pincode_prefixes: Dict[str, str],
+        fuzzy_min_similarity: float = 0.8,
+        fuzzy_budget_ms: float = 5.0,
+        canonical_names: Optional[Dict[str, Iterable[str]]] = None,
+        unserved_places: Optional[Iterable[str]] = None
+    ):
+        """Compile the alias automaton, the prefix table and the fuzzy index
+
+        aliases maps city key -> names (the key itself is always one), pincodes maps
+        a full 6-digit pincode -> city key, pincode_prefixes its first 3 digits.
+        Only city keys and canonical_names are completed from a prefix, and never
+        a prefix of one of unserved_places. Fuzzy matching gives up after
+        fuzzy_budget_ms (0 disables it).
+        """
+        self.cities = list(aliases)
+        self.pincodes = dict(pincodes)
+        self.pincode_prefixes = dict(pincode_prefixes)
+        self.fuzzy_budget_ms = fuzzy_budget_ms
+        self._fuzzy = TrigramIndex(min_similarity=fuzzy_min_similarity)
+        self._max_alias_words = 1
+
+        # Trie nodes: children, failure link, (alias index) outputs
+        self._children: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[int]] = [[]]
+        self._aliases: List[Tuple[str, str]] = []
+
+        for city, names in aliases.items():
+            for name in {city, *names}:
+                alias = normalize_location(name)
+                if alias:
+                    self._add(alias, city)
+                    self._fuzzy.add(alias, (alias, city))
+                    self._max_alias_words = max(self._max_alias_words, len(alias.split()))
+        self._link()
+
+        # Sorted (name, city) pairs, so the names starting with a prefix are one slice
+        canonical_names = CANONICAL_NAMES if canonical_names is None else canonical_names
+        self._prefix_names = sorted({
+            (normalize_location(name), city)
+            for city in self.cities
+            for name in [city, *canonical_names.get(city, [])]
+            if normalize_location(name)
+        })
+        self._unserved = [
+            normalize_location(place)
+            for place in (UNSERVED_PLACES if unserved_places is None else unserved_places)
+        ]
+
+    @classmethod
+    def from_hospitals(
+        cls,
+        hospitals_by_city: Dict[str, List[Dict]],
+        aliases: Optional[Dict[str, List[str]]] = None,
+        pincode_prefixes: Optional[Dict[str, List[str]]] = None,
+        **fuzzy_options
+    ) -> "LocationResolver":
+        """Resolver for the city keys of a hospital dataset
+
+        Full pincodes are taken from the hospital addresses; aliases and pincode
+        prefixes default to the built-in tables, limited to cities in the data.
+        fuzzy_options go to the constructor.
+        """
+        aliases = CITY_ALIASES if aliases is None else aliases
+        pincode_prefixes = PINCODE_PREFIXES if pincode_prefixes is None else pincode_prefixes
+
+        pincodes = {}
+        for city, hospitals in hospitals_by_city.items():
+            for hospital in hospitals:
+                for pincode in PINCODE_PATTERN.findall(hospital.get('address', '')):
+                    pincodes.setdefault(pincode, city)
+
+        return cls(
+            {city: aliases.get(city, []) for city in hospitals_by_city},
+            pincodes,
+            {
+                prefix: city
+                for city in hospitals_by_city
+                for prefix in pincode_prefixes.get(city, [])
+            },
+            **fuzzy_options
+        )
+
+    def resolve(self, text: str) -> Optional[str]:
+        """City key for a free-text location, or None"""
+        match = self.match(text)
+        return match.city if match else None
+
+    def match(self, text: str) -> Optional[LocationMatch]:
+        """Best match in the text: a known pincode, then the longest (then earliest)
+        alias, then a unique alias starting with the whole text, then the closest
+        spelling or transliteration of an alias
+        """
+        normalized = normalize_location(text)
+        if not normalized:
+            return None
+
+        pincode = self._match_pincode(normalized)
+        if pincode:
+            return pincode
+
+        best = None
+        for match in self._scan(normalized):
+            if best is None or (match.end - match.start, -match.start) > (best.end - best.start, -best.start):
+                best = match
+        if best:
+            return best
+
+        return self._match_prefix(normalized) or self._match_fuzzy(normalized)
+
+    def _match_pincode(self, normalized: str) -> Optional[LocationMatch]:
+        prefixed = None
+        for found in PINCODE_PATTERN.finditer(normalized):
+            pincode = found.group(1)
+            if pincode in self.pincodes:
+                return LocationMatch(self.pincodes[pincode], pincode, 'pincode', found.start(), found.end())
+            if prefixed is None and pincode[:3] in self.pincode_prefixes:
+                prefixed = LocationMatch(self.pincode_prefixes[pincode[:3]], pincode, 'pincode', found.start(), found.end())
+        return prefixed
+
+    def _scan(self, normalized: str) -> Iterable[LocationMatch]:
+        """Every alias occurring as whole words, in one pass over the text"""
+        # Aliases are stored space-padded, so matches always sit on word boundaries
+        padded = f" {normalized} "
+        node = 0
+        for position, char in enumerate(padded):
+            while node and char not in self._children[node]:
+                node = self._fail[node]
+            node = self._children[node].get(char, 0)
+            for index in self._outputs[node]:
+                alias, city = self._aliases[index]
+                end = position - 1
+                start = end - len(alias)
+                yield LocationMatch(city, alias, 'alias', max(0, start), end)
+
+    def _match_prefix(self, normalized: str) -> Optional[LocationMatch]:
+        """The text is the start of exactly one city's names ("hyder", "bengalu")
+
+        Refused when it could also be the start of an unserved place ("bengal").
+        """
+        if len(normalized) < MIN_PREFIX_CHARS:
+            return None
+        if any(place.startswith(normalized) for place in self._unserved):
+            return None
+
+        first = bisect.bisect_left(self._prefix_names, (normalized, ''))
+        cities = set()
+        for name, city in self._prefix_names[first:]:
+            if not name.startswith(normalized):
+                break
+            cities.add(city)
+        if len(cities) != 1:
+            return None
+        return LocationMatch(cities.pop(), normalized, 'prefix', 0, len(normalized))
+
+    def _match_fuzzy(self, normalized: str) -> Optional[LocationMatch]:
+        """Most similar alias to any run of words ("bangaluru", "kolkatta", "मुम्बइ")
+
+        Runs containing one of NON_PLACE_WORDS are skipped. Longer runs are tried
+        first; the search stops at the time budget with the best match found so far.
+        """
+        if self.fuzzy_budget_ms <= 0:
+            return None
+        deadline = time.perf_counter() + self.fuzzy_budget_ms / 1000
+        words = normalized.split()
+        starts = [found.start() for found in re.finditer(r'\S+', normalized)]
+
+        best = None
+        for size in range(min(self._max_alias_words, len(words)), 0, -1):
+            for first in range(len(words) - size + 1):
+                if time.perf_counter() > deadline:
+                    return best
+                run = words[first:first + size]
+                if any(word in NON_PLACE_WORDS for word in run):
+                    continue
+                phrase = " ".join(run)
+                found = self._fuzzy.search(phrase, limit=1, deadline=deadline)
+                if found and (best is None or found[0][0] > best.score):
+                    score, (alias, city) = found[0]
+                    start = starts[first]
+                    best = LocationMatch(city, alias, 'fuzzy', start, start + len(phrase), score)
+            if best and best.score == 1.0:
+                break
+        return best
+
+    def _add(self, alias: str, city: str):
+        index = len(self._aliases)
+        self._aliases.append((alias, city))
+        node = 0
+        for char in f" {alias} ":
+            child = self._children[node].get(char)
+            if child is None:
+                child = len(self._children)
+                self._children[node][char] = child
+                self._children.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            node = child
+        self._outputs[node].append(index)
+
+    def _link(self):
+        """Breadth-first failure links; each node also reports its suffixes' aliases"""
+        queue = deque(self._children[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._children[node].items():
+                fallback = self._fail[node]
+                while fallback and char not in self._children[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._children[fallback].get(char, 0)
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+                queue.append(child)
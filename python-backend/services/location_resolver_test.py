@@ -0,0 +1,69 @@
+"""
+Location resolver checks
+Free text resolves to the city it names, and to nothing when it names no served city
+"""
+
+import pytest
+
+from services.hospital_data import INDIAN_HOSPITALS
+from services.location_resolver import LocationResolver
+
+RESOLVER = LocationResolver.from_hospitals(INDIAN_HOSPITALS)
+
+@pytest.mark.parametrize("text, city", [
+    ("Mumbai", "mumbai"),
+    ("near Andheri station", "mumbai"),
+    ("I am in Salt Lake", "kolkata"),
+    ("दिल्ली", "delhi"),
+    ("சென்னை", "chennai"),
+    ("400050", "mumbai"),
+    ("pin 560001 please", "bangalore"),
+    ("hyder", "hyderabad"),
+    ("bengalu", "bangalore"),
+])
+def test_exact_prefix_and_pincode(text, city):
+    assert RESOLVER.resolve(text) == city
+
+
+@pytest.mark.parametrize("text, city", [
+    ("bangaluru", "bangalore"),
+    ("Kolkatta", "kolkata"),
+    ("मुम्बइ", "mumbai"),
+    ("hydrabad", "hyderabad"),
+    ("secundrabad", "hyderabad"),
+    ("koramangla", "bangalore"),
+    ("anna nagr", "chennai"),
+])
+def test_misspellings_and_transliterations(text, city):
+    match = RESOLVER.match(text)
+    assert match.city == city
+    assert match.kind == 'fuzzy'
+
+
+@pytest.mark.parametrize("text", [
+    "poonam",
+    "my name is Poonam",
+    "Sandra",
+    "puneet",
+    "chest pain",
+    "help me",
+    "Bengal",
+    "West Bengal",
+    "mumb",
+    "Ahmednagar",
+    "june",
+    "",
+])
+def test_names_and_unserved_places_resolve_to_nothing(text):
+    assert RESOLVER.resolve(text) is None
+
+
+def test_longest_alias_wins():
+    match = RESOLVER.match("new delhi")
+    assert (match.city, match.alias) == ("delhi", "new delhi")
+
+
+def test_fuzzy_can_be_disabled():
+    resolver = LocationResolver.from_hospitals(INDIAN_HOSPITALS, fuzzy_budget_ms=0)
+    assert resolver.resolve("bangaluru") is None
+    assert resolver.resolve("bengaluru") == "bangalore"
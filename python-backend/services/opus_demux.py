@@ -0,0 +1,199 @@
+"""
+Opus Container Demuxers
+Minimal WebM (Matroska/EBML) and Ogg parsers that pull Opus packets out of a
+browser recording so they can be decoded in-process without ffmpeg
+
+Only what MediaRecorder produces is handled: one Opus audio track, unlaced
+blocks, unknown-size Segment/Cluster elements. Anything else raises DemuxError
+and is left to ffmpeg.
+"""
+
+import functools
+import struct
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+class DemuxError(Exception):
+    """Raised when a container can't be demuxed to Opus packets"""
+
+
+def _malformed_as_demux_error(demux: Callable[[bytes], "OpusStream"]) -> Callable[[bytes], "OpusStream"]:
+    """Report any parse failure on malformed input as DemuxError, so ffmpeg gets a go"""
+    @functools.wraps(demux)
+    def wrapper(data: bytes) -> "OpusStream":
+        try:
+            return demux(data)
+        except (IndexError, ValueError, struct.error) as e:
+            raise DemuxError(f"Malformed container: {e!r}") from e
+    return wrapper
+
+
+class OpusStream(NamedTuple):
+    channels: int
+    pre_skip: int          # samples at 48 kHz to discard from the start
+    packets: List[bytes]
+
+
+# ===== OpusHead =====
+
+def parse_opus_head(data: bytes) -> Tuple[int, int]:
+    """Return (channels, pre_skip) from an OpusHead identification header"""
+    if len(data) < 19 or data[:8] != b"OpusHead":
+        raise DemuxError("Missing OpusHead header")
+    channels = data[9]
+    pre_skip = struct.unpack_from("<H", data, 10)[0]
+    return channels, pre_skip
+
+
+# ===== Ogg =====
+
+OGG_PAGE_HEADER = struct.Struct("<4sBBqIIIB")
+
+@_malformed_as_demux_error
+def demux_ogg(data: bytes) -> OpusStream:
+    """Collect the Opus packets of the first logical stream in an Ogg file"""
+    packets: List[bytes] = []
+    serial: Optional[int] = None
+    partial = bytearray()
+    pos = 0
+
+    while pos + OGG_PAGE_HEADER.size <= len(data):
+        capture, version, _, _, page_serial, _, _, segment_count = OGG_PAGE_HEADER.unpack_from(data, pos)
+        if capture != b"OggS" or version != 0:
+            raise DemuxError(f"Bad Ogg page at offset {pos}")
+
+        table_start = pos + OGG_PAGE_HEADER.size
+        lacing = data[table_start:table_start + segment_count]
+        body = table_start + segment_count
+        if len(lacing) < segment_count or body + sum(lacing) > len(data):
+            break  # truncated final page
+
+        if serial is None:
+            serial = page_serial
+        if page_serial == serial:
+            # A lacing value below 255 ends a packet; 255 continues it
+            for size in lacing:
+                partial += data[body:body + size]
+                body += size
+                if size < 255:
+                    packets.append(bytes(partial))
+                    partial.clear()
+        pos = table_start + segment_count + sum(lacing)
+
+    if not packets:
+        raise DemuxError("No Ogg packets found")
+
+    channels, pre_skip = parse_opus_head(packets[0])
+    # packets[1] is OpusTags
+    return OpusStream(channels, pre_skip, packets[2:])
+
+
+# ===== WebM / Matroska =====
+
+EBML_HEADER = 0x1A45DFA3
+SEGMENT = 0x18538067
+TRACKS = 0x1654AE6B
+TRACK_ENTRY = 0xAE
+TRACK_NUMBER = 0xD7
+CODEC_ID = 0x86
+CODEC_PRIVATE = 0x63A2
+CLUSTER = 0x1F43B675
+SIMPLE_BLOCK = 0xA3
+BLOCK_GROUP = 0xA0
+BLOCK = 0xA1
+
+# Masters whose children are read in place rather than skipped
+EBML_MASTERS = {SEGMENT, TRACKS, TRACK_ENTRY, CLUSTER, BLOCK_GROUP}
+
+UNKNOWN_SIZE = -1
+
+def _read_vint(data: bytes, pos: int, keep_marker: bool) -> Tuple[int, int]:
+    """Read an EBML variable-length integer, returning (value, new position)"""
+    if pos >= len(data):
+        raise IndexError(pos)
+    first = data[pos]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not first & mask:
+        mask >>= 1
+        length += 1
+    if length > 8:
+        raise DemuxError(f"Invalid EBML integer at offset {pos}")
+    if pos + length > len(data):
+        raise IndexError(pos)
+
+    value = first if keep_marker else first & (mask - 1)
+    for byte in data[pos + 1:pos + length]:
+        value = (value << 8) | byte
+    if not keep_marker and value == (1 << (7 * length)) - 1:
+        value = UNKNOWN_SIZE
+    return value, pos + length
+
+
+@_malformed_as_demux_error
+def demux_webm(data: bytes) -> OpusStream:
+    """Collect the Opus packets of the audio track in a WebM file"""
+    packets: List[bytes] = []
+    opus_track: Optional[int] = None
+    track_number: Optional[int] = None
+    codec_id: Optional[bytes] = None
+    codec_private: Optional[bytes] = None
+    head: Optional[bytes] = None
+    pos = 0
+
+    if data[:4] != b"\x1a\x45\xdf\xa3":
+        raise DemuxError("Missing EBML header")
+
+    while pos < len(data):
+        try:
+            element_id, body = _read_vint(data, pos, keep_marker=True)
+            size, body = _read_vint(data, body, keep_marker=False)
+        except IndexError:
+            break  # truncated final element
+
+        if element_id in EBML_MASTERS:
+            if element_id == TRACK_ENTRY:
+                track_number = codec_id = codec_private = None
+            pos = body
+            continue
+        if size == UNKNOWN_SIZE:
+            raise DemuxError(f"Unknown-size element 0x{element_id:X}")
+
+        end = body + size
+        if end > len(data):
+            break
+        payload = data[body:end]
+
+        if element_id == TRACK_NUMBER:
+            track_number = int.from_bytes(payload, "big")
+        elif element_id == CODEC_ID:
+            codec_id = payload.rstrip(b"\x00")
+        elif element_id == CODEC_PRIVATE:
+            codec_private = payload
+        elif element_id in (SIMPLE_BLOCK, BLOCK):
+            # Track number, then a 2-byte timecode and a flags byte before the frame
+            try:
+                block_track, frame_start = _read_vint(payload, 0, keep_marker=False)
+            except IndexError:
+                raise DemuxError(f"Empty block at offset {body}")
+            if frame_start + 3 > len(payload):
+                raise DemuxError(f"Truncated block at offset {body}")
+            if block_track == opus_track:
+                flags = payload[frame_start + 2]
+                if flags & 0x06:
+                    raise DemuxError("Laced WebM blocks are not supported")
+                packets.append(payload[frame_start + 3:])
+
+        # A TrackEntry has no terminator; claim the Opus track once its fields are known
+        if opus_track is None and codec_id == b"A_OPUS" and track_number is not None and codec_private:
+            opus_track = track_number
+            head = codec_private
+
+        pos = end
+
+    if opus_track is None:
+        raise DemuxError("No Opus track found")
+    if not packets:
+        raise DemuxError("No Opus packets found")
+
+    channels, pre_skip = parse_opus_head(head)
+    return OpusStream(channels, pre_skip, packets)
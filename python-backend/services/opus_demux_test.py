@@ -0,0 +1,121 @@
+"""
+Opus demuxer checks
+Well-formed Ogg and WebM recordings yield their packets; malformed ones raise DemuxError and nothing else
+"""
+
+import struct
+
+import pytest
+
+from services.opus_demux import OGG_PAGE_HEADER, DemuxError, demux_ogg, demux_webm
+
+OPUS_HEAD = b"OpusHead" + struct.pack("<BBHIhB", 1, 1, 312, 48000, 0, 0)
+PACKETS = [b"\x01" * 10, b"\x02" * 300, b"\x03" * 20]
+
+# ===== Ogg =====
+
+def _ogg_page(packets: list, sequence: int, serial: int = 1) -> bytes:
+    lacing = bytearray()
+    for packet in packets:
+        lacing += b"\xff" * (len(packet) // 255) + bytes([len(packet) % 255])
+    header = OGG_PAGE_HEADER.pack(b"OggS", 0, 0, 0, serial, sequence, 0, len(lacing))
+    return header + bytes(lacing) + b"".join(packets)
+
+
+def _ogg() -> bytes:
+    return (
+        _ogg_page([OPUS_HEAD], 0)
+        + _ogg_page([b"OpusTags" + bytes(8)], 1)
+        + _ogg_page([b"\x09" * 4], 0, serial=2)   # another logical stream, ignored
+        + _ogg_page(PACKETS, 2)
+    )
+
+
+def test_demux_ogg():
+    stream = demux_ogg(_ogg())
+    assert (stream.channels, stream.pre_skip) == (1, 312)
+    assert stream.packets == PACKETS
+
+
+# ===== WebM =====
+
+def _size(length: int) -> bytes:
+    return bytes([0x10]) + length.to_bytes(3, "big")   # 4-byte EBML size
+
+
+def _element(element_id: bytes, payload: bytes) -> bytes:
+    return element_id + _size(len(payload)) + payload
+
+
+UNKNOWN = b"\x01\xff\xff\xff\xff\xff\xff\xff"
+
+def _block(frame: bytes, flags: int = 0x80, track: int = 1) -> bytes:
+    return _element(b"\xa3", bytes([0x80 | track]) + b"\x00\x00" + bytes([flags]) + frame)
+
+
+def _webm(blocks: bytes = None, codec_private: bytes = OPUS_HEAD) -> bytes:
+    track = _element(b"\xae", (
+        _element(b"\xd7", b"\x01")
+        + _element(b"\x86", b"A_OPUS")
+        + _element(b"\x63\xa2", codec_private)
+    ))
+    if blocks is None:
+        blocks = b"".join(_block(packet) for packet in PACKETS)
+    return (
+        _element(b"\x1a\x45\xdf\xa3", _element(b"\x42\x82", b"webm"))
+        + b"\x18\x53\x80\x67" + UNKNOWN
+        + _element(b"\x16\x54\xae\x6b", track)
+        + b"\x1f\x43\xb6\x75" + UNKNOWN
+        + _element(b"\xe7", b"\x00")   # cluster timecode, skipped
+        + blocks
+    )
+
+
+def test_demux_webm():
+    stream = demux_webm(_webm())
+    assert (stream.channels, stream.pre_skip) == (1, 312)
+    assert stream.packets == PACKETS
+
+
+def test_blocks_of_other_tracks_are_skipped():
+    stream = demux_webm(_webm(_block(b"video", track=2) + _block(PACKETS[0])))
+    assert stream.packets == [PACKETS[0]]
+
+
+# ===== Malformed input =====
+
+@pytest.mark.parametrize("data, error", [
+    (b"", "No Ogg packets"),
+    (b"OggX" + bytes(40), "Bad Ogg page"),
+    (_ogg_page([b"OpusHea"], 0) + _ogg_page([b"tags"], 1), "OpusHead"),
+], ids=["empty", "bad-capture", "short-head"])
+def test_malformed_ogg(data, error):
+    with pytest.raises(DemuxError, match=error):
+        demux_ogg(data)
+
+
+@pytest.mark.parametrize("data, error", [
+    (b"", "EBML header"),
+    (b"RIFF" + bytes(40), "EBML header"),
+    (_webm(_element(b"\xa3", b"")), "Empty block"),
+    (_webm(_element(b"\xa3", b"\x81\x00")), "Truncated block"),
+    (_webm(_block(b"x", flags=0x82)), "Laced"),
+    (_webm(b""), "No Opus packets"),
+    (_webm(codec_private=b"OpusHead"), "OpusHead"),
+    (_webm(b"\x00" + bytes(16)), "Invalid EBML integer"),
+], ids=["empty", "not-ebml", "empty-block", "truncated-block", "laced", "no-packets", "short-head", "bad-vint"])
+def test_malformed_webm(data, error):
+    with pytest.raises(DemuxError, match=error):
+        demux_webm(data)
+
+
+@pytest.mark.parametrize("demux, data", [(demux_ogg, _ogg()), (demux_webm, _webm())], ids=["ogg", "webm"])
+def test_truncated_or_corrupted_input_only_raises_demux_error(demux, data):
+    # Every cut and every single-byte corruption either still demuxes or is a DemuxError
+    variants = [data[:end] for end in range(len(data))]
+    variants += [data[:i] + bytes([data[i] ^ 0xff]) + data[i + 1:] for i in range(len(data))]
+    for variant in variants:
+        try:
+            demux(variant)
+        except DemuxError:
+            pass
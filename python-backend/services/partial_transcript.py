@@ -0,0 +1,127 @@
+"""
+Partial Transcripts
+Tracks one in-progress utterance on a streaming STT backend: feeds it audio from
+the session ring as it arrives, finds the prefix that has stopped changing, and
+holds the speculative AI reply started on that prefix
+"""
+
+import asyncio
+import re
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from .audio_buffer import AudioRingBuffer
+
+# Punctuation and case don't count as a different transcript
+NORMALIZE_PATTERN = re.compile(r'[^\w\s]+')
+
+def normalize_transcript(text: str) -> str:
+    return " ".join(NORMALIZE_PATTERN.sub(" ", text.lower()).split())
+
+
+def _common_prefix(word_lists: List[List[str]]) -> List[str]:
+    prefix = []
+    for words in zip(*word_lists):
+        if any(word != words[0] for word in words):
+            break
+        prefix.append(words[0])
+    return prefix
+
+
+class PartialTranscript:
+    def __init__(self, ring: AudioRingBuffer, start_offset: int, stable_updates: int):
+        """Partial recognition of the utterance starting at absolute ring offset start_offset
+
+        A word counts as stable once it has come back unchanged in the last
+        stable_updates partial results.
+        """
+        self.ring = ring
+        self.offset = start_offset
+        # Set when the endpointer closes the utterance; audio after it belongs to the next one
+        self.end_offset: Optional[int] = None
+
+        self.stream: Optional[Any] = None
+        self.feeder: Optional[asyncio.Task] = None
+        self.text = ""
+        self.stable_text = ""
+        self._recent: Deque[List[str]] = deque(maxlen=max(1, stable_updates))
+
+        # Speculative reply: {'text': stable prefix it answers, 'task': asyncio.Task}
+        self.speculation: Optional[Dict[str, Any]] = None
+
+    @property
+    def limit(self) -> int:
+        return self.end_offset if self.end_offset is not None else self.ring.total_written
+
+    def has_pending(self) -> bool:
+        """Whether buffered audio hasn't been fed to the stream yet"""
+        return self.offset < self.limit
+
+    def take_pending(self) -> bytes:
+        """Copy the audio not yet fed out of the ring (whatever the ring still holds)"""
+        limit = self.limit
+        audio = self.ring.read(max(self.offset, self.ring.start_offset), limit)
+        self.offset = limit
+        return audio
+
+    def update(self, text: str) -> bool:
+        """Record a partial result; True if the text or its stable prefix changed"""
+        words = (text or "").split()
+        self._recent.append(words)
+        stable = _common_prefix(list(self._recent)) if len(self._recent) == self._recent.maxlen else []
+
+        text = " ".join(words)
+        stable_text = " ".join(stable)
+        changed = text != self.text or stable_text != self.stable_text
+        self.text, self.stable_text = text, stable_text
+        return changed
+
+    def wants_speculation(self, min_words: int) -> bool:
+        """Whether to start a reply on the stable prefix
+
+        Only once every word is stable (the speaker has most likely paused) and
+        not twice for the same text.
+        """
+        if not self.stable_text or self.stable_text != self.text:
+            return False
+        if len(self.stable_text.split()) < min_words:
+            return False
+        return self.speculation is None or self.speculation['text'] != self.stable_text
+
+    def speculate(self, task: asyncio.Task):
+        """Hold a new speculative reply on the stable prefix, replacing any older one"""
+        self._cancel_speculation()
+        # Retrieve the outcome so an unused, failed draft isn't reported as unhandled
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self.speculation = {'text': self.stable_text, 'task': task}
+
+    def take_speculation(self, transcription: str) -> Optional[asyncio.Task]:
+        """The speculative reply if it answered exactly the final transcription, else None"""
+        speculation, self.speculation = self.speculation, None
+        if speculation is None:
+            return None
+        if normalize_transcript(speculation['text']) == normalize_transcript(transcription):
+            return speculation['task']
+        speculation['task'].cancel()
+        return None
+
+    async def finish(self) -> str:
+        """Feed the rest of the utterance and return the stream's final transcript ("" if none)"""
+        if self.feeder:
+            await asyncio.gather(self.feeder, return_exceptions=True)
+        if self.stream is None:
+            return ""
+        if self.has_pending():
+            await self.stream.accept(self.take_pending())
+        return await self.stream.finish()
+
+    def discard(self):
+        """Abandon the utterance: stop feeding and drop any speculative reply"""
+        if self.feeder:
+            self.feeder.cancel()
+        self._cancel_speculation()
+
+    def _cancel_speculation(self):
+        if self.speculation:
+            self.speculation['task'].cancel()
+            self.speculation = None
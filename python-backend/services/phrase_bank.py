@@ -0,0 +1,105 @@
+"""
+Canned Phrase Audio Bank
+Pre-renders greetings and fixed fallback messages for every supported language at
+startup and serves them as ready-to-send payloads (raw MP3 and base64)
+"""
+
+import asyncio
+import base64
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+class CannedPhraseBank:
+    def __init__(self, voice_service, phrases: Dict[str, Dict[str, str]], retry_interval: Optional[float] = None):
+        """Initialize the bank
+
+        phrases maps a phrase key to its text per language code; languages without
+        a translation fall back to the English text.
+        """
+        self.voice_service = voice_service
+        self.phrases = phrases
+        self.retry_interval = retry_interval or settings.PHRASE_BANK_RETRY_SECONDS
+
+        self._payloads: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._render_semaphore = asyncio.Semaphore(settings.PHRASE_BANK_RENDER_PARALLELISM)
+
+    def get_text(self, key: str, language: str) -> str:
+        """Get the phrase text for a language"""
+        texts = self.phrases[key]
+        return texts.get(language, texts['en'])
+
+    def get_payload(self, key: str, language: str) -> Optional[Dict[str, Any]]:
+        """Get a pre-rendered payload without waiting; None if it isn't rendered yet"""
+        return self._payloads.get((key, language))
+
+    async def get_or_render(self, key: str, language: str) -> Dict[str, Any]:
+        """Get a pre-rendered payload, rendering it now if warmup hasn't reached it"""
+        payload = self.get_payload(key, language)
+        if payload:
+            return payload
+        return await self._render(key, language)
+
+    async def warmup(self, force: bool = False) -> int:
+        """Render every phrase for every supported language; returns how many were rendered"""
+        targets = [
+            (key, language)
+            for key in self.phrases
+            for language in self.voice_service.language_configs
+            if force or (key, language) not in self._payloads
+        ]
+        if not targets:
+            return 0
+
+        start = time.time()
+        results = await asyncio.gather(
+            *(self._render(key, language) for key, language in targets),
+            return_exceptions=True
+        )
+        rendered = sum(1 for result in results if isinstance(result, dict) and result['audio'])
+        logger.info(f"🎵 Phrase bank rendered {rendered}/{len(targets)} phrases in {time.time() - start:.1f}s")
+        return rendered
+
+    async def retry_failed_renders(self):
+        """Warm up once, then periodically retry the phrases that failed to render
+
+        Rendered phrases are kept as they are: the phrase texts and the language
+        voices are fixed for the life of the process.
+        """
+        while True:
+            try:
+                await self.warmup()
+            except Exception as e:
+                logger.error(f"🎵 Phrase bank warmup error: {e}")
+            await asyncio.sleep(self.retry_interval)
+
+    async def _render(self, key: str, language: str) -> Dict[str, Any]:
+        text = self.get_text(key, language)
+
+        async with self._render_semaphore:
+            audio_bytes = await self.voice_service.text_to_speech_bytes(text, language)
+
+        audio_b64 = base64.b64encode(audio_bytes).decode('utf-8') if audio_bytes else ""
+
+        payload = {
+            'text': text,
+            'audio': audio_b64,
+            'audio_bytes': audio_bytes or b"",
+            'language': language,
+            'rendered_at': time.time()
+        }
+        # Only keep successful renders so the refresh loop retries failures
+        if audio_b64:
+            self._payloads[(key, language)] = payload
+        return payload
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get how much of the bank has been rendered"""
+        return {
+            'rendered': len(self._payloads),
+            'total': len(self.phrases) * len(self.voice_service.language_configs)
+        }
@@ -9,18 +9,12 @@ import logging
 import time
 import wave
 import io
-import base64
-from typing import Optional, Dict, Any, AsyncGenerator
+from collections import deque
+from typing import Optional, Dict, Any, AsyncGenerator, Callable, Awaitable
 import speech_recognition as sr
 from gtts import gTTS
 import google.generativeai as genai
 import numpy as np
-try:
-    import webrtcvad
-    WEBRTC_AVAILABLE = True
-except ImportError:
-    WEBRTC_AVAILABLE = False
-    print("Warning: webrtcvad not available. Using simple energy-based VAD.")
 
 try:
     import pyaudio
@@ -30,25 +24,64 @@ except ImportError:
     print("Warning: pyaudio not available. Voice recording features limited.")
 
 from .voice_assistant import VoiceAssistantService
+from .tts_pipeline import SentenceTTSPipeline
+from .phrase_bank import CannedPhraseBank
+from .vad import FrameVAD, frame_energies
+from .endpointing import UtteranceEndpointer
+from .audio_buffer import AudioRingBuffer
+from .partial_transcript import PartialTranscript
+from .cancellation import CancellationToken, OperationCancelled, guarded
+from .audio_decoder import audio_decoder, decoder_pool, resolve_format, DecoderError
 from .hospital_data import EMERGENCY_CONDITIONS
+from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Fixed replies used when the pipeline cannot produce an AI answer
+FALLBACK_MESSAGES = {
+    'no_transcription': {
+        'en': "I couldn't hear you clearly. Could you please speak a bit louder or closer to the microphone?",
+        'hi': "मैं आपको स्पष्ट रूप से सुन नहीं पाया। क्या आप थोड़ा ज़ोर से या माइक्रोफ़ोन के पास बोल सकते हैं?",
+        'gu': "હું તમને સ્પષ્ટ રીતે સાંભળી શક્યો નહીં. કૃપા કરીને થોડું મોટેથી અથવા માઇક્રોફોનની નજીક બોલશો?",
+        'mr': "मला तुमचे बोलणे स्पष्टपणे ऐकू आले नाही. कृपया थोडे मोठ्याने किंवा मायक्रोफोनजवळ बोलाल का?",
+        'bn': "আমি আপনার কথা স্পষ্টভাবে শুনতে পাইনি। দয়া করে একটু জোরে বা মাইক্রোফোনের কাছে এসে বলবেন?",
+        'ml': "എനിക്ക് നിങ്ങളെ വ്യക്തമായി കേൾക്കാൻ കഴിഞ്ഞില്ല. ദയവായി അൽപ്പം ഉച്ചത്തിലോ മൈക്രോഫോണിന് അടുത്തോ സംസാരിക്കാമോ?",
+        'ur': "میں آپ کو صاف طور پر سن نہیں سکا۔ براہ کرم تھوڑا اونچا یا مائیکروفون کے قریب بولیں؟"
+    },
+    'ai_timeout': {
+        'en': "I'm sorry, I'm having trouble processing your request right now. Please try again.",
+        'hi': "क्षमा करें, मुझे अभी आपके अनुरोध को संसाधित करने में परेशानी हो रही है। कृपया फिर से प्रयास करें।",
+        'gu': "માફ કરશો, મને અત્યારે તમારી વિનંતી પર પ્રક્રિયા કરવામાં મુશ્કેલી આવી રહી છે. કૃપા કરીને ફરી પ્રયાસ કરો.",
+        'mr': "माफ करा, मला सध्या तुमच्या विनंतीवर प्रक्रिया करण्यात अडचण येत आहे. कृपया पुन्हा प्रयत्न करा.",
+        'bn': "দুঃখিত, এই মুহূর্তে আপনার অনুরোধ প্রক্রিয়া করতে আমার সমস্যা হচ্ছে। অনুগ্রহ করে আবার চেষ্টা করুন।",
+        'ml': "ക്ഷമിക്കണം, ഇപ്പോൾ നിങ്ങളുടെ അഭ്യർത്ഥന പ്രോസസ്സ് ചെയ്യുന്നതിൽ എനിക്ക് ബുദ്ധിമുട്ടുണ്ട്. ദയവായി വീണ്ടും ശ്രമിക്കുക.",
+        'ur': "معذرت، مجھے اس وقت آپ کی درخواست پر کارروائی کرنے میں دشواری ہو رہی ہے۔ براہ کرم دوبارہ کوشش کریں۔"
+    },
+    'ai_error': {
+        'en': "I'm sorry, I encountered an error processing your request.",
+        'hi': "क्षमा करें, आपके अनुरोध को संसाधित करते समय एक त्रुटि हुई।",
+        'gu': "માફ કરશો, તમારી વિનંતી પર પ્રક્રિયા કરતી વખતે ભૂલ આવી.",
+        'mr': "माफ करा, तुमच्या विनंतीवर प्रक्रिया करताना त्रुटी आली.",
+        'bn': "দুঃখিত, আপনার অনুরোধ প্রক্রিয়া করার সময় একটি ত্রুটি ঘটেছে।",
+        'ml': "ക്ഷമിക്കണം, നിങ്ങളുടെ അഭ്യർത്ഥന പ്രോസസ്സ് ചെയ്യുന്നതിൽ ഒരു പിശക് സംഭവിച്ചു.",
+        'ur': "معذرت، آپ کی درخواست پر کارروائی کے دوران ایک خرابی پیش آئی۔"
+    }
+}
+
 class RealTimeVoiceAgent:
     def __init__(self):
         """Initialize the real-time voice agent"""
         self.voice_service = VoiceAssistantService()
+        self.tts_pipeline = SentenceTTSPipeline(self.voice_service)
+        
+        # Greetings and fallback replies are rendered once at startup and reused
+        self.phrase_bank = CannedPhraseBank(
+            self.voice_service,
+            {'greeting': self.voice_service.greetings, **FALLBACK_MESSAGES}
+        )
         
         # Audio configuration
         self.sample_rate = 16000  # 16kHz for speech recognition
-        self.frame_duration = 30  # 30ms frames for VAD
-        self.frame_size = int(self.sample_rate * self.frame_duration / 1000)
-        
-        # Voice Activity Detection
-        if WEBRTC_AVAILABLE:
-            self.vad = webrtcvad.Vad(2)  # Aggressiveness level 0-3
-        else:
-            self.vad = None
         
         # Speech recognition setup
         self.recognizer = sr.Recognizer()
@@ -60,31 +93,81 @@ class RealTimeVoiceAgent:
         # Real-time processing state
         self.active_sessions: Dict[str, Dict] = {}
         
-    async def start_voice_session(self, session_id: str, language: str = "en") -> Dict:
-        """Start a new real-time voice session"""
+    async def start_voice_session(
+        self, 
+        session_id: str, 
+        language: str = "en",
+        stream: bool = False,
+        emit: Optional[Callable[[str, Dict], Awaitable[None]]] = None,
+        vad_aggressiveness: Optional[int] = None,
+        input_format: Optional[str] = None
+    ) -> Dict:
+        """Start a new real-time voice session
+        
+        With emit(event_type, data), spoken replies are generated in the background
+        and delivered as conversation_response events, and a reply still in flight
+        is interrupted when the caller starts speaking again (barge-in). When
+        stream is set, partial AI replies are also pushed as they arrive.
+        vad_aggressiveness (0-3) tunes WebRTC VAD for this session only.
+        input_format ("webm", "ogg") declares that the client streams one continuous
+        container in chunks; they are decoded to PCM as they arrive and endpointed
+        like raw PCM.
+        With emit and a streaming STT backend, streamed speech is also transcribed
+        while it is spoken: partial_transcript events go out as the text changes, and
+        the AI reply is drafted once the partial stops changing.
+        """
+        
+        vad = FrameVAD(self.sample_rate, aggressiveness=vad_aggressiveness)
+        audio_buffer = AudioRingBuffer.for_duration(settings.AUDIO_BUFFER_SECONDS, self.sample_rate)
         
         # Initialize session with voice assistant
-        await self.voice_service.start_session(language)
+        await self.voice_service.start_session(language, session_id=session_id)
         
         self.active_sessions[session_id] = {
             'language': language,
-            'audio_buffer': bytearray(),
+            'audio_buffer': audio_buffer,
             'is_speaking': False,
             'last_activity': time.time(),
             'conversation_active': True,
-            'silence_start': None,
-            'speech_frames': [],
-            'processing_audio': False
+            'processing_audio': False,
+            'response_task': None,
+            'response_token': None,
+            'response_stage': None,
+            'vad': vad,
+            'endpointer': UtteranceEndpointer(audio_buffer, vad.frame_ms, vad.frame_bytes),
+            'vad_flags': np.zeros(0, dtype=bool),
+            'stream': stream,
+            'emit': emit,
+            'input_format': input_format if input_format != 'pcm' else None,
+            'decoder': None,
+            # Partial transcript of the utterance in progress, and of closed utterances
+            # in the same order as the endpointer's queue (None where there was none)
+            'partial': None,
+            'closed_partials': deque(),
+            'partial_stats': {
+                'utterances': 0,
+                'updates': 0,
+                'speculations': 0,
+                'speculation_hits': 0,
+                'speculation_misses': 0
+            }
         }
         
         return {
             'session_id': session_id,
             'status': 'active',
             'language': language,
+            'stream': stream,
             'greeting': await self.voice_service.get_greeting(language)
         }
     
-    async def process_text_input(self, session_id: str, text: str, language: str = "en") -> Dict[str, Any]:
+    async def process_text_input(
+        self, 
+        session_id: str, 
+        text: str, 
+        language: str = "en",
+        stream: Optional[bool] = None
+    ) -> Dict[str, Any]:
         """Process text input directly (fallback when voice isn't working)"""
         
         if session_id not in self.active_sessions:
@@ -98,7 +181,7 @@ class RealTimeVoiceAgent:
         
         try:
             # Use voice assistant to process the text directly
-            chat_response = await self.voice_service.process_text_message(text, language)
+            chat_response = await self._generate_ai_response(session_id, text, language, stream)
             
             # Convert ChatResponse to dictionary
             result = {
@@ -120,8 +203,18 @@ class RealTimeVoiceAgent:
                 "session_id": session_id
             }
     
-    async def process_audio_chunk(self, session_id: str, audio_data: bytes) -> Dict[str, Any]:
-        """Process incoming audio chunk in real-time"""
+    async def process_audio_chunk(
+        self, 
+        session_id: str, 
+        audio_data: bytes, 
+        audio_format: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Process incoming audio chunk in real-time
+        
+        audio_format ("pcm", "webm", "ogg", "wav", "mp3") is the client's declared
+        format; a container header sniffed from the chunk takes precedence. Spoken
+        replies come back as raw MP3 in 'audio_bytes'.
+        """
         
         if session_id not in self.active_sessions:
             return {'error': 'Session not found'}
@@ -129,34 +222,46 @@ class RealTimeVoiceAgent:
         session = self.active_sessions[session_id]
         session['last_activity'] = time.time()
         
-        # Add audio to buffer
-        session['audio_buffer'].extend(audio_data)
-        
-        # Convert to numpy array for processing
         try:
-            audio_np = np.frombuffer(audio_data, dtype=np.int16)
-            
-            # Voice Activity Detection
-            voice_detected = self._detect_voice_activity(audio_np, session)
+            if session['input_format']:
+                # Continuous container stream: decode what has arrived so far to PCM
+                audio_data = await self._decode_stream_chunk(session, audio_data)
+                is_recording = False
+            else:
+                audio_format = resolve_format(audio_data, audio_format)
+                is_recording = audio_format != 'pcm'
+            
+            reply = None
+            if is_recording:
+                # Client-side recordings (e.g. a MediaRecorder WebM blob) are already one
+                # complete utterance, so they skip frame-level endpointing; a new
+                # recording supersedes any reply still in flight
+                voice_detected = True
+                self._interrupt_response(session, 'new_input')
+                reply = self._start_response(session_id, audio_data, audio_format)
+            else:
+                # Keep bounded PCM history for the endpointer, then run Voice Activity
+                # Detection over every frame of the chunk; the endpointer closes an
+                # utterance once trailing silence or the length cap is reached
+                session['audio_buffer'].write(audio_data)
+                voice_detected = self._detect_voice_activity(audio_data, session)
+                self._track_partial(session_id)
+                if self._should_process_speech(session) and not session['processing_audio']:
+                    reply = self._process_accumulated_speech(session_id)
+            
+            # Without an emit callback the reply is returned with this chunk
+            speech_result = await reply if reply and not session['emit'] else None
             
             response = {
                 'voice_detected': bool(voice_detected),  # Ensure JSON serializable
+                'is_speaking': bool(session['is_speaking']),
                 'is_processing': bool(session['processing_audio']),  # Ensure JSON serializable
                 'timestamp': float(time.time())  # Ensure JSON serializable
             }
             
-            # If voice activity detected, process the audio chunk directly
-            if voice_detected and not session['processing_audio']:
-                logger.info(f"🎤 Voice detected, processing audio chunk directly...")
-                session['processing_audio'] = True
-                
-                # Process this audio chunk immediately
-                speech_result = await self._process_audio_chunk_directly(session_id, audio_data)
-                if speech_result:
-                    logger.info(f"🎤 Speech processing completed: {list(speech_result.keys())}")
-                    response.update(speech_result)
-                
-                session['processing_audio'] = False
+            if speech_result:
+                logger.info(f"🎤 Speech processing completed: {list(speech_result.keys())}")
+                response.update(speech_result)
             
             return response
             
@@ -164,386 +269,567 @@ class RealTimeVoiceAgent:
             logger.error(f"Error processing audio chunk: {e}")
             return {'error': str(e)}
     
-    def _detect_voice_activity(self, audio_data: np.ndarray, session: Dict) -> bool:
-        """Detect voice activity in audio chunk"""
+    async def _decode_stream_chunk(self, session: Dict, chunk: bytes) -> bytes:
+        """Feed a chunk of the session's container stream to its decoder and return new PCM"""
+        
+        if session['decoder'] is None:
+            session['decoder'] = await decoder_pool.open_stream(session['input_format'])
         
-        # Simple energy-based VAD (fallback method)
         try:
-            # Convert to float32 for processing
-            if audio_data.dtype != np.float32:
-                audio_data = audio_data.astype(np.float32)
-            
-            # Calculate RMS energy
-            energy = np.sqrt(np.mean(audio_data ** 2))
-            
-            # Dynamic threshold adjustment
-            if not hasattr(self, '_energy_history'):
-                self._energy_history = []
-            
-            self._energy_history.append(energy)
-            if len(self._energy_history) > 50:  # Keep last 50 frames
-                self._energy_history.pop(0)
-            
-            # Calculate adaptive threshold
-            if len(self._energy_history) > 10:
-                avg_energy = np.mean(self._energy_history)
-                threshold = avg_energy * 2.5  # 2.5x average as threshold
-            else:
-                threshold = 0.01  # Default threshold
-            
-            is_speech = energy > threshold
-            
-            # Apply smoothing to reduce false positives
-            if not hasattr(self, '_speech_history'):
-                self._speech_history = []
-            
-            self._speech_history.append(is_speech)
-            if len(self._speech_history) > 5:
-                self._speech_history.pop(0)
-            
-            # Speech detected if majority of recent frames are speech
-            speech_confidence = sum(self._speech_history) / len(self._speech_history)
-            final_is_speech = speech_confidence > 0.6
-            
+            return await session['decoder'].feed(chunk)
+        except DecoderError as e:
+            # A new stream (starting with its container header) gets a fresh decoder
+            logger.warning(f"⚠️ Streaming decode failed, restarting decoder: {e}")
+            await session['decoder'].close()
+            session['decoder'] = None
+            return b""
+    
+    def _detect_voice_activity(self, audio_data: bytes, session: Dict) -> bool:
+        """Detect voice activity in audio chunk
+        
+        Every complete frame is classified and fed to the session's endpointer; the
+        per-frame flags are kept in session['vad_flags'] and the chunk counts as
+        speech if any frame is voiced.
+        """
+        
+        try:
+            flags = session['vad'].process(audio_data)
         except Exception as e:
-            logger.warning(f"Energy-based VAD error: {e}")
-            final_is_speech = False
+            logger.warning(f"VAD error: {e}")
+            flags = np.zeros(0, dtype=bool)
+        
+        session['vad_flags'] = flags
+        
+        endpointer = session['endpointer']
+        for event in endpointer.feed(flags):
+            if event['type'] == 'speech_start':
+                logger.info(f"🎤 Speech started")
+                if settings.BARGE_IN_ENABLED:
+                    self._interrupt_response(session, 'barge_in')
+            elif event['type'] == 'speech_end':
+                logger.info(f"🎤 Utterance closed: {event['duration_ms']}ms{' (max length)' if event['forced'] else ''}")
+                partial = session['partial']
+                if partial:
+                    partial.end_offset = event['end_offset']
+                session['closed_partials'].append(partial)
+                session['partial'] = None
+            else:
+                logger.info(f"🎤 Discarded {event['duration_ms']}ms blip with too little speech")
+                if session['partial']:
+                    session['partial'].discard()
+                    session['partial'] = None
         
-        # If WebRTC VAD is available, use it as primary method
-        if WEBRTC_AVAILABLE and self.vad:
-            try:
-                # Convert to int16 for WebRTC VAD
-                if audio_data.dtype != np.int16:
-                    # Normalize and convert to int16
-                    normalized = np.clip(audio_data * 32767, -32768, 32767)
-                    audio_int16 = normalized.astype(np.int16)
-                else:
-                    audio_int16 = audio_data
-                
-                audio_bytes = audio_int16.tobytes()
-                
-                # WebRTC VAD requires specific frame sizes (10ms, 20ms, or 30ms)
-                frame_size_bytes = self.frame_size * 2  # 2 bytes per sample for int16
-                
-                if len(audio_bytes) >= frame_size_bytes:
-                    frame = audio_bytes[:frame_size_bytes]
-                    webrtc_result = self.vad.is_speech(frame, self.sample_rate)
-                    
-                    # Combine WebRTC result with energy-based result
-                    final_is_speech = webrtc_result or final_is_speech
-                    
-            except Exception as e:
-                logger.warning(f"WebRTC VAD error, falling back to energy-based: {e}")
-        
-        # Update session state
-        current_time = time.time()
-        if final_is_speech:
-            session['is_speaking'] = True
-            session['silence_start'] = None
-        else:
-            if session['is_speaking'] and session['silence_start'] is None:
-                session['silence_start'] = current_time
-            elif session['silence_start'] and current_time - session['silence_start'] > 1.5:
-                session['is_speaking'] = False
-        
-        return final_is_speech
+        session['is_speaking'] = endpointer.in_utterance
+        return bool(flags.any())
     
     def _should_process_speech(self, session: Dict) -> bool:
         """Determine if accumulated speech should be processed"""
         
-        # Process if we have enough frames and detect end of speech
-        if len(session['speech_frames']) < 10:  # Minimum frames
-            return False
+        # The endpointer only releases an utterance after trailing silence (plus
+        # hangover) or when it hits the maximum utterance length
+        return session['endpointer'].has_utterance()
+    
+    def _process_accumulated_speech(self, session_id: str) -> asyncio.Task:
+        """Start the reply to the oldest utterance closed by the endpointer"""
+        
+        session = self.active_sessions[session_id]
+        utterance = session['endpointer'].pop_utterance()
+        partial = session['closed_partials'].popleft() if session['closed_partials'] else None
+        logger.info(f"🎤 Processing utterance: {utterance['duration_ms']}ms")
+        return self._start_response(session_id, utterance['audio'], 'pcm', partial)
+    
+    def _start_response(
+        self, 
+        session_id: str, 
+        audio_data: bytes, 
+        audio_format: str,
+        partial: Optional[PartialTranscript] = None
+    ) -> asyncio.Task:
+        """Run the STT + AI + TTS reply for an utterance as a cancellable background task"""
         
-        # Process if silence detected after speech
-        if session['silence_start'] and time.time() - session['silence_start'] > 0.8:
-            return True
+        session = self.active_sessions[session_id]
+        token = CancellationToken()
+        session['response_token'] = token
+        session['response_stage'] = None
+        session['processing_audio'] = True
+        task = asyncio.create_task(self._respond(session_id, audio_data, audio_format, token, partial))
+        session['response_task'] = task
+        return task
+    
+    def _interrupt_response(self, session: Dict, reason: str):
+        """Cancel the reply in flight, if any"""
+        
+        token = session.get('response_token')
+        if token and not token.cancelled:
+            logger.info(f"🛑 Interrupting reply during {session['response_stage']} ({reason})")
+            token.cancel(reason)
+    
+    async def _respond(
+        self, 
+        session_id: str, 
+        audio_data: bytes, 
+        audio_format: str, 
+        token: CancellationToken,
+        partial: Optional[PartialTranscript] = None
+    ) -> Optional[Dict]:
+        """Produce one reply and deliver it, or report that it was interrupted"""
+        
+        session = self.active_sessions[session_id]
+        emit = session.get('emit')
+        try:
+            result = await self._process_utterance(session_id, audio_data, audio_format, token, partial)
+            # Last checkpoint before the reply audio is encoded and sent
+            token.raise_if_cancelled()
+            if result and emit:
+                await emit('conversation_response', result)
+            return result
+        except OperationCancelled as e:
+            if emit:
+                await emit('interrupted', {
+                    'reason': e.reason,
+                    'stage': session['response_stage'],
+                    'session_id': session_id
+                })
+            return None
+        finally:
+            # Nothing of the partial transcript is needed once the reply is settled
+            if partial:
+                partial.discard()
+            if session.get('response_token') is token:
+                session['response_token'] = None
+                session['response_task'] = None
+                session['response_stage'] = None
+                session['processing_audio'] = False
+                # Utterances that closed while this reply was running are answered next
+                if emit and session_id in self.active_sessions and self._should_process_speech(session):
+                    self._process_accumulated_speech(session_id)
+    
+    def _track_partial(self, session_id: str):
+        """Open a partial transcript for a new utterance and keep every one fed with new audio"""
+        
+        session = self.active_sessions[session_id]
+        if not (settings.STT_PARTIALS_ENABLED and session['emit']):
+            return
+        
+        endpointer = session['endpointer']
+        if endpointer.in_utterance and session['partial'] is None:
+            session['partial'] = PartialTranscript(
+                session['audio_buffer'],
+                endpointer.utterance_start_offset,
+                settings.STT_PARTIAL_STABLE_UPDATES
+            )
+            session['partial_stats']['utterances'] += 1
+        
+        # Closed utterances may still have audio to feed up to their end
+        for partial in [*session['closed_partials'], session['partial']]:
+            if partial and (partial.feeder is None or partial.feeder.done()) and partial.has_pending():
+                partial.feeder = asyncio.create_task(self._feed_partial(session_id, partial))
+    
+    async def _feed_partial(self, session_id: str, partial: PartialTranscript):
+        """Feed buffered audio to the utterance's streaming recognizer and report partial text"""
+        
+        session = self.active_sessions[session_id]
+        try:
+            if partial.stream is None:
+                partial.stream = await self.voice_service.open_transcript_stream(session['language'])
+                if partial.stream is None:
+                    # No streaming backend right now; the closed utterance is transcribed as usual
+                    partial.offset = partial.limit
+                    return
+            
+            while partial.has_pending():
+                if not partial.update(await partial.stream.accept(partial.take_pending())):
+                    continue
+                
+                session['partial_stats']['updates'] += 1
+                await session['emit']('partial_transcript', {
+                    'text': partial.text,
+                    'stable_text': partial.stable_text,
+                    'session_id': session_id
+                })
+                
+                if settings.SPECULATIVE_LLM_ENABLED and partial.wants_speculation(settings.SPECULATIVE_MIN_WORDS):
+                    logger.info(f"🤖 Drafting reply to stable partial: {partial.stable_text}")
+                    session['partial_stats']['speculations'] += 1
+                    partial.speculate(asyncio.create_task(self.voice_service.draft_text_message(
+                        partial.stable_text,
+                        session['language'],
+                        session_id
+                    )))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ Partial transcription failed: {e}")
+            partial.stream = None
+    
+    async def _adopt_speculation(self, session_id: str, speculation: asyncio.Task, token: Optional[CancellationToken]):
+        """The drafted reply, if it succeeded and still fits the conversation; else None"""
         
-        # Process if we have too many frames (prevent buffer overflow)
-        if len(session['speech_frames']) > 100:
+        try:
+            draft = await guarded(speculation, token)
+        except OperationCancelled:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ Drafted reply failed, generating it again: {e}")
+            return None
+        
+        if not await self.voice_service.adopt_draft(session_id, draft):
+            logger.info(f"🤖 Conversation moved on since the reply was drafted, generating it again")
+            return None
+        return draft['response']
+    
+    def _above_noise_floor(self, session: Dict, pcm: bytes, recording: bool) -> bool:
+        """Whether an utterance rises far enough above the session's noise floor to transcribe
+        
+        Recordings never went through VAD, so they also feed the noise floor (the first
+        one calibrates it from its leading silence).
+        """
+        
+        vad = session['vad']
+        energies = frame_energies(np.frombuffer(pcm, dtype=np.int16), vad.frame_samples)
+        if recording:
+            calibrated = vad.noise_floor.calibrated
+            vad.noise_floor.observe(energies)
+            if not calibrated:
+                # Not judged against a floor measured from itself
+                return True
+        
+        snr_db = vad.noise_floor.snr_db(energies)
+        if snr_db is None or snr_db >= settings.STT_MIN_SNR_DB:
             return True
         
+        logger.info(f"🔇 Skipping STT: utterance only {snr_db:.1f} dB above the noise floor")
         return False
     
-    async def _process_audio_chunk_directly(self, session_id: str, audio_data: bytes) -> Optional[Dict]:
-        """Process a single audio chunk directly for speech recognition"""
+    async def _process_utterance(
+        self, 
+        session_id: str, 
+        audio_data: bytes, 
+        audio_format: str,
+        token: Optional[CancellationToken] = None,
+        partial: Optional[PartialTranscript] = None
+    ) -> Optional[Dict]:
+        """Run one STT + AI + TTS cycle for a complete utterance
+        
+        With a partial transcript, the streaming recognizer's final text is used when
+        it comes from the preferred backend, and a reply drafted on exactly that text
+        is used instead of a new AI call.
+        """
         
         session = self.active_sessions[session_id]
         
         try:
-            logger.info(f"🎤 Processing single audio chunk: {len(audio_data)} bytes")
+            logger.info(f"🎤 Processing utterance audio: {len(audio_data)} bytes")
+            session['response_stage'] = 'stt'
             
-            # Convert to audio file for speech recognition
-            audio_file_path = await self._save_audio_to_temp_file(bytearray(audio_data))
-            
-            # Transcribe speech
-            transcription = await self.voice_service.speech_to_text(
-                audio_file_path, 
-                session['language']
-            )
+            # Decode recordings to PCM without blocking the event loop
+            if audio_format != 'pcm':
+                try:
+                    audio_data = await guarded(audio_decoder.decode(audio_data, audio_format), token)
+                except DecoderError as e:
+                    logger.warning(f"⚠️ Could not decode recording: {e}")
+                    audio_data = b""
+            
+            # Don't spend a recognition call on audio that is just background noise
+            if not self._above_noise_floor(session, audio_data, recording=audio_format != 'pcm'):
+                if partial:
+                    partial.discard()
+                if audio_format == 'pcm':
+                    return None
+                response = self._fallback_response('no_transcription', "", session['language'])
+                response['status'] = 'below_noise_floor'
+                return response
+            
+            # The streaming recognizer has already heard the utterance; otherwise
+            # transcribe speech straight from the PCM buffer
+            transcription = None
+            if partial:
+                streamed = await guarded(partial.finish(), token)
+                if partial.stream and partial.stream.preferred:
+                    transcription = streamed
+            if not transcription:
+                transcription = await guarded(
+                    self.voice_service.transcribe_pcm(audio_data, session['language']),
+                    token
+                )
             
             if not transcription or not transcription.strip():
-                logger.info(f"🎤 No transcription from audio chunk")
+                logger.info(f"🎤 No transcription from utterance")
                 # Return a helpful response indicating we couldn't understand the audio
-                return {
-                    'transcription': "",
-                    'ai_response': "I couldn't hear you clearly. Could you please speak a bit louder or closer to the microphone?",
-                    'audio_response': "",
-                    'emergency_level': "none",
-                    'requires_hospital': False,
-                    'language': session['language'],
-                    'status': 'no_transcription'
-                }
+                response = self._fallback_response('no_transcription', "", session['language'])
+                response['status'] = 'no_transcription'
+                return response
             
             logger.info(f"🎤 Transcribed: {transcription}")
             
+            # A reply drafted while the caller was still talking answers this turn only
+            # if it was drafted on exactly what they said
+            speculation = None
+            if partial and partial.speculation:
+                speculation = partial.take_speculation(transcription)
+                stats = session['partial_stats']
+                stats['speculation_hits' if speculation else 'speculation_misses'] += 1
+            
+            # Streaming sessions get their audio sentence by sentence while the reply is generated
+            pipelined = bool(session.get('stream') and session.get('emit'))
+            
             # Process with AI (with timeout)
             logger.info(f"🤖 Starting AI response generation...")
+            session['response_stage'] = 'llm'
             try:
-                ai_response = await asyncio.wait_for(
-                    self.voice_service.process_text_message(
-                        message=transcription,
-                        language=session['language'],
-                        session_id=session_id
-                    ),
-                    timeout=30.0  # 30 second timeout
-                )
+                if pipelined:
+                    ai_response = await self._generate_spoken_response(
+                        session_id, 
+                        transcription, 
+                        session['language'],
+                        token,
+                        speculation
+                    )
+                else:
+                    ai_response = await asyncio.wait_for(
+                        self._generate_ai_response(
+                            session_id, 
+                            transcription, 
+                            session['language'], 
+                            token=token, 
+                            speculation=speculation
+                        ),
+                        timeout=30.0  # 30 second timeout
+                    )
                 logger.info(f"🤖 AI response generated: {ai_response.response[:100]}...")
             except asyncio.TimeoutError:
                 logger.error(f"🤖 AI response generation timed out after 30 seconds")
-                return {
-                    'transcription': transcription,
-                    'ai_response': "I'm sorry, I'm having trouble processing your request right now. Please try again.",
-                    'audio_response': "",
-                    'emergency_level': "none", 
-                    'requires_hospital': False,
-                    'language': session['language']
-                }
+                return self._fallback_response('ai_timeout', transcription, session['language'])
+            except OperationCancelled:
+                raise
             except Exception as ai_error:
                 logger.error(f"🤖 AI response generation failed: {ai_error}")
+                return self._fallback_response('ai_error', transcription, session['language'])
+            
+            if pipelined:
+                # Audio already went out as ordered audio_chunk events
                 return {
                     'transcription': transcription,
-                    'ai_response': "I'm sorry, I encountered an error processing your request.",
-                    'audio_response': "",
-                    'emergency_level': "none",
-                    'requires_hospital': False, 
+                    'ai_response': ai_response.response,
+                    'audio_bytes': b"",
+                    'audio_streamed': True,
+                    'emergency_level': ai_response.emergency_level,
+                    'requires_hospital': bool(ai_response.requires_hospital),
                     'language': session['language']
                 }
             
-            # Generate audio response
+            # Generate audio response in memory
             logger.info(f"🎵 Starting audio response generation...")
-            audio_response_path = None
+            session['response_stage'] = 'tts'
+            audio_bytes = None
             try:
-                audio_response_path = await asyncio.wait_for(
-                    self.voice_service.text_to_speech(
+                audio_bytes = await asyncio.wait_for(
+                    self.voice_service.text_to_speech_bytes(
                         ai_response.response,
-                        session['language']
+                        session['language'],
+                        token=token
                     ),
                     timeout=35.0  # Increased timeout to allow for 3 retries (10s each + 6s backoff)
                 )
-                if audio_response_path:
+                if audio_bytes:
                     logger.info(f"🎵 Audio response generated successfully")
-                else:
-                    logger.info(f"🎵 No audio response available - continuing with text only")
             except asyncio.TimeoutError:
                 logger.error(f"🎵 Audio response generation timed out after 35 seconds")
-                audio_response_path = None
+            except OperationCancelled:
+                raise
             except Exception as tts_error:
                 logger.error(f"🎵 Audio response generation failed: {tts_error}")
                 # Continue without audio - text response is more important
-                audio_response_path = None
             
-            # Convert audio to base64 for streaming
-            audio_base64 = ""
-            if audio_response_path and audio_response_path is not None:
-                try:
-                    audio_base64 = await self._audio_to_base64(audio_response_path)
-                    logger.info(f"🎵 Audio converted to base64: {len(audio_base64)} chars")
-                except Exception as b64_error:
-                    logger.error(f"🎵 Audio base64 conversion failed: {b64_error}")
-                    audio_base64 = ""
-            else:
+            if not audio_bytes:
                 logger.info(f"🎵 No audio response available - continuing with text only")
             
             return {
                 'transcription': transcription,
                 'ai_response': ai_response.response,
-                'audio_response': audio_base64,
+                'audio_bytes': audio_bytes or b"",
                 'emergency_level': ai_response.emergency_level,
                 'requires_hospital': bool(ai_response.requires_hospital),
                 'language': session['language']
             }
             
+        except OperationCancelled:
+            raise
         except Exception as e:
-            logger.error(f"Error processing audio chunk: {e}")
+            logger.error(f"Error processing utterance: {e}")
             return None
 
-    async def _process_accumulated_speech(self, session_id: str) -> Optional[Dict]:
-        """Process accumulated speech frames"""
+    def _fallback_response(self, phrase_key: str, transcription: str, language: str) -> Dict[str, Any]:
+        """Build a canned reply, with its pre-rendered audio when the phrase bank has it"""
+        payload = self.phrase_bank.get_payload(phrase_key, language)
+        return {
+            'transcription': transcription,
+            'ai_response': self.phrase_bank.get_text(phrase_key, language),
+            'audio_bytes': payload['audio_bytes'] if payload else b"",
+            'emergency_level': "none",
+            'requires_hospital': False,
+            'language': language
+        }
+
+    async def _generate_ai_response(
+        self, 
+        session_id: str, 
+        message: str, 
+        language: str,
+        stream: Optional[bool] = None,
+        on_delta: Optional[Callable[[str], None]] = None,
+        token: Optional[CancellationToken] = None,
+        speculation: Optional[asyncio.Task] = None
+    ):
+        """Get the AI reply, streaming partial text to the client if the session asked for it
+        
+        speculation is a reply already drafted on this message; it is used (and sent
+        as a single delta) unless it failed or the conversation moved on.
+        """
         
         session = self.active_sessions[session_id]
+        emit = session.get('emit')
+        if stream is None:
+            stream = session.get('stream', False)
+        
+        if speculation is not None:
+            drafted = await self._adopt_speculation(session_id, speculation, token)
+            if drafted is not None:
+                logger.info(f"🤖 Using the reply drafted while the caller was speaking")
+                if stream and emit:
+                    if on_delta:
+                        on_delta(drafted.response)
+                    await emit('ai_response_delta', {
+                        'delta': drafted.response,
+                        'index': 0,
+                        'transcription': message,
+                        'session_id': session_id
+                    })
+                return drafted
+        
+        if not (stream and emit):
+            return await self.voice_service.process_text_message(
+                message=message,
+                language=language,
+                session_id=session_id,
+                token=token
+            )
         
-        if not session['speech_frames']:
-            return None
-        
+        final_response = None
+        index = 0
+        events = self.voice_service.stream_text_message(message, language, session_id, token)
         try:
-            # Combine all speech frames
-            combined_audio = bytearray()
-            for frame in session['speech_frames']:
-                combined_audio.extend(frame)
-            
-            # Convert to audio file for speech recognition
-            audio_file_path = await self._save_audio_to_temp_file(combined_audio)
-            
-            # Transcribe speech
-            transcription = await self.voice_service.speech_to_text(
-                audio_file_path, 
-                session['language']
-            )
-            
-            if not transcription.strip():
-                return None
-            
-            logger.info(f"Transcribed: {transcription}")
-            
-            # Process with AI
-            ai_response = await self.voice_service.process_text_message(
-                message=transcription,
-                language=session['language'],
-                session_id=session_id
-            )
-            
-            # Generate audio response
-            audio_response_path = await self.voice_service.text_to_speech(
-                ai_response.response,
-                session['language']
-            )
-            
-            # Convert audio to base64 for streaming
-            audio_base64 = await self._audio_to_base64(audio_response_path)
-            
-            return {
-                'transcription': transcription,
-                'ai_response': ai_response.response,
-                'audio_response': audio_base64,
-                'emergency_level': ai_response.emergency_level,
-                'requires_hospital': bool(ai_response.requires_hospital),  # Ensure JSON serializable
-                'language': session['language']
-            }
-            
-        except Exception as e:
-            logger.error(f"Error processing speech: {e}")
-            return {'error': str(e)}
-    
-    async def _save_audio_to_temp_file(self, audio_data: bytearray) -> str:
-        """Save audio data to temporary WAV file with proper format conversion"""
+            async for event in events:
+                if event['type'] == 'delta':
+                    if on_delta:
+                        on_delta(event['text'])
+                    await emit('ai_response_delta', {
+                        'delta': event['text'],
+                        'index': index,
+                        'transcription': message,
+                        'session_id': session_id
+                    })
+                    index += 1
+                else:
+                    final_response = event['response']
+        finally:
+            # Closing the stream now, not whenever it is garbage collected, rewinds an
+            # interrupted turn and frees the chat before 'interrupted' goes out
+            await events.aclose()
         
-        import tempfile
-        import os
+        if final_response is None:
+            raise Exception("AI response stream ended without a final response")
         
-        # Create temporary file for the received audio (WebM format)
-        temp_input_fd, temp_input_path = tempfile.mkstemp(suffix='.webm')
-        # Create temporary file for the converted WAV audio
-        temp_output_fd, temp_output_path = tempfile.mkstemp(suffix='.wav')
+        logger.info(f"🤖 Streamed AI response in {index} deltas")
+        return final_response
+
+    async def _generate_spoken_response(
+        self, 
+        session_id: str, 
+        message: str, 
+        language: str,
+        token: Optional[CancellationToken] = None,
+        speculation: Optional[asyncio.Task] = None
+    ):
+        """Stream the AI reply and speak it sentence by sentence while it is still being generated"""
         
+        session = self.active_sessions[session_id]
+        emit = session['emit']
+        deltas: asyncio.Queue = asyncio.Queue()
+        
+        async def reply_text():
+            while True:
+                delta = await deltas.get()
+                if delta is None:
+                    return
+                yield delta
+        
+        async def speak():
+            count = 0
+            async for chunk in self.tts_pipeline.stream(reply_text(), language, token):
+                await emit('audio_chunk', {
+                    **chunk,
+                    'language': language,
+                    'session_id': session_id
+                })
+                count += 1
+            await emit('audio_stream_end', {'chunks': count, 'session_id': session_id})
+            logger.info(f"🎵 Streamed {count} audio chunks")
+        
+        speaker = asyncio.create_task(speak())
         try:
-            # Write the received audio data to input file
-            with os.fdopen(temp_input_fd, 'wb') as f:
-                f.write(audio_data)
-            
-            # Convert WebM to WAV using ffmpeg (if available) or fall back to direct write
-            try:
-                import subprocess
-                # Try to convert using ffmpeg
-                result = subprocess.run([
-                    'ffmpeg', '-i', temp_input_path, 
-                    '-ar', '16000',  # 16kHz sample rate
-                    '-ac', '1',      # Mono
-                    '-acodec', 'pcm_s16le',  # 16-bit PCM
-                    '-y',            # Overwrite output
-                    temp_output_path
-                ], capture_output=True, text=True, timeout=10)
-                
-                if result.returncode == 0:
-                    logger.info(f"🔄 Successfully converted audio using ffmpeg")
-                    os.close(temp_output_fd)  # Close the file descriptor
-                    return temp_output_path
-                else:
-                    logger.warning(f"⚠️ ffmpeg conversion failed: {result.stderr}")
-                    
-            except (subprocess.TimeoutExpired, FileNotFoundError, Exception) as e:
-                logger.warning(f"⚠️ ffmpeg not available or failed: {e}")
-            
-            # Fallback: Try to write as WAV directly (may not work for WebM)
-            os.close(temp_output_fd)  # Close before writing
-            with open(temp_output_path, 'wb') as f:
-                # Write simple WAV header for 16kHz mono 16-bit PCM
-                import struct
-                sample_rate = 16000
-                num_channels = 1
-                bits_per_sample = 16
-                
-                # Calculate sizes
-                data_size = len(audio_data)
-                chunk_size = 36 + data_size
-                
-                # Write WAV header
-                f.write(b'RIFF')
-                f.write(struct.pack('<L', chunk_size))
-                f.write(b'WAVE')
-                f.write(b'fmt ')
-                f.write(struct.pack('<L', 16))  # fmt chunk size
-                f.write(struct.pack('<H', 1))   # PCM format
-                f.write(struct.pack('<H', num_channels))
-                f.write(struct.pack('<L', sample_rate))
-                f.write(struct.pack('<L', sample_rate * num_channels * bits_per_sample // 8))
-                f.write(struct.pack('<H', num_channels * bits_per_sample // 8))
-                f.write(struct.pack('<H', bits_per_sample))
-                f.write(b'data')
-                f.write(struct.pack('<L', data_size))
-                f.write(audio_data)
-                
-            logger.info(f"🔄 Created WAV file with manual header")
-            return temp_output_path
-            
-        except Exception as e:
-            logger.error(f"Error saving audio file: {e}")
-            # Clean up files
-            try:
-                os.unlink(temp_input_path)
-                os.unlink(temp_output_path)
-            except:
-                pass
+            ai_response = await asyncio.wait_for(
+                self._generate_ai_response(
+                    session_id, 
+                    message, 
+                    language, 
+                    stream=True, 
+                    on_delta=deltas.put_nowait, 
+                    token=token,
+                    speculation=speculation
+                ),
+                timeout=30.0  # 30 second timeout
+            )
+        except BaseException:
+            speaker.cancel()
             raise
         finally:
-            # Clean up input file
-            try:
-                os.unlink(temp_input_path)
-            except:
-                pass
-    
-    async def _audio_to_base64(self, audio_file_path: str) -> str:
-        """Convert audio file to base64 string"""
+            deltas.put_nowait(None)
         
         try:
-            with open(audio_file_path, 'rb') as audio_file:
-                audio_bytes = audio_file.read()
-                audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
-                return audio_base64
+            await speaker
+        except OperationCancelled:
+            raise
         except Exception as e:
-            logger.error(f"Error converting audio to base64: {e}")
-            return ""
-    
+            logger.error(f"🎵 Audio streaming failed: {e}")
+        
+        return ai_response
+
     async def end_voice_session(self, session_id: str):
         """End a real-time voice session"""
         
         if session_id in self.active_sessions:
-            # Clean up session
+            # Stop any reply still in flight, then clean up session
+            session = self.active_sessions[session_id]
+            self._interrupt_response(session, 'session_ended')
+            if session['response_task']:
+                session['response_task'].cancel()
+            if session['decoder']:
+                await session['decoder'].close()
+            for partial in [*session['closed_partials'], session['partial']]:
+                if partial:
+                    partial.discard()
             await self.voice_service.end_session(session_id)
             del self.active_sessions[session_id]
             
         return {'status': 'ended', 'session_id': session_id}
     
+    def get_input_format(self, session_id: str) -> Optional[str]:
+        """Container format the session streams in chunks, or None for PCM/standalone recordings"""
+        
+        session = self.active_sessions.get(session_id)
+        return session['input_format'] if session else None
+    
     async def get_session_status(self, session_id: str) -> Dict:
         """Get status of a voice session"""
         
@@ -558,7 +844,18 @@ class RealTimeVoiceAgent:
             'is_speaking': session['is_speaking'],
             'conversation_active': session['conversation_active'],
             'last_activity': session['last_activity'],
-            'processing_audio': session['processing_audio']
+            'processing_audio': session['processing_audio'],
+            'stream': session['stream'],
+            'vad_aggressiveness': session['vad'].aggressiveness,
+            'noise_floor': session['vad'].noise_floor.get_stats(),
+            'memory': {
+                **session['audio_buffer'].get_stats(),
+                'buffer_seconds': session['audio_buffer'].capacity / (self.sample_rate * 2),
+                'pending_utterance_bytes': session['endpointer'].pending_bytes
+            },
+            'input_format': session['input_format'],
+            'decoder': audio_decoder.get_stats(),
+            'partials': session['partial_stats']
         }
     
     def cleanup_inactive_sessions(self, timeout: int = 300):  # 5 minutes
@@ -0,0 +1,140 @@
+"""
+Barge-in checks
+A reply interrupted mid-LLM or mid-TTS reports 'interrupted' and leaves the session usable
+"""
+
+import asyncio
+import os
+
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+from google.generativeai import protos
+from google.generativeai.types import generation_types
+
+from services.realtime_voice import RealTimeVoiceAgent
+from services.tts_cache import tts_cache
+
+SESSION = "barge-in"
+
+def _chunk(text: str) -> protos.GenerateContentResponse:
+    return protos.GenerateContentResponse(candidates=[
+        protos.Candidate(content=protos.Content(role='model', parts=[protos.Part(text=text)]))
+    ])
+
+
+def _agent(llm_delay: float, tts_delay: float) -> RealTimeVoiceAgent:
+    """Agent whose STT, Gemini model and gTTS are canned, with the given delays"""
+    agent = RealTimeVoiceAgent()
+    voice_service = agent.voice_service
+
+    async def generate_content_async(contents, stream=False, **kwargs):
+        async def chunks():
+            for i in range(3):
+                await asyncio.sleep(llm_delay)
+                yield _chunk(f"Part {i}. ")
+        if stream:
+            return await generation_types.AsyncGenerateContentResponse.from_aiterator(chunks())
+        await asyncio.sleep(llm_delay)
+        return generation_types.AsyncGenerateContentResponse.from_response(_chunk("Whole reply."))
+
+    async def transcribe_pcm(pcm, language="en"):
+        return "my chest hurts"
+
+    async def create_tts(text, tts_lang, slow=False):
+        await asyncio.sleep(tts_delay)
+        return b"mp3"
+
+    voice_service.model.generate_content_async = generate_content_async
+    voice_service.transcribe_pcm = transcribe_pcm
+    voice_service._create_tts_with_timeout = create_tts
+    agent._above_noise_floor = lambda session, pcm, recording: True
+    return agent
+
+
+async def _barge_in(agent: RealTimeVoiceAgent, stage: str, stream: bool = False) -> list:
+    """Start a reply, interrupt it once it reaches stage, and return the emitted events"""
+    events = []
+
+    async def emit(event_type, data):
+        events.append((event_type, data))
+
+    await agent.start_voice_session(SESSION, stream=stream, emit=emit)
+    session = agent.active_sessions[SESSION]
+    reply = agent._start_response(SESSION, b"\x00" * 3200, 'pcm')
+    while session['response_stage'] != stage:
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.05)
+    agent._interrupt_response(session, 'barge_in')
+
+    # The reply task finishes normally: an interruption is a result, not a cancellation
+    assert await reply is None
+    assert not reply.cancelled()
+    assert session['response_token'] is None
+    assert not session['processing_audio']
+    return events
+
+
+def _interruptions(events: list) -> list:
+    return [data for event_type, data in events if event_type == 'interrupted']
+
+
+def test_barge_in_during_llm_call():
+    async def run():
+        agent = _agent(llm_delay=5, tts_delay=0)
+        events = await _barge_in(agent, 'llm')
+        chat = agent.voice_service.sessions[SESSION]['chat_history']
+        assert chat.history == []
+        await agent.end_voice_session(SESSION)
+        return events
+
+    events = asyncio.run(run())
+    assert _interruptions(events) == [{'reason': 'barge_in', 'stage': 'llm', 'session_id': SESSION}]
+    assert not any(event_type == 'conversation_response' for event_type, _ in events)
+
+
+def test_barge_in_during_streamed_llm_reply():
+    async def run():
+        agent = _agent(llm_delay=0.3, tts_delay=0)
+        events = await _barge_in(agent, 'llm', stream=True)
+
+        # The cut-off turn was rewound and the next message goes through
+        voice_service = agent.voice_service
+        response = await voice_service.process_text_message("again", session_id=SESSION)
+        assert response.response == "Whole reply."
+        assert len(voice_service.sessions[SESSION]['chat_history'].history) == 2
+        await agent.end_voice_session(SESSION)
+        return events
+
+    events = asyncio.run(run())
+    assert [data['stage'] for data in _interruptions(events)] == ['llm']
+
+
+def test_barge_in_during_tts(monkeypatch):
+    monkeypatch.setattr(tts_cache, 'get', lambda key: None)
+    monkeypatch.setattr(tts_cache, 'put', lambda key, audio: None)
+
+    async def run():
+        agent = _agent(llm_delay=0, tts_delay=5)
+        events = await _barge_in(agent, 'tts')
+        await agent.end_voice_session(SESSION)
+        return events
+
+    events = asyncio.run(run())
+    assert _interruptions(events) == [{'reason': 'barge_in', 'stage': 'tts', 'session_id': SESSION}]
+    assert not any(event_type == 'conversation_response' for event_type, _ in events)
+
+
+def test_barge_in_while_streamed_reply_is_spoken(monkeypatch):
+    monkeypatch.setattr(tts_cache, 'get', lambda key: None)
+    monkeypatch.setattr(tts_cache, 'put', lambda key, audio: None)
+
+    async def run():
+        # The text is all in; sentence TTS, running in its own tasks, is what gets cut off
+        agent = _agent(llm_delay=0, tts_delay=5)
+        events = await _barge_in(agent, 'llm', stream=True)
+        await agent.end_voice_session(SESSION)
+        return events
+
+    events = asyncio.run(run())
+    assert [data['reason'] for data in _interruptions(events)] == ['barge_in']
+    assert not any(event_type in ('audio_chunk', 'conversation_response') for event_type, _ in events)
@@ -0,0 +1,151 @@
+"""
+Per-session Work Queue
+Bounded queue between a voice WebSocket's reader and its processing worker, so
+frames keep being read while STT/LLM/TTS runs, with an explicit policy for when
+the worker falls behind
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Backpressure policies
+DROP_OLDEST = "drop_oldest"
+COALESCE = "coalesce"
+
+BACKPRESSURE_POLICIES = (DROP_OLDEST, COALESCE)
+
+class SessionWorkQueue:
+    def __init__(
+        self,
+        maxsize: Optional[int] = None,
+        policy: Optional[str] = None,
+        max_coalesce_bytes: Optional[int] = None
+    ):
+        """Initialize the queue
+
+        Items are dicts with a 'type' ('audio' or 'text'). Audio items carry 'data'
+        and the resolved 'format'; raw PCM items ('format' == 'pcm') are contiguous
+        audio and can be merged. Audio items with 'stream' set are chunks of one
+        continuous container (a session with an input_format): losing one would
+        corrupt the session's decoder, so they are never dropped.
+
+        With COALESCE, a PCM item is appended to a PCM item already waiting at the
+        tail (up to max_coalesce_bytes), so a backlog is processed as one larger
+        chunk instead of being dropped. Whatever can't be merged into a full queue
+        falls back to dropping the oldest droppable audio item. A stream chunk
+        arriving at a full queue is appended to a stream chunk waiting at the tail
+        whatever the policy, since its bytes continue that chunk. Text items and
+        stream chunks that can't be merged are queued past maxsize rather than lost.
+        """
+        self.maxsize = maxsize or settings.WS_QUEUE_MAXSIZE
+        self.policy = policy or settings.WS_BACKPRESSURE_POLICY
+        self.max_coalesce_bytes = max_coalesce_bytes or settings.WS_COALESCE_MAX_BYTES
+
+        if self.policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Backpressure policy must be one of {BACKPRESSURE_POLICIES}")
+
+        self._items: Deque[Dict[str, Any]] = deque()
+        self._not_empty = asyncio.Event()
+
+        self.stats = {
+            'enqueued': 0,
+            'processed': 0,
+            'coalesced': 0,
+            'dropped': 0,
+            'dropped_bytes': 0,
+            'overflowed': 0,
+            'max_depth': 0,
+            'max_wait_ms': 0.0
+        }
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put_nowait(self, item: Dict[str, Any]):
+        """Enqueue an item without blocking the reader, applying the backpressure policy"""
+        self.stats['enqueued'] += 1
+
+        if self.policy == COALESCE and self._coalesce(item):
+            return
+
+        if len(self._items) >= self.maxsize:
+            if item.get('stream') and self._merge_into_tail(item, 'stream'):
+                return
+            if not self._drop_oldest():
+                # Nothing droppable is waiting: keep the item and go past the bound
+                self.stats['overflowed'] += 1
+                logger.warning(f"⚠️ Session queue full ({self.maxsize}) of undroppable items, queueing past it")
+
+        item['enqueued_at'] = time.monotonic()
+        self._items.append(item)
+        self.stats['max_depth'] = max(self.stats['max_depth'], len(self._items))
+        self._not_empty.set()
+
+    async def get(self) -> Dict[str, Any]:
+        """Wait for the next item"""
+        while not self._items:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+
+        item = self._items.popleft()
+        wait_ms = (time.monotonic() - item.pop('enqueued_at')) * 1000
+        self.stats['max_wait_ms'] = max(self.stats['max_wait_ms'], round(wait_ms, 1))
+        self.stats['processed'] += 1
+        return item
+
+    def _coalesce(self, item: Dict[str, Any]) -> bool:
+        if not self._is_pcm(item) or not self._items or not self._is_pcm(self._items[-1]):
+            return False
+        if len(self._items[-1]['data']) + len(item['data']) > self.max_coalesce_bytes:
+            return False
+        return self._merge_into_tail(item, 'pcm')
+
+    def _merge_into_tail(self, item: Dict[str, Any], kind: str) -> bool:
+        if not self._items:
+            return False
+        tail = self._items[-1]
+        if kind == 'stream' and not (tail.get('stream') and tail['format'] == item['format']):
+            return False
+
+        if not isinstance(tail['data'], bytearray):
+            tail['data'] = bytearray(tail['data'])
+        tail['data'].extend(item['data'])
+        self.stats['coalesced'] += 1
+        return True
+
+    def _drop_oldest(self) -> bool:
+        # Only standalone audio is dropped: text is what the user typed, and a
+        # stream chunk is part of a container the decoder needs whole
+        victim = next((item for item in self._items if self._is_droppable(item)), None)
+        if victim is None:
+            return False
+        self._items.remove(victim)
+        self.stats['dropped'] += 1
+        self.stats['dropped_bytes'] += len(victim['data'])
+        logger.warning(f"⚠️ Session queue full ({self.maxsize}), dropped oldest {victim['format']} audio item")
+        return True
+
+    @staticmethod
+    def _is_pcm(item: Dict[str, Any]) -> bool:
+        return item['type'] == 'audio' and item.get('format') == 'pcm' and not item.get('stream')
+
+    @staticmethod
+    def _is_droppable(item: Dict[str, Any]) -> bool:
+        return item['type'] == 'audio' and not item.get('stream')
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and backpressure metrics"""
+        return {
+            'depth': len(self._items),
+            'queued_bytes': sum(len(item.get('data', b"")) for item in self._items),
+            'maxsize': self.maxsize,
+            'policy': self.policy,
+            **self.stats
+        }
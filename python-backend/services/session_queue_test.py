@@ -0,0 +1,89 @@
+"""
+Session queue checks
+A full queue coalesces or drops standalone audio, never text or container stream chunks
+"""
+
+import asyncio
+
+from services.session_queue import COALESCE, DROP_OLDEST, SessionWorkQueue
+
+def _audio(data: bytes, format: str = 'pcm', stream: bool = False) -> dict:
+    item = {'type': 'audio', 'data': data, 'format': format}
+    if stream:
+        item['stream'] = True
+    return item
+
+
+def _text(message: str) -> dict:
+    return {'type': 'text', 'message': {'message': message}}
+
+
+def _drain(queue: SessionWorkQueue) -> list:
+    async def run():
+        return [await queue.get() for _ in range(len(queue))]
+    return asyncio.run(run())
+
+
+def test_coalesce_merges_pcm_at_the_tail():
+    queue = SessionWorkQueue(maxsize=2, policy=COALESCE, max_coalesce_bytes=1024)
+    for chunk in (b"aa", b"bb", b"cc"):
+        queue.put_nowait(_audio(chunk))
+
+    items = _drain(queue)
+    assert [bytes(item['data']) for item in items] == [b"aabbcc"]
+    assert queue.stats['coalesced'] == 2
+    assert queue.stats['dropped'] == 0
+
+
+def test_coalesce_respects_byte_cap_then_drops_oldest_audio():
+    queue = SessionWorkQueue(maxsize=2, policy=COALESCE, max_coalesce_bytes=4)
+    for chunk in (b"aaa", b"bbb", b"ccc"):
+        queue.put_nowait(_audio(chunk))
+
+    assert [bytes(item['data']) for item in _drain(queue)] == [b"bbb", b"ccc"]
+    assert queue.stats['dropped'] == 1
+    assert queue.stats['dropped_bytes'] == 3
+
+
+def test_drop_oldest_keeps_text():
+    queue = SessionWorkQueue(maxsize=2, policy=DROP_OLDEST)
+    queue.put_nowait(_text("first"))
+    queue.put_nowait(_audio(b"old"))
+    queue.put_nowait(_audio(b"new"))
+
+    items = _drain(queue)
+    assert [item['type'] for item in items] == ['text', 'audio']
+    assert bytes(items[1]['data']) == b"new"
+
+
+def test_text_only_queue_grows_past_its_bound():
+    queue = SessionWorkQueue(maxsize=2, policy=DROP_OLDEST)
+    for message in ("one", "two", "three"):
+        queue.put_nowait(_text(message))
+
+    assert [item['message']['message'] for item in _drain(queue)] == ["one", "two", "three"]
+    assert queue.stats['dropped'] == 0
+    assert queue.stats['overflowed'] == 1
+
+
+def test_stream_chunks_are_merged_not_dropped():
+    for policy in (DROP_OLDEST, COALESCE):
+        queue = SessionWorkQueue(maxsize=2, policy=policy, max_coalesce_bytes=4)
+        for chunk in (b"head", b"c1", b"c2", b"c3"):
+            queue.put_nowait(_audio(chunk, format='webm', stream=True))
+
+        # The container bytes all arrive, in order
+        assert b"".join(bytes(item['data']) for item in _drain(queue)) == b"headc1c2c3"
+        assert queue.stats['dropped'] == 0
+
+
+def test_pcm_is_dropped_before_stream_chunks():
+    queue = SessionWorkQueue(maxsize=2, policy=DROP_OLDEST)
+    queue.put_nowait(_audio(b"pcm"))
+    queue.put_nowait(_text("hello"))
+    queue.put_nowait(_audio(b"head", format='webm', stream=True))
+
+    items = _drain(queue)
+    assert [item['type'] for item in items] == ['text', 'audio']
+    assert items[1].get('stream')
+    assert queue.stats['dropped_bytes'] == 3
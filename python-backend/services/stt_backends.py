@@ -0,0 +1,235 @@
+"""
+STT Backends - Pluggable speech recognition engines
+Each backend declares the languages it handles and how it can be called (blocking,
+natively async, streaming), so network and local engines can be mixed, routed by
+language and benchmarked against each other
+"""
+
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import speech_recognition as sr
+    SPEECH_RECOGNITION_AVAILABLE = True
+except ImportError:
+    SPEECH_RECOGNITION_AVAILABLE = False
+
+try:
+    import pocketsphinx  # noqa: F401 - needed by recognize_sphinx
+    SPHINX_AVAILABLE = True
+except ImportError:
+    SPHINX_AVAILABLE = False
+    print("Warning: pocketsphinx not available. Speech recognition has no offline fallback.")
+
+try:
+    import vosk
+    vosk.SetLogLevel(-1)
+    VOSK_AVAILABLE = True
+except ImportError:
+    VOSK_AVAILABLE = False
+
+class STTBackend(ABC):
+    """Base class for speech recognition engines
+
+    Audio is always 16 kHz 16-bit mono PCM. Backends implement recognize (blocking,
+    run on the STT thread pool) and may also set:
+
+    - supports_async: recognize_async is a native coroutine and runs on the loop
+    - supports_streaming: open_stream returns an incremental recognizer
+
+    A backend missing recognize, or a method its flags promise, fails when it is
+    constructed rather than on its first request.
+    """
+
+    name = "base"
+    supports_async = False
+    supports_streaming = False
+    # Work is local CPU rather than a network round trip
+    local = False
+
+    def __init__(self, timeout: float, languages: Optional[List[str]] = None):
+        """languages lists language-code prefixes ("en", "hi") the backend handles; None means all"""
+        self.timeout = timeout
+        self.languages = languages
+
+        for flag, method in (('supports_async', 'recognize_async'), ('supports_streaming', 'open_stream')):
+            if getattr(self, flag) and getattr(type(self), method) is getattr(STTBackend, method):
+                raise TypeError(f"{type(self).__name__} sets {flag} but does not implement {method}")
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    def supports(self, language: str) -> bool:
+        return self.languages is None or language.split('-')[0] in self.languages
+
+    @abstractmethod
+    def recognize(self, pcm: bytes, language: str, sample_rate: int = 16000) -> str:
+        """Transcribe a complete utterance (blocking); "" when nothing intelligible was heard"""
+
+    async def recognize_async(self, pcm: bytes, language: str, sample_rate: int = 16000) -> str:
+        """Transcribe a complete utterance without blocking the event loop (with supports_async)"""
+        raise NotImplementedError(f"{self.name} has no native async recognition")
+
+    def open_stream(self, language: str, sample_rate: int = 16000) -> "STTStream":
+        """Start an incremental recognition (with supports_streaming)"""
+        raise NotImplementedError(f"{self.name} has no streaming recognition")
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            'available': self.available,
+            'async': self.supports_async,
+            'streaming': self.supports_streaming,
+            'local': self.local,
+            'languages': self.languages
+        }
+
+
+class STTStream(ABC):
+    """Incremental recognition of one utterance (blocking calls, PCM in order)"""
+
+    @abstractmethod
+    def accept(self, pcm: bytes) -> str:
+        """Feed more audio and return the current partial transcript"""
+
+    @abstractmethod
+    def finish(self) -> str:
+        """Return the final transcript"""
+
+
+class GoogleWebBackend(STTBackend):
+    name = "google"
+
+    def __init__(self, timeout: Optional[float] = None):
+        super().__init__(timeout or settings.STT_GOOGLE_TIMEOUT)
+        if SPEECH_RECOGNITION_AVAILABLE:
+            self.recognizer = sr.Recognizer()
+            # Bounds the HTTP request itself, so a timed-out call also frees its thread
+            self.recognizer.operation_timeout = self.timeout
+
+    @property
+    def available(self) -> bool:
+        return SPEECH_RECOGNITION_AVAILABLE
+
+    def recognize(self, pcm: bytes, language: str, sample_rate: int = 16000) -> str:
+        audio = sr.AudioData(bytes(pcm), sample_rate, 2)
+        try:
+            return self.recognizer.recognize_google(audio, language=language)
+        except sr.UnknownValueError:
+            return ""
+
+
+class SphinxBackend(STTBackend):
+    name = "sphinx"
+    local = True
+
+    def __init__(self, timeout: Optional[float] = None):
+        # The bundled Sphinx model is English only
+        super().__init__(timeout or settings.STT_SPHINX_TIMEOUT, languages=['en'])
+        if SPEECH_RECOGNITION_AVAILABLE:
+            self.recognizer = sr.Recognizer()
+
+    @property
+    def available(self) -> bool:
+        return SPEECH_RECOGNITION_AVAILABLE and SPHINX_AVAILABLE
+
+    def recognize(self, pcm: bytes, language: str, sample_rate: int = 16000) -> str:
+        audio = sr.AudioData(bytes(pcm), sample_rate, 2)
+        try:
+            return self.recognizer.recognize_sphinx(audio)
+        except sr.UnknownValueError:
+            return ""
+
+
+class VoskStream(STTStream):
+    def __init__(self, recognizer: Any):
+        self._recognizer = recognizer
+        # Kaldi closes a segment at each pause it detects; keep the closed ones
+        self._segments: List[str] = []
+
+    def accept(self, pcm: bytes) -> str:
+        if self._recognizer.AcceptWaveform(bytes(pcm)):
+            self._segments.append(json.loads(self._recognizer.Result()).get('text', ""))
+            return self._joined()
+        return self._joined(json.loads(self._recognizer.PartialResult()).get('partial', ""))
+
+    def finish(self) -> str:
+        return self._joined(json.loads(self._recognizer.FinalResult()).get('text', ""))
+
+    def _joined(self, tail: str = "") -> str:
+        return " ".join(text for text in self._segments + [tail] if text)
+
+
+class VoskBackend(STTBackend):
+    """Local Kaldi models on the CPU; one model directory per language"""
+
+    name = "vosk"
+    supports_streaming = True
+    local = True
+
+    def __init__(self, model_paths: Optional[Dict[str, str]] = None, timeout: Optional[float] = None):
+        self.model_paths = model_paths if model_paths is not None else parse_language_map(settings.VOSK_MODEL_PATHS)
+        super().__init__(timeout or settings.STT_LOCAL_TIMEOUT, languages=list(self.model_paths))
+        self._models: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return VOSK_AVAILABLE and bool(self.model_paths)
+
+    def _model(self, language: str) -> Any:
+        key = language.split('-')[0]
+        # Models take seconds to load; load each once, from whichever thread needs it first
+        with self._lock:
+            if key not in self._models:
+                logger.info(f"🎤 Loading Vosk model for {key} from {self.model_paths[key]}")
+                self._models[key] = vosk.Model(self.model_paths[key])
+            return self._models[key]
+
+    def open_stream(self, language: str, sample_rate: int = 16000) -> VoskStream:
+        return VoskStream(vosk.KaldiRecognizer(self._model(language), sample_rate))
+
+    def recognize(self, pcm: bytes, language: str, sample_rate: int = 16000) -> str:
+        stream = self.open_stream(language, sample_rate)
+        stream.accept(pcm)
+        return stream.finish()
+
+
+def parse_language_map(value: str) -> Dict[str, str]:
+    """Parse "en=/models/en;hi=/models/hi" into {"en": "/models/en", "hi": "/models/hi"}"""
+    mapping = {}
+    for entry in filter(None, (part.strip() for part in value.split(';'))):
+        language, _, target = entry.partition('=')
+        if target:
+            mapping[language.strip()] = target.strip()
+    return mapping
+
+
+# Every engine this build knows about, by name
+BACKEND_TYPES = {
+    'google': GoogleWebBackend,
+    'sphinx': SphinxBackend,
+    'vosk': VoskBackend
+}
+
+def create_backends(names: List[str]) -> List[STTBackend]:
+    """Instantiate the named backends, skipping unknown or unavailable ones"""
+    backends = []
+    for name in names:
+        backend_type = BACKEND_TYPES.get(name)
+        if backend_type is None:
+            logger.warning(f"⚠️ Unknown STT backend: {name}")
+            continue
+        backend = backend_type()
+        if backend.available:
+            backends.append(backend)
+        else:
+            logger.info(f"🎤 STT backend {name} not available, skipping")
+    return backends
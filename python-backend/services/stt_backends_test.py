@@ -0,0 +1,31 @@
+"""
+STT backend checks
+A backend that doesn't implement what it promises is refused when it is constructed
+"""
+
+import pytest
+
+from services.stt_backends import STTBackend, parse_language_map
+
+def test_backend_without_recognize_fails_at_construction():
+    class Incomplete(STTBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete(timeout=1.0)
+
+
+def test_backend_flagging_a_missing_capability_fails_at_construction():
+    class NoStream(STTBackend):
+        name = "no-stream"
+        supports_streaming = True
+
+        def recognize(self, pcm, language, sample_rate=16000):
+            return ""
+
+    with pytest.raises(TypeError, match="open_stream"):
+        NoStream(timeout=1.0)
+
+
+def test_parse_language_map():
+    assert parse_language_map(" en=/models/en ; hi = /models/hi;;bad") == {"en": "/models/en", "hi": "/models/hi"}
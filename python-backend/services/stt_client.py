@@ -0,0 +1,292 @@
+"""
+Async STT Client - Non-blocking, hedged execution layer for speech recognition
+Runs the STT backends routed to a language (blocking ones on a bounded thread pool),
+starts the next backend when the preferred one is slow, and takes the first good result
+"""
+
+import asyncio
+import functools
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Optional
+
+from config import settings
+from .stt_backends import STTBackend, STTStream, create_backends, parse_language_map
+
+logger = logging.getLogger(__name__)
+
+class ErrorBudget:
+    def __init__(self, window: int, max_failure_ratio: float, cooldown: float):
+        """Track recent outcomes of a backend and trip when too many of them failed
+
+        A tripped backend is skipped for cooldown seconds, then tried again; one
+        success closes it, one failure trips it for another cooldown.
+        """
+        self.max_failure_ratio = max_failure_ratio
+        self.cooldown = cooldown
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._tripped_until = 0.0
+        # Set once tripped: the first call after the cooldown decides alone
+        self._probing = False
+
+    @property
+    def tripped(self) -> bool:
+        return time.monotonic() < self._tripped_until
+
+    def allows(self) -> bool:
+        return not self.tripped
+
+    def record(self, ok: bool):
+        if ok:
+            self._outcomes.append(ok)
+            self._probing = False
+            return
+        if self._probing:
+            self._trip()
+            return
+        self._outcomes.append(ok)
+        # Only judge a full window, so a single early failure doesn't trip it
+        if len(self._outcomes) == self._outcomes.maxlen and self.failure_ratio > self.max_failure_ratio:
+            self._trip()
+
+    def _trip(self):
+        self._tripped_until = time.monotonic() + self.cooldown
+        self._outcomes.clear()
+        self._probing = True
+        logger.warning(f"⚠️ STT error budget exhausted, skipping backend for {self.cooldown}s")
+
+    @property
+    def failure_ratio(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+
+class TrackedBackend:
+    def __init__(self, engine: STTBackend):
+        """An STT backend with its own error budget and latency counters"""
+        self.engine = engine
+        self.name = engine.name
+        self.timeout = engine.timeout
+        self.budget = ErrorBudget(
+            settings.STT_ERROR_WINDOW,
+            settings.STT_ERROR_BUDGET,
+            settings.STT_BREAKER_COOLDOWN
+        )
+        self.stats: Dict[str, float] = {
+            'calls': 0,
+            'wins': 0,
+            'empty': 0,
+            'errors': 0,
+            'timeouts': 0,
+            'total_ms': 0.0
+        }
+
+    def supports(self, language: str) -> bool:
+        return self.engine.supports(language)
+
+    def get_stats(self) -> Dict[str, Any]:
+        calls = self.stats['calls']
+        return {
+            **self.engine.describe(),
+            **self.stats,
+            'avg_ms': round(self.stats['total_ms'] / calls, 1) if calls else 0.0,
+            'timeout': self.timeout,
+            'failure_ratio': round(self.budget.failure_ratio, 3),
+            'tripped': self.budget.tripped
+        }
+
+
+class AsyncSTTStream:
+    def __init__(self, client: "AsyncSTTClient", backend: TrackedBackend, stream: STTStream, preferred: bool):
+        """Incremental recognition whose blocking calls run, in order, on the STT pool
+
+        preferred is set when the backend is the first choice for the language, so
+        its final transcript is as good as a full recognize() call.
+        """
+        self.client = client
+        self.backend = backend
+        self.preferred = preferred
+        self._stream = stream
+        # Calls must reach the engine in order
+        self._lock = asyncio.Lock()
+
+    @property
+    def name(self) -> str:
+        return self.backend.name
+
+    async def accept(self, pcm: bytes) -> str:
+        """Feed audio and return the partial transcript so far"""
+        async with self._lock:
+            return await self.client.run_blocking(self._stream.accept, bytes(pcm))
+
+    async def finish(self) -> str:
+        """Return the final transcript"""
+        async with self._lock:
+            return (await self.client.run_blocking(self._stream.finish)).strip()
+
+
+class AsyncSTTClient:
+    def __init__(
+        self,
+        backends: Optional[List[STTBackend]] = None,
+        routes: Optional[Dict[str, List[str]]] = None,
+        hedge_delay: Optional[float] = None,
+        executor_workers: Optional[int] = None
+    ):
+        """Initialize the async STT client
+
+        backends are in default order of preference (STT_BACKENDS); routes
+        reorders or restricts them per language (STT_LANGUAGE_BACKENDS), keyed by
+        language-code prefix. The first routed backend starts immediately; the
+        next starts once the previous has failed or hedge_delay has passed
+        without an answer, and the first non-empty transcription wins.
+        """
+        self.hedge_delay = hedge_delay or settings.STT_HEDGE_DELAY
+        if backends is None:
+            backends = create_backends([name.strip() for name in settings.STT_BACKENDS.split(',') if name.strip()])
+        self.backends = [TrackedBackend(backend) for backend in backends]
+        if routes is None:
+            routes = {
+                language: [name.strip() for name in names.split(',')]
+                for language, names in parse_language_map(settings.STT_LANGUAGE_BACKENDS).items()
+            }
+        self.routes = routes
+
+        # Dedicated pool so slow recognitions never starve the default executor used for TTS
+        self._executor = ThreadPoolExecutor(
+            max_workers=executor_workers or settings.STT_EXECUTOR_WORKERS,
+            thread_name_prefix="stt"
+        )
+
+        self.stats: Dict[str, int] = {
+            'requests': 0,
+            'hedged': 0,
+            'no_result': 0,
+            'skipped_tripped': 0
+        }
+
+    def route(self, language: str) -> List[TrackedBackend]:
+        """Backends to try for a language code (e.g. "hi-IN"), in order"""
+        names = self.routes.get(language.split('-')[0])
+        if names is None:
+            ordered = self.backends
+        else:
+            by_name = {backend.name: backend for backend in self.backends}
+            ordered = [by_name[name] for name in names if name in by_name]
+        return [backend for backend in ordered if backend.supports(language)]
+
+    async def recognize(self, pcm: bytes, language: str, sample_rate: int = 16000) -> str:
+        """Transcribe 16-bit mono PCM, returning "" when nothing usable came back"""
+        self.stats['requests'] += 1
+        audio = (bytes(pcm), sample_rate)
+
+        candidates = self.route(language)
+        waiting = [backend for backend in candidates if backend.budget.allows()]
+        self.stats['skipped_tripped'] += len(candidates) - len(waiting)
+        if not waiting:
+            # Every backend is over budget; trying the preferred one beats giving up
+            waiting = candidates[:1]
+
+        running: Dict[asyncio.Task, TrackedBackend] = {}
+        try:
+            while waiting or running:
+                if waiting and not running:
+                    self._start(waiting.pop(0), audio, language, running)
+
+                done, _ = await asyncio.wait(
+                    running,
+                    timeout=self.hedge_delay if waiting else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    # The running backend is slow; hedge with the next one
+                    self.stats['hedged'] += 1
+                    logger.info(f"🎤 No transcription after {self.hedge_delay}s, also trying {waiting[0].name}")
+                    self._start(waiting.pop(0), audio, language, running)
+                    continue
+
+                for task in done:
+                    backend = running.pop(task)
+                    text = task.result()
+                    if text:
+                        backend.stats['wins'] += 1
+                        logger.info(f"✅ Transcribed with {backend.name}: {text}")
+                        return text
+
+            self.stats['no_result'] += 1
+            logger.warning("❌ All speech recognition backends failed")
+            return ""
+        finally:
+            # Losers are abandoned; their threads finish on their own timeouts
+            for task in running:
+                task.cancel()
+
+    async def open_stream(self, language: str) -> Optional[AsyncSTTStream]:
+        """Incremental recognition from the first routed streaming backend, if any"""
+        allowed = [backend for backend in self.route(language) if backend.budget.allows()]
+        for backend in allowed:
+            if backend.engine.supports_streaming:
+                stream = await self.run_blocking(backend.engine.open_stream, language)
+                return AsyncSTTStream(self, backend, stream, preferred=backend is allowed[0])
+        return None
+
+    async def run_blocking(self, func, *args) -> Any:
+        """Run a blocking engine call on the STT thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args))
+
+    def _start(self, backend: TrackedBackend, audio: Any, language: str, running: Dict):
+        logger.info(f"🎤 Trying speech recognition with {backend.name}...")
+        running[asyncio.create_task(self._run(backend, audio, language))] = backend
+
+    async def _run(self, backend: TrackedBackend, audio: Any, language: str) -> str:
+        """One backend call; failures are recorded against its budget and reported as ""."""
+        pcm, sample_rate = audio
+        engine = backend.engine
+        backend.stats['calls'] += 1
+        started = time.perf_counter()
+        ok = False
+        abandoned = False
+        try:
+            if engine.supports_async:
+                call = engine.recognize_async(pcm, language, sample_rate)
+            else:
+                call = self.run_blocking(engine.recognize, pcm, language, sample_rate)
+            text = await asyncio.wait_for(call, timeout=backend.timeout)
+            ok = True
+            text = (text or "").strip()
+            if not text:
+                backend.stats['empty'] += 1
+            return text
+        except asyncio.CancelledError:
+            # A hedge loser cancelled mid-call says nothing about the backend's health
+            abandoned = True
+            raise
+        except asyncio.TimeoutError:
+            backend.stats['timeouts'] += 1
+            logger.warning(f"⚠️ {backend.name} recognition timed out after {backend.timeout}s")
+            return ""
+        except Exception as e:
+            backend.stats['errors'] += 1
+            logger.warning(f"⚠️ {backend.name} recognition failed: {e}")
+            return ""
+        finally:
+            backend.stats['total_ms'] += (time.perf_counter() - started) * 1000
+            if not abandoned:
+                backend.budget.record(ok)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get recognition statistics per backend"""
+        return {
+            **self.stats,
+            'hedge_delay': self.hedge_delay,
+            'routes': self.routes,
+            'backends': {backend.name: backend.get_stats() for backend in self.backends}
+        }
+
+# Shared client so every service instance draws from the same thread pool and budgets
+stt_client = AsyncSTTClient()
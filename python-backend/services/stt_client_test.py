@@ -0,0 +1,85 @@
+"""
+STT client checks
+Backends are hedged in order and failures are charged to their error budgets
+"""
+
+import asyncio
+import time
+
+from services.stt_backends import STTBackend
+from services.stt_client import AsyncSTTClient, ErrorBudget
+
+class CannedBackend(STTBackend):
+    supports_async = True
+
+    def __init__(self, name: str, text: str = "", delay: float = 0.0, fails: bool = False):
+        super().__init__(timeout=2.0)
+        self.name = name
+        self.text = text
+        self.delay = delay
+        self.fails = fails
+        self.calls = 0
+
+    def recognize(self, pcm: bytes, language: str, sample_rate: int = 16000) -> str:
+        return self.text
+
+    async def recognize_async(self, pcm: bytes, language: str, sample_rate: int = 16000) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fails:
+            raise RuntimeError(f"{self.name} is down")
+        return self.text
+
+
+def _recognize(client: AsyncSTTClient) -> str:
+    return asyncio.run(client.recognize(b"\x00" * 320, "en"))
+
+
+def test_slow_backend_is_hedged():
+    slow = CannedBackend("slow", "from slow", delay=1.0)
+    fast = CannedBackend("fast", "from fast")
+    client = AsyncSTTClient([slow, fast], routes={}, hedge_delay=0.05)
+
+    assert _recognize(client) == "from fast"
+    assert client.stats['hedged'] == 1
+
+
+def test_failed_backend_falls_through_without_waiting():
+    broken = CannedBackend("broken", fails=True)
+    backup = CannedBackend("backup", "from backup")
+    client = AsyncSTTClient([broken, backup], routes={}, hedge_delay=10)
+
+    started = time.perf_counter()
+    assert _recognize(client) == "from backup"
+    assert time.perf_counter() - started < 1
+    assert client.stats['hedged'] == 0
+
+
+def test_tripped_backend_is_skipped():
+    broken = CannedBackend("broken", fails=True)
+    backup = CannedBackend("backup", "from backup")
+    client = AsyncSTTClient([broken, backup], routes={}, hedge_delay=10)
+    client.backends[0].budget = ErrorBudget(window=2, max_failure_ratio=0.5, cooldown=60)
+
+    for _ in range(3):
+        assert _recognize(client) == "from backup"
+    assert broken.calls == 2
+    assert client.stats['skipped_tripped'] == 1
+
+
+def test_error_budget_probe_after_cooldown():
+    budget = ErrorBudget(window=2, max_failure_ratio=0.5, cooldown=0.05)
+    budget.record(False)
+    assert budget.allows()
+    budget.record(False)
+    assert not budget.allows()
+
+    time.sleep(0.06)
+    assert budget.allows()
+    # The first call after the cooldown decides alone
+    budget.record(False)
+    assert not budget.allows()
+    time.sleep(0.06)
+    budget.record(True)
+    budget.record(False)
+    assert budget.allows()
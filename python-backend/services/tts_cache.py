@@ -0,0 +1,203 @@
+"""
+Content-addressed TTS Audio Cache
+Keeps synthesized MP3 bytes keyed by (normalized text, language, speed) in a
+byte-size-bounded LRU, with an optional on-disk tier shared across restarts
+"""
+
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+class TTSAudioCache:
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: Optional[int] = None
+    ):
+        """Initialize the cache; the disk tier is disabled unless a directory is given"""
+        self.max_bytes = max_bytes if max_bytes is not None else settings.TTS_CACHE_MAX_BYTES
+        self.disk_dir = disk_dir if disk_dir is not None else settings.TTS_CACHE_DIR
+        self.disk_max_bytes = disk_max_bytes if disk_max_bytes is not None else settings.TTS_CACHE_DISK_MAX_BYTES
+
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self.current_bytes = 0
+
+        # Disk tier: key -> file size, least recently used first
+        self._disk_entries: "OrderedDict[str, int]" = OrderedDict()
+        self.disk_bytes = 0
+
+        self.stats: Dict[str, int] = {
+            'hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+            'disk_evictions': 0
+        }
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._scan_disk()
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Normalize text so trivially different spellings share a cache entry"""
+        text = unicodedata.normalize('NFC', text)
+        return re.sub(r'\s+', ' ', text).strip()
+
+    @classmethod
+    def make_key(cls, text: str, language: str, speed: float = 1.0) -> str:
+        """Build the content address for a piece of synthesized speech"""
+        material = f"{language}|{speed:.2f}|{cls.normalize_text(text)}"
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Look up audio in memory, then on disk; returns None on a miss"""
+        audio = self._entries.get(key)
+        if audio is not None:
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return audio
+
+        audio = self._read_disk(key)
+        if audio is not None:
+            self.stats['disk_hits'] += 1
+            self._store_memory(key, audio)
+            return audio
+
+        self.stats['misses'] += 1
+        return None
+
+    def put(self, key: str, audio: bytes):
+        """Store synthesized audio in memory and, if enabled, on disk"""
+        if not audio:
+            return
+        self.stats['stores'] += 1
+        self._store_memory(key, audio)
+        self._write_disk(key, audio)
+
+    def _store_memory(self, key: str, audio: bytes):
+        if len(audio) > self.max_bytes:
+            return
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.current_bytes -= len(previous)
+
+        self._entries[key] = audio
+        self.current_bytes += len(audio)
+
+        # Evict least recently used entries until we are back under budget
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= len(evicted)
+            self.stats['evictions'] += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.mp3")
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as audio_file:
+                audio = audio_file.read() or None
+        except FileNotFoundError:
+            # Evicted, possibly by another worker sharing the directory
+            self._forget_disk(key)
+            return None
+        except OSError as e:
+            logger.warning(f"🎵 TTS disk cache read failed: {e}")
+            return None
+
+        # Recency lives in the file's mtime so it survives restarts
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        if key in self._disk_entries:
+            self._disk_entries.move_to_end(key)
+        elif audio:
+            self._track_disk(key, len(audio))
+        return audio
+
+    def _write_disk(self, key: str, audio: bytes):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so concurrent readers never see a partial file
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as audio_file:
+                audio_file.write(audio)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"🎵 TTS disk cache write failed: {e}")
+            return
+        self._forget_disk(key)
+        self._track_disk(key, len(audio))
+
+    def _scan_disk(self):
+        """Index files left by earlier runs, least recently used first"""
+        found = []
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                if not name.endswith('.mp3'):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                found.append((stat.st_mtime, name[:-len('.mp3')], stat.st_size))
+        for _, key, size in sorted(found):
+            self._track_disk(key, size)
+
+    def _track_disk(self, key: str, size: int):
+        """Record a file on disk and delete least recently used ones beyond the budget"""
+        self._disk_entries[key] = size
+        self.disk_bytes += size
+        while self.disk_bytes > self.disk_max_bytes and len(self._disk_entries) > 1:
+            evicted, evicted_size = self._disk_entries.popitem(last=False)
+            self.disk_bytes -= evicted_size
+            self.stats['disk_evictions'] += 1
+            try:
+                os.remove(self._disk_path(evicted))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"🎵 TTS disk cache eviction failed: {e}")
+
+    def _forget_disk(self, key: str):
+        size = self._disk_entries.pop(key, None)
+        if size is not None:
+            self.disk_bytes -= size
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache hit/miss counters and memory usage"""
+        lookups = self.stats['hits'] + self.stats['disk_hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'disk_enabled': bool(self.disk_dir),
+            'disk_entries': len(self._disk_entries),
+            'disk_bytes': self.disk_bytes,
+            'disk_max_bytes': self.disk_max_bytes,
+            'hit_rate': (self.stats['hits'] + self.stats['disk_hits']) / lookups if lookups else 0.0
+        }
+
+# Shared cache so every service instance reuses the same synthesized audio
+tts_cache = TTSAudioCache()
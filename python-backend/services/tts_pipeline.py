@@ -0,0 +1,196 @@
+"""
+Sentence-pipelined Text-to-Speech
+Splits AI replies into sentences as they stream in and synthesizes them concurrently,
+yielding audio chunks in order so playback can start before the full reply is ready
+"""
+
+import asyncio
+import logging
+import re
+from typing import Any, AsyncGenerator, AsyncIterable, Dict, List, Optional, Union
+
+from config import settings
+from .cancellation import CancellationToken, OperationCancelled
+
+logger = logging.getLogger(__name__)
+
+# Sentence terminators: Latin punctuation needs trailing whitespace so decimals
+# ("103.5") and partially streamed text are not split; Devanagari danda (। ॥),
+# Urdu full stop (۔), Arabic question mark (؟) and newlines always end a sentence
+SENTENCE_END_PATTERN = re.compile(r'[.!?]+["\')\]]*\s+|[।॥۔؟\n]+\s*')
+
+# Clause breaks used to split sentences that are too long for a single TTS call
+CLAUSE_BREAK_PATTERN = re.compile(r'[,;:،]\s+')
+
+# Abbreviations whose trailing period does not end a sentence
+ABBREVIATIONS = {'dr', 'mr', 'mrs', 'ms', 'st', 'vs', 'etc', 'e.g', 'i.e', 'no'}
+
+class SentenceSegmenter:
+    def __init__(self, min_chars: int = 12, max_chars: Optional[int] = None):
+        """Incrementally split streamed text into speakable sentences"""
+        self.min_chars = min_chars
+        self.max_chars = max_chars or settings.TTS_MAX_SENTENCE_CHARS
+        self._buffer = ""
+        self._carry = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Add streamed text and return any sentences that are now complete"""
+        self._buffer += text
+        sentences = []
+        start = 0
+
+        for match in SENTENCE_END_PATTERN.finditer(self._buffer):
+            candidate = self._buffer[start:match.end()]
+            if self._ends_with_abbreviation(self._buffer[start:match.start()]):
+                continue
+            sentences.extend(self._emit(candidate))
+            start = match.end()
+
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> List[str]:
+        """Return whatever text remains once the stream has ended"""
+        remainder = (self._carry + self._buffer).strip()
+        self._buffer = ""
+        self._carry = ""
+        return self._split_long(remainder) if remainder else []
+
+    def _emit(self, sentence: str) -> List[str]:
+        """Merge very short sentences into the next one to avoid tiny TTS calls"""
+        sentence = self._carry + sentence
+        if len(sentence.strip()) < self.min_chars:
+            self._carry = sentence
+            return []
+        self._carry = ""
+        return self._split_long(sentence.strip())
+
+    def _split_long(self, sentence: str) -> List[str]:
+        """Split an over-long sentence at clause breaks, then at word boundaries"""
+        if len(sentence) <= self.max_chars:
+            return [sentence]
+
+        parts = []
+        current = ""
+        start = 0
+        pieces = []
+        for match in CLAUSE_BREAK_PATTERN.finditer(sentence):
+            pieces.append(sentence[start:match.end()])
+            start = match.end()
+        pieces.append(sentence[start:])
+
+        for piece in pieces:
+            if current and len(current) + len(piece) > self.max_chars:
+                parts.append(current.strip())
+                current = ""
+            current += piece
+
+            while len(current) > self.max_chars:
+                cut = current.rfind(' ', 0, self.max_chars)
+                if cut <= 0:
+                    cut = self.max_chars
+                parts.append(current[:cut].strip())
+                current = current[cut:]
+
+        if current.strip():
+            parts.append(current.strip())
+        return parts
+
+    @staticmethod
+    def _ends_with_abbreviation(text: str) -> bool:
+        words = text.rstrip().split()
+        return bool(words) and words[-1].lower().rstrip('.') in ABBREVIATIONS
+
+
+def split_sentences(text: str, max_chars: Optional[int] = None) -> List[str]:
+    """Split a complete reply into speakable sentences"""
+    segmenter = SentenceSegmenter(max_chars=max_chars)
+    return segmenter.feed(text) + segmenter.flush()
+
+
+class SentenceTTSPipeline:
+    def __init__(self, voice_service, max_parallel: Optional[int] = None, sentence_timeout: Optional[float] = None):
+        """Initialize the pipeline on top of a VoiceAssistantService"""
+        self.voice_service = voice_service
+        self.max_parallel = max_parallel or settings.TTS_PIPELINE_PARALLELISM
+        self.sentence_timeout = sentence_timeout or settings.TTS_SENTENCE_TIMEOUT
+
+    async def stream(
+        self,
+        text_source: Union[str, AsyncIterable[str]],
+        language: str = "en",
+        token: Optional[CancellationToken] = None
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Synthesize sentences concurrently and yield their audio in reply order
+
+        text_source is either the complete reply or an async iterable of streamed
+        deltas; sentences are dispatched to TTS as soon as they are complete.
+        Yields {'index': n, 'text': sentence, 'audio': mp3_bytes_or_empty}.
+        If token fires, pending sentences are abandoned with OperationCancelled.
+        """
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        pending: asyncio.Queue = asyncio.Queue()
+        tasks: List[asyncio.Task] = []
+
+        async def synthesize(index: int, sentence: str) -> Dict[str, Any]:
+            async with semaphore:
+                audio = await self._synthesize(sentence, language, token)
+            return {'index': index, 'text': sentence, 'audio': audio}
+
+        def dispatch(index: int, sentence: str):
+            task = asyncio.create_task(synthesize(index, sentence))
+            tasks.append(task)
+            pending.put_nowait(task)
+
+        async def produce():
+            segmenter = SentenceSegmenter()
+            index = 0
+            try:
+                async for delta in self._iterate(text_source):
+                    for sentence in segmenter.feed(delta):
+                        dispatch(index, sentence)
+                        index += 1
+                for sentence in segmenter.flush():
+                    dispatch(index, sentence)
+                    index += 1
+            finally:
+                pending.put_nowait(None)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                task = await pending.get()
+                if task is None:
+                    break
+                yield await task
+            # Surface errors from the text source
+            await producer
+        finally:
+            producer.cancel()
+            for task in tasks:
+                task.cancel()
+
+    async def _synthesize(self, sentence: str, language: str, token: Optional[CancellationToken] = None) -> bytes:
+        """Synthesize one sentence, returning MP3 bytes or b"" so the text still goes out"""
+        try:
+            audio_bytes = await asyncio.wait_for(
+                self.voice_service.text_to_speech_bytes(sentence, language, token=token),
+                timeout=self.sentence_timeout
+            )
+            return audio_bytes or b""
+        except asyncio.TimeoutError:
+            logger.error(f"🎵 Sentence TTS timed out after {self.sentence_timeout}s: {sentence[:50]}...")
+            return b""
+        except OperationCancelled:
+            raise
+        except Exception as e:
+            logger.error(f"🎵 Sentence TTS failed: {e}")
+            return b""
+
+    @staticmethod
+    async def _iterate(text_source: Union[str, AsyncIterable[str]]) -> AsyncGenerator[str, None]:
+        if isinstance(text_source, str):
+            yield text_source
+            return
+        async for delta in text_source:
+            yield delta
@@ -0,0 +1,250 @@
+"""
+Voice Activity Detection
+Per-session, frame-accurate VAD: every chunk is sliced into 10/20/30 ms frames
+(zero-copy) and each frame is classified by WebRTC VAD when available and an
+adaptive energy detector kept in fixed-size NumPy ring buffers
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+try:
+    import webrtcvad
+    WEBRTC_AVAILABLE = True
+except ImportError:
+    WEBRTC_AVAILABLE = False
+    print("Warning: webrtcvad not available. Using simple energy-based VAD.")
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Frame durations accepted by WebRTC VAD
+VALID_FRAME_DURATIONS_MS = (10, 20, 30)
+
+class RingStatistic:
+    def __init__(self, size: int):
+        """Fixed-size ring of floats with an O(1) running mean"""
+        self.size = size
+        self._values = np.zeros(size, dtype=np.float64)
+        self._position = 0
+        self._count = 0
+        self._sum = 0.0
+
+    def push(self, value: float):
+        """Add a value, overwriting the oldest once the ring is full"""
+        self._sum += value - self._values[self._position]
+        self._values[self._position] = value
+        self._position = (self._position + 1) % self.size
+        if self._count < self.size:
+            self._count += 1
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self._count if self._count else 0.0
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class EnergyVADState:
+    def __init__(
+        self,
+        energy_window: int = 50,
+        smoothing_window: int = 5,
+        threshold_multiplier: float = 2.5,
+        default_threshold: float = 0.01,
+        min_history: int = 10,
+        speech_ratio: float = 0.6
+    ):
+        """Adaptive energy-based VAD state for a single session"""
+        self.energy_history = RingStatistic(energy_window)
+        self.speech_history = RingStatistic(smoothing_window)
+        self.threshold_multiplier = threshold_multiplier
+        self.default_threshold = default_threshold
+        self.min_history = min_history
+        self.speech_ratio = speech_ratio
+
+    @staticmethod
+    def rms_energy(audio: np.ndarray) -> float:
+        """RMS energy of a block of samples"""
+        if audio.size == 0:
+            return 0.0
+        samples = audio.astype(np.float32)
+        return float(np.sqrt(np.dot(samples, samples) / samples.size))
+
+    def update(self, energy: float) -> bool:
+        """Record a block's energy and return the smoothed speech decision"""
+        self.energy_history.push(energy)
+
+        # Adaptive threshold relative to this session's recent energy
+        if len(self.energy_history) > self.min_history:
+            threshold = self.energy_history.mean * self.threshold_multiplier
+        else:
+            threshold = self.default_threshold
+
+        self.speech_history.push(1.0 if energy > threshold else 0.0)
+
+        # Speech detected if a majority of recent blocks are speech
+        return self.speech_history.mean > self.speech_ratio
+
+
+class NoiseFloor:
+    def __init__(
+        self,
+        calibration_frames: int,
+        alpha: Optional[float] = None,
+        quiet_ratio: float = 2.0
+    ):
+        """Ambient noise level of one session, in RMS int16 units
+
+        Calibrated once from the leading calibration_frames of the session (the
+        caller rarely speaks in the first few hundred milliseconds; a low
+        percentile keeps an early syllable from inflating it), then tracked with
+        an exponential moving average over frames judged to be non-speech. The
+        average falls faster than it rises, so a floor calibrated on speech
+        recovers at the first pause. Frames quieter than quiet_ratio times the
+        floor count as non-speech when no VAD flags are given.
+        """
+        self.calibration_frames = max(1, calibration_frames)
+        self.alpha = settings.NOISE_FLOOR_ALPHA if alpha is None else alpha
+        self.fall_alpha = min(1.0, self.alpha * 5)
+        self.quiet_ratio = quiet_ratio
+        self.level: Optional[float] = None
+        self._leading: List[float] = []
+
+    @property
+    def calibrated(self) -> bool:
+        return self.level is not None
+
+    def observe(self, energies: np.ndarray, speech: Optional[np.ndarray] = None):
+        """Update the floor from per-frame energies (and optional per-frame speech flags)"""
+        if not self.calibrated:
+            needed = self.calibration_frames - len(self._leading)
+            self._leading.extend(float(energy) for energy in energies[:needed])
+            energies = energies[needed:]
+            speech = speech[needed:] if speech is not None else None
+            if len(self._leading) < self.calibration_frames:
+                return
+            self.level = float(np.percentile(self._leading, 20))
+            self._leading = []
+            logger.info(f"🔇 Noise floor calibrated at {self.level:.1f} RMS")
+
+        if speech is None:
+            quiet = energies[energies < max(self.level, 1.0) * self.quiet_ratio]
+        else:
+            quiet = energies[~speech]
+
+        for energy in quiet:
+            energy = float(energy)
+            self.level += (self.fall_alpha if energy < self.level else self.alpha) * (energy - self.level)
+
+    def snr_db(self, energies: np.ndarray) -> Optional[float]:
+        """How far the loud part of a block (90th percentile frame) is above the floor"""
+        if not self.calibrated or energies.size == 0:
+            return None
+        loud = float(np.percentile(energies, 90))
+        return float(20 * np.log10(max(loud, 1.0) / max(self.level, 1.0)))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Calibration state and current level"""
+        return {
+            'calibrated': self.calibrated,
+            'level': round(self.level, 2) if self.calibrated else None
+        }
+
+
+def frame_audio(pcm: Union[bytes, bytearray, memoryview], frame_bytes: int) -> List[memoryview]:
+    """Slice PCM into whole frames as zero-copy memoryviews (a trailing partial frame is dropped)"""
+    view = memoryview(pcm)
+    count = len(view) // frame_bytes
+    return [view[i * frame_bytes:(i + 1) * frame_bytes] for i in range(count)]
+
+
+def frame_energies(samples: np.ndarray, frame_samples: int) -> np.ndarray:
+    """RMS energy of every whole frame, computed in one vectorized pass"""
+    count = samples.size // frame_samples
+    if count == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = samples[:count * frame_samples].reshape(count, frame_samples).astype(np.float32)
+    return np.sqrt(np.einsum('ij,ij->i', frames, frames) / frame_samples)
+
+
+class FrameVAD:
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: Optional[int] = None,
+        aggressiveness: Optional[int] = None
+    ):
+        """Frame-level VAD for one session's 16-bit mono PCM stream"""
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms or settings.VAD_FRAME_MS
+        self.aggressiveness = settings.VAD_AGGRESSIVENESS if aggressiveness is None else aggressiveness
+
+        if self.frame_ms not in VALID_FRAME_DURATIONS_MS:
+            raise ValueError(f"VAD frame duration must be one of {VALID_FRAME_DURATIONS_MS} ms")
+        if not 0 <= self.aggressiveness <= 3:
+            raise ValueError("VAD aggressiveness must be between 0 and 3")
+
+        self.frame_samples = sample_rate * self.frame_ms // 1000
+        self.frame_bytes = self.frame_samples * 2  # 2 bytes per int16 sample
+
+        self.webrtc = webrtcvad.Vad(self.aggressiveness) if WEBRTC_AVAILABLE else None
+        self.energy_state = EnergyVADState()
+        self.noise_floor = NoiseFloor(settings.NOISE_CALIBRATION_MS // self.frame_ms)
+
+        # Bytes of a frame split across chunk boundaries
+        self._remainder = bytearray()
+
+    def process(self, pcm: Union[bytes, bytearray, memoryview]) -> np.ndarray:
+        """Classify every complete frame in a chunk; returns one speech flag per frame"""
+        view = memoryview(pcm).cast('B')
+        frames: List[Union[bytes, memoryview]] = []
+        energies = []
+
+        # Complete the frame left over from the previous chunk (the only copy made)
+        if self._remainder:
+            needed = self.frame_bytes - len(self._remainder)
+            self._remainder.extend(view[:needed])
+            view = view[needed:]
+            if len(self._remainder) < self.frame_bytes:
+                return np.zeros(0, dtype=bool)
+            carried = bytes(self._remainder)
+            self._remainder.clear()
+            frames.append(carried)
+            energies.append(frame_energies(np.frombuffer(carried, dtype=np.int16), self.frame_samples))
+
+        whole = len(view) - len(view) % self.frame_bytes
+        if whole < len(view):
+            self._remainder.extend(view[whole:])
+
+        frames.extend(frame_audio(view[:whole], self.frame_bytes))
+        energies.append(frame_energies(np.frombuffer(view[:whole], dtype=np.int16), self.frame_samples))
+
+        if not frames:
+            return np.zeros(0, dtype=bool)
+
+        energies = np.concatenate(energies)
+        flags = np.fromiter(
+            (self.energy_state.update(float(energy)) for energy in energies),
+            dtype=bool,
+            count=len(frames)
+        )
+
+        if self.webrtc:
+            try:
+                webrtc_flags = np.fromiter(
+                    (self.webrtc.is_speech(frame, self.sample_rate) for frame in frames),
+                    dtype=bool,
+                    count=len(frames)
+                )
+                # Combine WebRTC result with energy-based result
+                flags |= webrtc_flags
+            except Exception as e:
+                logger.warning(f"WebRTC VAD error, falling back to energy-based: {e}")
+
+        self.noise_floor.observe(energies, flags)
+        return flags
@@ -0,0 +1,119 @@
+"""
+VAD checks
+Every whole frame of a chunk gets one flag, frames split across chunks are stitched, and the noise floor follows the quiet frames
+"""
+
+import numpy as np
+import pytest
+
+from services.vad import EnergyVADState, FrameVAD, NoiseFloor, RingStatistic, frame_audio, frame_energies
+
+FRAME_SAMPLES = 160   # 10 ms at 16 kHz
+
+def _vad() -> FrameVAD:
+    vad = FrameVAD(frame_ms=10)
+    vad.webrtc = None   # energy decisions only, so results don't depend on webrtcvad being installed
+    return vad
+
+
+def _pcm(amplitudes: list) -> bytes:
+    # One 10 ms frame of a 440 Hz tone per amplitude (0 gives silence)
+    t = np.arange(FRAME_SAMPLES) / 16000
+    tone = np.sin(2 * np.pi * 440 * t)
+    return np.concatenate([(tone * a).astype(np.int16) for a in amplitudes]).tobytes()
+
+
+def test_ring_statistic_mean_covers_only_the_last_values():
+    ring = RingStatistic(3)
+    assert ring.mean == 0.0
+    for value in (1.0, 2.0, 3.0, 10.0):
+        ring.push(value)
+    assert len(ring) == 3
+    assert ring.mean == pytest.approx(5.0)
+
+
+def test_frame_energies_match_per_frame_rms():
+    samples = np.frombuffer(_pcm([0, 1000, 8000]) + b"\x01\x00", dtype=np.int16)
+    energies = frame_energies(samples, FRAME_SAMPLES)
+
+    assert energies.shape == (3,)
+    for i, energy in enumerate(energies):
+        frame = samples[i * FRAME_SAMPLES:(i + 1) * FRAME_SAMPLES]
+        assert energy == pytest.approx(EnergyVADState.rms_energy(frame), rel=1e-5)
+    assert frame_energies(samples[:10], FRAME_SAMPLES).size == 0
+
+
+def test_frame_audio_is_zero_copy_and_drops_the_partial_frame():
+    pcm = bytearray(_pcm([1000, 2000]) + b"\x00" * 5)
+    frames = frame_audio(pcm, FRAME_SAMPLES * 2)
+
+    assert len(frames) == 2
+    pcm[0] ^= 0xff
+    assert frames[0][0] == pcm[0]
+
+
+def test_one_flag_per_frame():
+    vad = _vad()
+    flags = vad.process(_pcm([0] * 20 + [8000] * 10))
+
+    assert flags.dtype == bool
+    assert len(flags) == 30
+    assert not flags[:20].any()
+    assert flags[-5:].all()
+
+
+def test_frames_split_across_chunks_are_stitched():
+    pcm = _pcm([0] * 10 + [8000] * 10)
+    whole = _vad().process(pcm)
+
+    vad = _vad()
+    cuts = [0, 7, 331, 333, 1500, 2900, len(pcm)]
+    pieces = [vad.process(pcm[start:end]) for start, end in zip(cuts, cuts[1:])]
+
+    assert sum(len(piece) for piece in pieces) == len(whole)
+    assert np.array_equal(np.concatenate(pieces), whole)
+
+
+@pytest.mark.parametrize("kwargs", [{"frame_ms": 25}, {"aggressiveness": 4}, {"aggressiveness": -1}])
+def test_invalid_settings_are_refused(kwargs):
+    with pytest.raises(ValueError):
+        FrameVAD(**kwargs)
+
+
+def test_noise_floor_calibrates_from_the_leading_frames():
+    floor = NoiseFloor(calibration_frames=5, alpha=0.1)
+    floor.observe(np.array([100.0, 100.0]))
+    assert not floor.calibrated
+    assert floor.snr_db(np.array([1000.0])) is None
+
+    # An early syllable in the calibration window doesn't inflate the floor
+    floor.observe(np.array([100.0, 5000.0, 100.0]))
+    assert floor.level == pytest.approx(100.0)
+    assert floor.snr_db(np.array([1000.0])) == pytest.approx(20.0)
+
+
+def test_noise_floor_tracks_only_non_speech_frames():
+    floor = NoiseFloor(calibration_frames=1, alpha=0.1)
+    floor.observe(np.array([100.0]))
+
+    floor.observe(np.array([5000.0, 5000.0]), np.array([True, True]))
+    assert floor.level == pytest.approx(100.0)
+    floor.observe(np.array([5000.0]))   # no flags: too loud to count as quiet
+    assert floor.level == pytest.approx(100.0)
+
+    floor.observe(np.array([150.0]))
+    assert floor.level == pytest.approx(105.0)
+
+
+def test_noise_floor_falls_faster_than_it_rises():
+    floor = NoiseFloor(calibration_frames=1, alpha=0.1)
+    floor.observe(np.array([1000.0]))
+    floor.observe(np.array([0.0]), np.array([False]))
+    assert floor.level == pytest.approx(500.0)
+
+
+def test_frame_vad_feeds_its_noise_floor():
+    vad = _vad()
+    vad.process(_pcm([50] * vad.noise_floor.calibration_frames))
+    assert vad.noise_floor.calibrated
+    assert vad.noise_floor.level == pytest.approx(50 / np.sqrt(2), rel=0.05)
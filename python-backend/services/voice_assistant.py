@@ -2,15 +2,18 @@
 Voice Assistant Service - Core business logic for the voice assistant
 """
 
+import io
 import os
 import tempfile
 import asyncio
 from datetime import datetime
 import uuid
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, AsyncGenerator, Union
 import json
 import logging
 
+import numpy as np
+
 # Try to import speech recognition - make it optional
 try:
     import speech_recognition as sr
@@ -22,7 +25,15 @@ except ImportError:
 from gtts import gTTS
 import google.generativeai as genai
 
-from .hospital_data import INDIAN_HOSPITALS, EMERGENCY_CONDITIONS
+from .hospital_data import EMERGENCY_CONDITIONS
+from .geo_index import to_hospital_info
+from .hospital_store import hospital_store
+from config import settings
+from .llm_client import llm_client
+from .stt_client import stt_client, AsyncSTTStream
+from .tts_cache import tts_cache
+from .cancellation import CancellationToken, OperationCancelled, guarded
+from .audio_decoder import audio_decoder, DecoderError
 from models.schemas import (
     ChatResponse, 
     HospitalSearchResponse, 
@@ -78,6 +89,17 @@ class VoiceAssistantService:
             'ur': {'stt': 'ur-IN', 'tts': 'ur', 'name': 'Urdu'}
         }
         
+        # Greeting messages per language
+        self.greetings = {
+            'en': "Hello, I am your personal health assistant. How are you feeling today?",
+            'hi': "नमस्ते, मैं आपका व्यक्तिगत स्वास्थ्य सहायक हूँ। आप आज कैसा महसूस कर रहे हैं?",
+            'gu': "નમસ્તે, હું તમારો અંગત આરોગ્ય સહાયક છું. આજે તમને કેવું લાગે છે?",
+            'mr': "नमस्कार, मी तुमचा वैयक्तिक आरोग्य सहाय्यक आहे. तुम्हाला आज कसे वाटत आहे?",
+            'bn': "নমস্কার, আমি আপনার ব্যক্তিগত স্বাস্থ্য সহায়ক। আপনি আজ কেমন অনুভব করছেন?",
+            'ml': "നമസ്കാരം, ഞാൻ നിങ്ങളുടെ സ്വകാര്യ ആരോഗ്യ സഹായിയാണ്. നിങ്ങൾക്ക് ഇന്ന് എന്തു തോന്നുന്നു?",
+            'ur': "ہیلو، میں آپ کا ذاتی ہیلتھ اسسٹنٹ ہوں۔ آج آپ کیسی طبیعت ہے؟"
+        }
+        
         # Initialize speech recognition only if available
         if SPEECH_RECOGNITION_AVAILABLE:
             self.recognizer = sr.Recognizer()
@@ -93,16 +115,18 @@ class VoiceAssistantService:
             system_instruction=self.system_prompt
         )
 
-    async def start_session(self, language: str = "en") -> str:
+    async def start_session(self, language: str = "en", session_id: Optional[str] = None) -> str:
         """Start a new conversation session"""
-        session_id = str(uuid.uuid4())
+        session_id = session_id or str(uuid.uuid4())
         
         self.sessions[session_id] = {
             'language': language,
             'created_at': datetime.now(),
             'last_activity': datetime.now(),
             'message_count': 0,
-            'chat_history': self.model.start_chat(history=[])
+            'chat_history': self.model.start_chat(history=[]),
+            # Serializes turns so concurrent requests can't interleave chat history
+            'chat_lock': asyncio.Lock()
         }
         
         return session_id
@@ -124,24 +148,19 @@ class VoiceAssistantService:
 
     async def get_greeting(self, language: str) -> str:
         """Get greeting message in specified language"""
-        greetings = {
-            'en': "Hello, I am your personal health assistant. How are you feeling today?",
-            'hi': "नमस्ते, मैं आपका व्यक्तिगत स्वास्थ्य सहायक हूँ। आप आज कैसा महसूस कर रहे हैं?",
-            'gu': "નમસ્તે, હું તમારો અંગત આરોગ્ય સહાયક છું. આજે તમને કેવું લાગે છે?",
-            'mr': "नमस्कार, मी तुमचा वैयक्तिक आरोग्य सहाय्यक आहे. तुम्हाला आज कसे वाटत आहे?",
-            'bn': "নমস্কার, আমি আপনার ব্যক্তিগত স্বাস্থ্য সহায়ক। আপনি আজ কেমন অনুভব করছেন?",
-            'ml': "നമസ്കാരം, ഞാൻ നിങ്ങളുടെ സ്വകാര്യ ആരോഗ്യ സഹായിയാണ്. നിങ്ങൾക്ക് ഇന്ന് എന്തു തോന്നുന്നു?",
-            'ur': "ہیلو، میں آپ کا ذاتی ہیلتھ اسسٹنٹ ہوں۔ آج آپ کیسی طبیعت ہے؟"
-        }
-        return greetings.get(language, greetings['en'])
+        return self.greetings.get(language, self.greetings['en'])
 
     async def process_text_message(
         self, 
         message: str, 
         language: str = "en", 
-        session_id: Optional[str] = None
+        session_id: Optional[str] = None,
+        token: Optional[CancellationToken] = None
     ) -> ChatResponse:
-        """Process text message and return response"""
+        """Process text message and return response
+        
+        If token fires, the call is abandoned with OperationCancelled.
+        """
         
         # Get or create session
         session, session_id = await self.get_session(session_id)
@@ -156,43 +175,157 @@ class VoiceAssistantService:
             is_emergency = self._check_emergency_keywords(message.lower())
             
             # Create enhanced prompt
-            lang_name = self.language_configs.get(language, {}).get('name', 'English')
-            enhanced_prompt = f"""
-            Your response must be in {lang_name}. The user said: {message}
+            enhanced_prompt = self._build_prompt(message, language)
             
-            Current conversation context: The user is describing health symptoms and you need to assess the appropriate level of care needed.
-            """
+            # Get AI response without blocking the event loop
+            async with session['chat_lock']:
+                response = await guarded(llm_client.send_message(chat, enhanced_prompt), token)
             
-            # Get AI response
-            response = chat.send_message(enhanced_prompt)
-            ai_response = response.text
-            
-            # Determine emergency level and hospital requirement
-            emergency_level = self._assess_emergency_level(message, ai_response)
-            requires_hospital = self._check_hospital_requirement(ai_response)
-            
-            return ChatResponse(
-                response=ai_response,
-                language=language,
-                session_id=session_id,
-                timestamp=datetime.now(),
-                requires_hospital=requires_hospital,
-                emergency_level=emergency_level
-            )
+            return self._build_chat_response(message, response.text, language, session_id)
             
+        except (asyncio.TimeoutError, OperationCancelled):
+            raise
         except Exception as e:
             raise Exception(f"Error processing message: {str(e)}")
 
+    async def stream_text_message(
+        self, 
+        message: str, 
+        language: str = "en", 
+        session_id: Optional[str] = None,
+        token: Optional[CancellationToken] = None
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Process text message, yielding partial response text as it arrives
+        
+        Yields {'type': 'delta', 'text': ...} for each chunk of the reply, then a
+        single {'type': 'final', 'response': ChatResponse} once it is complete.
+        If token fires, the stream is abandoned with OperationCancelled.
+        """
+        
+        # Get or create session
+        session, session_id = await self.get_session(session_id)
+        chat = session['chat_history']
+        
+        # Update session
+        session['message_count'] += 1
+        session['language'] = language
+        
+        enhanced_prompt = self._build_prompt(message, language)
+        parts = []
+        
+        try:
+            async with session['chat_lock']:
+                deltas = llm_client.stream_message(chat, enhanced_prompt)
+                if token:
+                    deltas = token.iterate(deltas)
+                try:
+                    async for delta in deltas:
+                        parts.append(delta)
+                        yield {'type': 'delta', 'text': delta}
+                finally:
+                    # An abandoned stream rewinds the chat when closed, which has to
+                    # happen before the next turn can take the lock
+                    await deltas.aclose()
+        except (asyncio.TimeoutError, OperationCancelled):
+            raise
+        except Exception as e:
+            raise Exception(f"Error processing message: {str(e)}")
+        
+        yield {
+            'type': 'final',
+            'response': self._build_chat_response(message, "".join(parts), language, session_id)
+        }
+
+    async def draft_text_message(
+        self,
+        message: str,
+        language: str = "en",
+        session_id: Optional[str] = None,
+        token: Optional[CancellationToken] = None
+    ) -> Dict[str, Any]:
+        """Answer a message on a throwaway copy of the session's chat
+        
+        Used to start a reply before the user has finished speaking: the session's
+        own history is left untouched until the draft is passed to adopt_draft.
+        Returns {'response': ChatResponse, 'chat': ..., 'base_turns': ...}.
+        """
+        
+        session, session_id = await self.get_session(session_id)
+        # Read under the lock so a turn streaming into the chat is never seen half done
+        async with session['chat_lock']:
+            history = list(session['chat_history'].history)
+        chat = self.model.start_chat(history=history)
+        
+        response = await guarded(
+            llm_client.send_message(chat, self._build_prompt(message, language)),
+            token
+        )
+        return {
+            'response': self._build_chat_response(message, response.text, language, session_id),
+            'chat': chat,
+            'base_turns': len(history)
+        }
+
+    async def adopt_draft(self, session_id: str, draft: Dict[str, Any]) -> bool:
+        """Make a drafted turn part of the session's history
+        
+        Refused (False) if the conversation moved on since the draft was started.
+        """
+        
+        if session_id not in self.sessions:
+            return False
+        session = self.sessions[session_id]
+        
+        async with session['chat_lock']:
+            if len(session['chat_history'].history) != draft['base_turns']:
+                return False
+            session['chat_history'].history = draft['chat'].history
+        
+        session['message_count'] += 1
+        session['last_activity'] = datetime.now()
+        return True
+
+    def _build_prompt(self, message: str, language: str) -> str:
+        """Build the language-pinned prompt sent to the AI for a user message"""
+        lang_name = self.language_configs.get(language, {}).get('name', 'English')
+        return f"""
+            Your response must be in {lang_name}. The user said: {message}
+            
+            Current conversation context: The user is describing health symptoms and you need to assess the appropriate level of care needed.
+            """
+
+    def _build_chat_response(
+        self, 
+        message: str, 
+        ai_response: str, 
+        language: str, 
+        session_id: str
+    ) -> ChatResponse:
+        """Assess the AI reply and wrap it in a ChatResponse"""
+        # Determine emergency level and hospital requirement
+        emergency_level = self._assess_emergency_level(message, ai_response)
+        requires_hospital = self._check_hospital_requirement(ai_response)
+        
+        return ChatResponse(
+            response=ai_response,
+            language=language,
+            session_id=session_id,
+            timestamp=datetime.now(),
+            requires_hospital=requires_hospital,
+            emergency_level=emergency_level
+        )
+
     async def process_voice_message(
         self, 
-        audio_path: str, 
+        audio_data: bytes, 
         language: str = "en", 
-        session_id: Optional[str] = None
+        session_id: Optional[str] = None,
+        audio_format: Optional[str] = None
     ) -> ChatResponse:
         """Process voice message and return response with audio"""
         
         # Transcribe audio to text
-        transcription = await self.speech_to_text(audio_path, language)
+        transcription = await self.transcribe_audio(audio_data, language, audio_format)
         
         if not transcription:
             raise Exception("Could not transcribe audio")
@@ -207,138 +340,174 @@ class VoiceAssistantService:
         return text_response
 
     async def speech_to_text(self, audio_path: str, language: str = "en") -> str:
-        """Convert speech to text with multiple fallback methods"""
+        """Convert a WAV/AIFF/FLAC file to text
+        
+        Callers that already hold the audio in memory should use transcribe_audio
+        or transcribe_pcm instead.
+        """
         if not SPEECH_RECOGNITION_AVAILABLE or not self.recognizer:
             raise Exception("Speech recognition not available. Please install speechrecognition and pyaudio packages.")
         
         try:
-            lang_config = self.language_configs.get(language, self.language_configs['en'])
-            stt_lang = lang_config['stt']
-            
-            # For WebM files, try to handle them as audio files
-            try:
-                with sr.AudioFile(audio_path) as source:
-                    # Adjust for ambient noise
-                    self.recognizer.adjust_for_ambient_noise(source, duration=0.1)
-                    audio = self.recognizer.record(source)
-                
-                # Try multiple recognition services in order of preference
-                recognition_methods = [
-                    # Method 1: Try Google Web Speech API (free, no auth required)
-                    lambda: self.recognizer.recognize_google(audio, language=stt_lang, show_all=False),
-                    # Method 2: Try Sphinx (offline, lower quality but no internet required)
-                    lambda: self.recognizer.recognize_sphinx(audio) if hasattr(self.recognizer, 'recognize_sphinx') else None,
-                ]
-                
-                for i, method in enumerate(recognition_methods):
-                    try:
-                        logger.info(f"🎤 Trying speech recognition method {i+1}...")
-                        text = method()
-                        if text and text.strip():
-                            logger.info(f"✅ Successfully transcribed with method {i+1}: {text}")
-                            return text.strip()
-                        else:
-                            logger.warning(f"⚠️ Method {i+1} returned empty result")
-                    except sr.RequestError as e:
-                        logger.warning(f"⚠️ Method {i+1} failed with request error: {str(e)}")
-                        if "Service Unavailable" in str(e) and i == 0:
-                            logger.info("🔄 Google Speech API unavailable, trying alternative methods...")
-                        continue
-                    except Exception as e:
-                        logger.warning(f"⚠️ Method {i+1} failed with error: {str(e)}")
-                        continue
-                
-                # If all methods failed, return empty string
-                logger.warning("❌ All speech recognition methods failed")
-                return ""
-                
-            except Exception as audio_error:
-                logger.warning(f"Standard audio file processing failed: {audio_error}")
-                # If that fails, maybe the file format is not supported
-                return ""
-            
-        except sr.UnknownValueError:
-            logger.warning("Could not understand audio - speech was unclear or silent")
+            with sr.AudioFile(audio_path) as source:
+                # No adjust_for_ambient_noise: it swallows the first 100 ms and only sets
+                # the energy threshold used by listen(), never by the recognizers
+                audio = self.recognizer.record(source)
+        except Exception as audio_error:
+            logger.warning(f"Standard audio file processing failed: {audio_error}")
+            # If that fails, maybe the file format is not supported
             return ""
-        except Exception as e:
-            logger.error(f"Unexpected speech recognition error: {str(e)}")
+        
+        return await self.transcribe_pcm(audio.get_raw_data(convert_rate=16000, convert_width=2), language)
+
+    async def transcribe_audio(self, audio_data: bytes, language: str = "en", audio_format: Optional[str] = None) -> str:
+        """Convert an uploaded recording (any format the audio decoder handles) to text"""
+        try:
+            pcm = await audio_decoder.decode(audio_data, audio_format)
+        except DecoderError as e:
+            logger.warning(f"Could not decode audio: {e}")
             return ""
+        
+        return await self.transcribe_pcm(pcm, language)
 
-    async def text_to_speech(self, text: str, language: str = "en") -> Optional[str]:
-        """Convert text to speech and return file path, or None if failed"""
+    async def transcribe_pcm(
+        self, 
+        pcm: Union[bytes, bytearray, memoryview, np.ndarray], 
+        language: str = "en", 
+        sample_rate: int = 16000
+    ) -> str:
+        """Convert mono PCM held in memory to text
+        
+        pcm is 16-bit little-endian bytes or a NumPy array (int16, or float in
+        [-1, 1]); it goes to the STT backends routed to the language without a file.
+        """
+        if isinstance(pcm, np.ndarray):
+            if pcm.dtype.kind == 'f':
+                pcm = np.clip(pcm, -1.0, 1.0) * 32767
+            pcm = pcm.astype('<i2', copy=False).tobytes()
+        
+        if not pcm:
+            return ""
+        
+        lang_config = self.language_configs.get(language, self.language_configs['en'])
+        return await stt_client.recognize(pcm, lang_config['stt'], sample_rate)
+
+    async def open_transcript_stream(self, language: str = "en") -> Optional[AsyncSTTStream]:
+        """Incremental recognition for a language, or None without a streaming STT backend"""
+        lang_config = self.language_configs.get(language, self.language_configs['en'])
+        return await stt_client.open_stream(lang_config['stt'])
+
+    async def text_to_speech(self, text: str, language: str = "en", speed: float = 1.0) -> Optional[str]:
+        """Convert text to speech and return file path, or None if failed
+        
+        Only used where a file is actually needed (e.g. /tts/generate); the real-time
+        paths use text_to_speech_bytes and never touch disk.
+        """
+        audio_bytes = await self.text_to_speech_bytes(text, language, speed)
+        if not audio_bytes:
+            return None
+        
         try:
-            lang_config = self.language_configs.get(language, self.language_configs['en'])
-            tts_lang = lang_config['tts']
-            
             # Generate unique filename
             filename = f"response_{uuid.uuid4().hex[:8]}.mp3"
             filepath = os.path.join(tempfile.gettempdir(), filename)
+            with open(filepath, 'wb') as f:
+                f.write(audio_bytes)
+            return filepath
+        except Exception as e:
+            logger.error(f"🎵 Failed to write TTS file: {str(e)}")
+            return None
+
+    async def text_to_speech_bytes(
+        self, 
+        text: str, 
+        language: str = "en", 
+        speed: float = 1.0,
+        token: Optional[CancellationToken] = None
+    ) -> Optional[bytes]:
+        """Convert text to speech and return MP3 bytes, or None if failed
+        
+        If token fires, retries stop and OperationCancelled is raised.
+        """
+        try:
+            lang_config = self.language_configs.get(language, self.language_configs['en'])
+            tts_lang = lang_config['tts']
+            
+            # Serve identical text from the cache instead of re-synthesizing it
+            cache_key = tts_cache.make_key(text, tts_lang, speed)
+            cached_audio = tts_cache.get(cache_key)
+            if cached_audio:
+                logger.info(f"🎵 TTS cache hit for text: {text[:50]}... ({len(cached_audio)} bytes)")
+                return cached_audio
             
             logger.info(f"🎵 Creating TTS for text: {text[:50]}... in language: {tts_lang}")
             
             # Create TTS with improved retry mechanism and timeout
             max_retries = 3
             for attempt in range(max_retries):
+                if token:
+                    token.raise_if_cancelled()
                 try:
                     # Create TTS with timeout
-                    tts_task = asyncio.create_task(self._create_tts_with_timeout(text, tts_lang, filepath))
-                    await asyncio.wait_for(tts_task, timeout=10.0)  # 10 second timeout per attempt
+                    tts_task = asyncio.create_task(self._create_tts_with_timeout(text, tts_lang, slow=speed < 1.0))
+                    audio_bytes = await guarded(asyncio.wait_for(tts_task, timeout=10.0), token)  # 10 second timeout per attempt
                     
-                    # Verify file was created and has content
-                    if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
-                        logger.info(f"🎵 TTS file created successfully: {filepath} ({os.path.getsize(filepath)} bytes)")
-                        return filepath
+                    # Verify audio was produced
+                    if audio_bytes:
+                        logger.info(f"🎵 TTS audio created successfully ({len(audio_bytes)} bytes)")
+                        tts_cache.put(cache_key, audio_bytes)
+                        return audio_bytes
                     else:
-                        raise Exception("TTS file was not created or is empty")
+                        raise Exception("TTS produced no audio")
                         
                 except asyncio.TimeoutError:
                     logger.warning(f"🎵 TTS attempt {attempt + 1} timed out after 10 seconds")
-                    if os.path.exists(filepath):
-                        try:
-                            os.remove(filepath)
-                        except:
-                            pass
+                except OperationCancelled:
+                    raise
                 except Exception as retry_error:
                     logger.warning(f"🎵 TTS attempt {attempt + 1} failed: {retry_error}")
-                    if os.path.exists(filepath):
-                        try:
-                            os.remove(filepath)
-                        except:
-                            pass
                 
                 # Wait before retry (exponential backoff)
                 if attempt < max_retries - 1:
                     wait_time = 1 + (attempt * 2)  # 1s, 3s, 5s
                     logger.info(f"🎵 Waiting {wait_time}s before retry...")
-                    await asyncio.sleep(wait_time)
+                    if token:
+                        await token.sleep(wait_time)
+                    else:
+                        await asyncio.sleep(wait_time)
             
             logger.error(f"🎵 All TTS attempts failed after {max_retries} retries")
             return None
             
+        except OperationCancelled:
+            raise
         except Exception as e:
             logger.error(f"🎵 Unexpected TTS error: {str(e)}")
             return None
 
-    async def _create_tts_with_timeout(self, text: str, tts_lang: str, filepath: str):
-        """Create TTS file with proper async handling"""
+    async def _create_tts_with_timeout(self, text: str, tts_lang: str, slow: bool = False) -> bytes:
+        """Create TTS audio in memory with proper async handling"""
         def _sync_tts_creation():
-            tts = gTTS(text=text, lang=tts_lang, slow=False)
-            tts.save(filepath)
+            buffer = io.BytesIO()
+            tts = gTTS(text=text, lang=tts_lang, slow=slow)
+            tts.write_to_fp(buffer)
+            return buffer.getvalue()
         
         # Run TTS creation in thread pool to avoid blocking
         loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, _sync_tts_creation)
+        return await loop.run_in_executor(None, _sync_tts_creation)
 
     async def search_hospitals(
         self, 
         city: str, 
         emergency_required: bool = False, 
-        max_results: int = 3
+        max_results: int = 3,
+        specialty: Optional[str] = None
     ) -> HospitalSearchResponse:
         """Search for hospitals in a given city"""
         
         try:
-            hospitals, error_msg = self._find_nearest_hospitals(city, emergency_required, max_results)
+            hospitals, error_msg = self._find_nearest_hospitals(city, emergency_required, max_results, specialty)
             
             if error_msg:
                 return HospitalSearchResponse(
@@ -349,19 +518,7 @@ class VoiceAssistantService:
                 )
             
             # Convert to HospitalInfo objects
-            hospital_infos = []
-            for hospital in hospitals:
-                hospital_info = HospitalInfo(
-                    name=hospital['name'],
-                    address=hospital['address'],
-                    phone=hospital['phone'],
-                    emergency_phone=hospital.get('emergency_phone'),
-                    specialties=hospital.get('specialties', []),
-                    emergency_services=hospital.get('emergency_services', False),
-                    latitude=hospital.get('latitude'),
-                    longitude=hospital.get('longitude')
-                )
-                hospital_infos.append(hospital_info)
+            hospital_infos = [to_hospital_info(hospital) for hospital in hospitals]
             
             return HospitalSearchResponse(
                 hospitals=hospital_infos,
@@ -377,42 +534,60 @@ class VoiceAssistantService:
                 error_message=str(e)
             )
 
-    def _find_nearest_hospitals(self, city: str, emergency_required: bool = False, max_results: int = 3):
-        """Find nearest hospitals in a given city - copied from original code"""
-        city_lower = city.lower().strip()
+    async def search_nearby_hospitals(
+        self, 
+        latitude: float, 
+        longitude: float, 
+        radius_km: Optional[float] = None, 
+        emergency_required: bool = False, 
+        max_results: int = 5
+    ) -> HospitalSearchResponse:
+        """Search for the hospitals closest to a point, nearest first with distance in km
         
-        # Try to match city name
-        matched_city = None
-        for city_key in INDIAN_HOSPITALS.keys():
-            if city_lower in city_key or city_key in city_lower:
-                matched_city = city_key
-                break
+        city is that of the nearest result.
+        """
         
-        if not matched_city:
-            # Try partial matching for major cities including areas
-            city_mappings = {
-                'mumbai': ['bombay', 'mumbai', 'bandra', 'andheri', 'mahim', 'worli', 'colaba', 'powai'],
-                'delhi': ['new delhi', 'delhi', 'ncr', 'gurgaon', 'noida'],
-                'bangalore': ['bengaluru', 'bangalore', 'whitefield', 'koramangala'],
-                'chennai': ['madras', 'chennai', 'anna nagar', 'velachery'],
-                'kolkata': ['calcutta', 'kolkata', 'salt lake'],
-                'hyderabad': ['hyderabad', 'secunderabad', 'hitech city'],
-                'pune': ['pune', 'poona', 'baner', 'hinjewadi'],
-                'ahmedabad': ['ahmedabad', 'amdavad', 'sg highway']
-            }
-            
-            for city_key, variations in city_mappings.items():
-                if any(variation in city_lower for variation in variations):
-                    matched_city = city_key
-                    break
+        radius_km = radius_km or settings.HOSPITAL_SEARCH_RADIUS_KM
+        try:
+            found = hospital_store.snapshot.geo_index.nearest(latitude, longitude, radius_km, max_results, emergency_required)
+        except Exception as e:
+            return HospitalSearchResponse(hospitals=[], city="", total_found=0, error_message=str(e))
+        
+        if not found:
+            return HospitalSearchResponse(
+                hospitals=[],
+                city="",
+                total_found=0,
+                error_message=f"Sorry, I don't know of any hospitals within {radius_km:g} km of that location."
+            )
+        
+        return HospitalSearchResponse(
+            hospitals=[to_hospital_info(hospital, distance) for distance, hospital in found],
+            city=found[0][1]['city'],
+            total_found=len(found)
+        )
+
+    def _find_nearest_hospitals(
+        self, 
+        city: str, 
+        emergency_required: bool = False, 
+        max_results: int = 3, 
+        specialty: Optional[str] = None
+    ):
+        """Find hospitals in the city named anywhere in a free-text location"""
+        # One snapshot for the whole lookup, so a reload can't mix resolver and records
+        snapshot = hospital_store.snapshot
+        
+        # City names, localities, native-script names and pincodes in one pass
+        matched_city = snapshot.location_resolver.resolve(city)
         
         if not matched_city:
             return None, f"Sorry, I don't have hospital data for {city}. Please try a major city like Mumbai, Delhi, Bangalore, Chennai, Kolkata, Hyderabad, Pune, or Ahmedabad."
         
-        hospitals = INDIAN_HOSPITALS[matched_city]
+        hospitals = snapshot.in_city(matched_city, emergency_required, specialty)
         
-        if emergency_required:
-            hospitals = [h for h in hospitals if h.get('emergency_services', False)]
+        if specialty and not hospitals:
+            return None, f"Sorry, I don't know of a {specialty} hospital in {city}."
         
         # Return top hospitals (already sorted by preference in data)
         return hospitals[:max_results], None
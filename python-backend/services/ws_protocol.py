@@ -0,0 +1,72 @@
+"""
+Binary WebSocket Audio Protocol
+Compact framing for raw audio over the voice WebSocket so audio no longer travels
+as base64 inside JSON; control messages stay JSON text frames
+
+Every binary frame starts with an 8-byte big-endian header:
+
+    version:u8  kind:u8  codec:u8  flags:u8  sequence:u32
+
+followed by the raw audio payload. flags is reserved and sent as 0.
+"""
+
+import struct
+from typing import NamedTuple, Tuple, Union
+
+# Negotiated via the Sec-WebSocket-Protocol header
+SUBPROTOCOL = "medimitra.audio.v1"
+
+PROTOCOL_VERSION = 1
+
+HEADER = struct.Struct(">BBBBI")
+HEADER_SIZE = HEADER.size
+
+# Frame kinds
+KIND_AUDIO_IN = 0x01      # client -> server: microphone audio
+KIND_AUDIO_REPLY = 0x02   # server -> client: complete spoken reply or canned phrase
+KIND_AUDIO_CHUNK = 0x03   # server -> client: one sentence of a streamed reply
+
+# Codecs
+CODEC_PCM16 = 0x00        # 16 kHz 16-bit little-endian mono PCM
+CODEC_WEBM = 0x01
+CODEC_OGG = 0x02
+CODEC_WAV = 0x03
+CODEC_MP3 = 0x04
+
+CODEC_NAMES = {
+    CODEC_PCM16: "pcm",
+    CODEC_WEBM: "webm",
+    CODEC_OGG: "ogg",
+    CODEC_WAV: "wav",
+    CODEC_MP3: "mp3"
+}
+
+class AudioFrameHeader(NamedTuple):
+    version: int
+    kind: int
+    codec: int
+    flags: int
+    sequence: int
+
+    @property
+    def codec_name(self) -> str:
+        return CODEC_NAMES.get(self.codec, "unknown")
+
+
+def pack_frame(kind: int, codec: int, sequence: int, payload: bytes, flags: int = 0) -> bytes:
+    """Build a binary frame: header followed by the payload"""
+    return HEADER.pack(PROTOCOL_VERSION, kind, codec, flags, sequence & 0xFFFFFFFF) + payload
+
+
+def parse_frame(data: Union[bytes, bytearray]) -> Tuple[AudioFrameHeader, memoryview]:
+    """Split a binary frame into its header and a zero-copy view of the payload"""
+    if len(data) < HEADER_SIZE:
+        raise ValueError(f"Binary frame too short: {len(data)} bytes")
+
+    header = AudioFrameHeader(*HEADER.unpack_from(data))
+    if header.version != PROTOCOL_VERSION:
+        raise ValueError(f"Unsupported protocol version: {header.version}")
+    if header.codec not in CODEC_NAMES:
+        raise ValueError(f"Unknown audio codec: {header.codec}")
+
+    return header, memoryview(data)[HEADER_SIZE:]
@@ -0,0 +1,44 @@
+"""
+Binary frame checks
+Frames round-trip through pack_frame/parse_frame and malformed ones are refused
+"""
+
+import pytest
+
+from services import ws_protocol
+
+def test_round_trip_without_copying_the_payload():
+    frame = ws_protocol.pack_frame(ws_protocol.KIND_AUDIO_IN, ws_protocol.CODEC_WEBM, 7, b"audio")
+    header, payload = ws_protocol.parse_frame(frame)
+
+    assert header.kind == ws_protocol.KIND_AUDIO_IN
+    assert header.codec_name == "webm"
+    assert header.sequence == 7
+    assert header.flags == 0
+    assert isinstance(payload, memoryview)
+    assert payload.tobytes() == b"audio"
+
+
+def test_sequence_wraps_at_32_bits():
+    frame = ws_protocol.pack_frame(ws_protocol.KIND_AUDIO_CHUNK, ws_protocol.CODEC_MP3, 2 ** 32 + 5, b"")
+    header, payload = ws_protocol.parse_frame(frame)
+    assert header.sequence == 5
+    assert len(payload) == 0
+
+
+def test_header_only_frame_has_empty_payload():
+    frame = ws_protocol.HEADER.pack(ws_protocol.PROTOCOL_VERSION, ws_protocol.KIND_AUDIO_IN, ws_protocol.CODEC_PCM16, 0, 0)
+    header, payload = ws_protocol.parse_frame(frame)
+    assert header.codec_name == "pcm"
+    assert len(payload) == 0
+
+
+@pytest.mark.parametrize("frame, error", [
+    (b"", "too short"),
+    (bytes(ws_protocol.HEADER_SIZE - 1), "too short"),
+    (ws_protocol.HEADER.pack(2, ws_protocol.KIND_AUDIO_IN, ws_protocol.CODEC_PCM16, 0, 0), "version"),
+    (ws_protocol.HEADER.pack(ws_protocol.PROTOCOL_VERSION, ws_protocol.KIND_AUDIO_IN, 0x7F, 0, 0), "codec"),
+])
+def test_malformed_frames_are_refused(frame, error):
+    with pytest.raises(ValueError, match=error):
+        ws_protocol.parse_frame(frame)
@@ -0,0 +1,63 @@
+"""
+Hospital Store Builder
+Converts an INDIAN_HOSPITALS dict (the bundled services/hospital_data.py, the
+model/ copy, or a JSON export of the same shape) into the SQLite store read by
+services/hospital_store.py
+
+A running server with HOSPITAL_STORE_PATH pointing at the output picks the new
+file up on its next poll, or at once via POST /hospitals/reload.
+
+Usage:
+    python tools/build_hospital_store.py --output data/hospitals.db
+    python tools/build_hospital_store.py --source model/hospital_data.py --output data/hospitals.db
+    python tools/build_hospital_store.py --source export.json --output data/hospitals.db
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.hospital_store import read_store, write_store
+
+def load_source(path: Optional[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """INDIAN_HOSPITALS from a Python file or a JSON file; the bundled data when path is None"""
+    if path is None:
+        from services.hospital_data import INDIAN_HOSPITALS
+        return INDIAN_HOSPITALS
+
+    if path.endswith('.json'):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    spec = importlib.util.spec_from_file_location("hospital_source", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.INDIAN_HOSPITALS
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Build the SQLite hospital store")
+    parser.add_argument('--source', help="Python module or JSON file with INDIAN_HOSPITALS (default: bundled data)")
+    parser.add_argument('--output', required=True, help="Store file to create or replace")
+    args = parser.parse_args(argv)
+
+    hospitals_by_city = load_source(args.source)
+    directory = os.path.dirname(os.path.abspath(args.output))
+    os.makedirs(directory, exist_ok=True)
+
+    rows = write_store(args.output, hospitals_by_city)
+
+    # Read it back so a broken file is caught here rather than by the server
+    loaded = read_store(args.output)
+    if sum(len(hospitals) for hospitals in loaded.values()) != rows:
+        sys.exit(f"❌ {args.output} holds a different number of hospitals than was written")
+    print(f"✅ Wrote {rows} hospitals in {len(loaded)} cities to {args.output}")
+
+
+if __name__ == "__main__":
+    main()